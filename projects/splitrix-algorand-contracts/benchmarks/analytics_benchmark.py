@@ -0,0 +1,74 @@
+"""
+Time the vectorized analytics against a Python loop over `Bill.debtors`.
+
+    python -m benchmarks.analytics_benchmark [--rows 1000000] [--members 200]
+"""
+
+import argparse
+import random
+import time
+from collections.abc import Callable
+
+from algosdk import account
+
+from smart_contracts.artifacts.splitrix.splitrix_client import Bill, BillKey, Group
+from smart_contracts.splitrix import analytics
+from smart_contracts.splitrix.compact import CompactState
+
+_DEBTORS_PER_BILL = 8
+
+
+def _state(row_count: int, member_count: int) -> CompactState:
+    members = [account.generate_account()[1] for _ in range(member_count)]
+    state = CompactState()
+    state.set_group(1, Group(admin=members[0], bill_counter=0, members=members))
+    for bill_id in range(row_count // _DEBTORS_PER_BILL):
+        debtors = random.sample(members, _DEBTORS_PER_BILL)
+        state.set_bill(
+            BillKey(group_id=1, bill_id=bill_id),
+            Bill(
+                payer=debtors[0],
+                total_amount=_DEBTORS_PER_BILL * 1_000,
+                debtors=[[debtor, 1_000, random.choice([0, 500])] for debtor in debtors],
+                memo="",
+            ),
+        )
+    return state
+
+
+def _timed(label: str, function: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    function()
+    print(f"{label:<22} {time.perf_counter() - start:>8.3f}s")
+
+
+def main(row_count: int, member_count: int) -> None:
+    state = _state(row_count, member_count)
+    _, bills = state.to_maps()
+
+    def python_balances() -> dict[str, int]:
+        balances: dict[str, int] = {}
+        for bill in bills.values():
+            for debtor, amount, paid in bill.debtors:
+                if debtor != bill.payer:
+                    owed = amount - paid  # type: ignore[operator]
+                    balances[bill.payer] = balances.get(bill.payer, 0) + owed
+                    balances[debtor] = balances.get(debtor, 0) - owed  # type: ignore[index]
+        return balances
+
+    columns = analytics.columns_from_compact(state, 1)
+    print(f"{len(columns):,} debtor rows, {len(columns.addresses)} members")
+    _timed("python loop balances", python_balances)
+    _timed("columns_from_compact", lambda: analytics.columns_from_compact(state, 1))
+    _timed("net_balances", lambda: analytics.net_balances(columns))
+    _timed("debt_matrix", lambda: analytics.debt_matrix(columns))
+    _timed("outstanding_by_bill", lambda: analytics.outstanding_by_bill(columns))
+    _timed("totals", lambda: analytics.totals(columns))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--members", type=int, default=200)
+    args = parser.parse_args()
+    main(args.rows, args.members)
@@ -0,0 +1,79 @@
+"""
+Compare the generic ABI decode path with the fixed-offset codecs.
+
+    python -m benchmarks.codec_benchmark [--bills 20000] [--debtors 8]
+"""
+
+import argparse
+import random
+import timeit
+from collections.abc import Callable
+
+from algokit_utils.applications.abi import get_abi_decoded_value
+from algosdk import account
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    APP_SPEC,
+    Bill,
+    Group,
+    _init_dataclass,
+)
+from smart_contracts.splitrix import codec
+
+
+def _generic_bill(raw: bytes) -> Bill:
+    return _init_dataclass(Bill, get_abi_decoded_value(raw, "Bill", APP_SPEC.structs))  # type: ignore[return-value, arg-type]
+
+
+def _generic_group(raw: bytes) -> Group:
+    return _init_dataclass(Group, get_abi_decoded_value(raw, "Group", APP_SPEC.structs))  # type: ignore[return-value, arg-type]
+
+
+def main(bill_count: int, debtor_count: int, member_count: int) -> None:
+    members = [account.generate_account()[1] for _ in range(member_count)]
+    bills = [
+        codec.encode_bill(
+            Bill(
+                payer=random.choice(members),
+                total_amount=debtor_count * 1_000,
+                debtors=[
+                    [member, 1_000, random.randint(0, 1_000)]
+                    for member in random.sample(members, debtor_count)
+                ],
+                memo=f"bill {i}",
+            )
+        )
+        for i in range(bill_count)
+    ]
+    group = codec.encode_group(Group(admin=members[0], bill_counter=bill_count, members=members))
+
+    for raw in bills[:100]:
+        assert codec.decode_bill(raw) == _generic_bill(raw)
+    assert codec.decode_group(group) == _generic_group(group)
+
+    groups = [group] * bill_count
+    cases = {
+        "bill": (bills, _generic_bill, codec.decode_bill),
+        "group": (groups, _generic_group, codec.decode_group),
+    }
+    for name, (values, generic, fast) in cases.items():
+        generic_rate = _rate(generic, values)
+        fast_rate = _rate(fast, values)
+        print(
+            f"{name:>5}: generic {generic_rate:>12,.0f}/s  "
+            f"codec {fast_rate:>12,.0f}/s  speedup {fast_rate / generic_rate:.1f}x"
+        )
+
+
+def _rate(decode: Callable[[bytes], object], values: list[bytes]) -> float:
+    seconds = min(timeit.repeat(lambda: [decode(raw) for raw in values], number=1, repeat=3))
+    return len(values) / seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bills", type=int, default=20_000)
+    parser.add_argument("--debtors", type=int, default=8)
+    parser.add_argument("--members", type=int, default=16)
+    args = parser.parse_args()
+    main(args.bills, args.debtors, args.members)
@@ -0,0 +1,379 @@
+"""
+Differential check of the Splitrix contract against its pure-Python reference model.
+
+    python -m benchmarks.differential [--operations 1000] [--seed 1] [--groups 4]
+        [--members 8] [--debtors 6] [--invalid-ratio 0.15] [--check-every 250]
+
+Runs one random operation sequence through `EmulatedSplitrix` (the contract
+source on the algorand-python-testing ledger) and `ReferenceSplitrix` side by
+side, without algod. Both must accept or reject every call alike, with the
+same return value or assert message. Every `--check-every` operations and at
+the end, the app's boxes and group counter are compared byte for byte, and
+each member's debts and net balance, from a `DebtGraph` built on the emulated
+bills, are compared with a `DebtGraph` replayed from the accepted calls'
+arguments. Netting bills take their `payers_debt` from that replayed graph, so
+the planner is exercised too.
+
+`--invalid-ratio` of the calls are broken on purpose (wrong totals, outsiders,
+bad indexes, over-large cutoffs, paid rows, ...) to cover the reject paths and
+rollback. A divergence stops the run with the seed and operation index; run the
+same seed with `--operations` set just past that index to replay it.
+
+The emulator runs the contract through algorand-python-testing's pure-Python
+ARC-4 types, at tens of calls per second on groups of eight; the reference
+model runs at tens of thousands, so nearly all the time is the emulator's.
+"""
+
+import argparse
+import collections
+import dataclasses
+import json
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+from algosdk.constants import ZERO_ADDRESS
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    BillKey,
+    CreateBillArgs,
+    CreateGroupArgs,
+)
+from smart_contracts.splitrix.box_loader import BILLS_PREFIX
+from smart_contracts.splitrix.codec import address_from_bytes, decode_bill, decode_group
+from smart_contracts.splitrix.debt_graph import DebtGraph, contract_debtors
+from smart_contracts.splitrix.emulator import EmulatedSplitrix
+from smart_contracts.splitrix.reference_model import ContractRejected, ReferenceSplitrix
+
+MEMO_ALPHABET = "abcdefghij XYZ0123456789é€"
+Outcome = tuple[str, Any]
+
+
+class DivergenceError(Exception):
+    """The emulated contract and the reference model disagree."""
+
+
+@dataclasses.dataclass
+class Operation:
+    method: str
+    args: tuple[Any, ...]
+    kwargs: dict[str, Any] = dataclasses.field(default_factory=dict)
+
+    def apply(self, app: EmulatedSplitrix | ReferenceSplitrix) -> Outcome:
+        try:
+            return ("ok", getattr(app, self.method)(*self.args, **self.kwargs))
+        except ContractRejected as error:
+            return ("rejected", str(error))
+
+
+@dataclasses.dataclass
+class DifferentialReport:
+    operations: int = 0
+    state_checks: int = 0
+    accepted: collections.Counter[str] = dataclasses.field(default_factory=collections.Counter)
+    rejected: collections.Counter[str] = dataclasses.field(default_factory=collections.Counter)
+    emulator_s: float = 0.0
+    reference_s: float = 0.0
+
+    def summary(self) -> dict[str, object]:
+        return {
+            "operations": self.operations,
+            "accepted": dict(self.accepted),
+            "rejected": dict(self.rejected.most_common()),
+            "state_checks": self.state_checks,
+            "emulator_s": round(self.emulator_s, 3),
+            "emulator_ops_per_s": (
+                round(self.operations / self.emulator_s, 1) if self.emulator_s else 0.0
+            ),
+            "reference_ops_per_s": (
+                round(self.operations / self.reference_s, 1) if self.reference_s else 0.0
+            ),
+        }
+
+
+class OperationGenerator:
+    """
+    Random Splitrix calls that are valid against the reference model's current
+    state, except for the `invalid_ratio` share that is broken on purpose.
+    """
+
+    def __init__(
+        self,
+        rng: random.Random,
+        reference: ReferenceSplitrix,
+        graph: DebtGraph,
+        *,
+        groups: int,
+        members: int,
+        debtors: int,
+        invalid_ratio: float,
+        settle_ratio: float,
+        netting_ratio: float,
+    ) -> None:
+        self.rng = rng
+        self.reference = reference
+        self.graph = graph
+        self.groups = groups
+        self.members = members
+        self.debtors = debtors
+        self.invalid_ratio = invalid_ratio
+        self.settle_ratio = settle_ratio
+        self.netting_ratio = netting_ratio
+        self.addresses = [address_from_bytes(rng.randbytes(32)) for _ in range(groups * members)]
+        self.outsider = address_from_bytes(rng.randbytes(32))
+        self.bill_keys: list[BillKey] = []
+
+    def next(self) -> Operation:
+        invalid = self.rng.random() < self.invalid_ratio
+        group_ids = list(self.reference.groups)
+        if not group_ids or (len(group_ids) < self.groups and self.rng.random() < 0.1):
+            return self._create_group(invalid)
+        if self.bill_keys and self.rng.random() < self.settle_ratio:
+            return self._settle_bill(invalid)
+        return self._create_bill(self.rng.choice(group_ids), invalid)
+
+    def accepted(self, operation: Operation, result: Any) -> None:
+        if operation.method == "create_bill":
+            self.bill_keys.append(BillKey(group_id=operation.args[0].group_id, bill_id=result))
+
+    def _create_group(self, invalid: bool) -> Operation:
+        rng = self.rng
+        members = rng.sample(self.addresses, self.members)
+        admin = members[0]
+        # Repeats, the admin itself and the zero address are all dropped by the contract.
+        listed = members[1:] + rng.sample(members, 2) + [ZERO_ADDRESS]
+        rng.shuffle(listed)
+        if invalid:
+            if rng.random() < 0.5:
+                listed = [admin, ZERO_ADDRESS]
+            else:
+                admin = ZERO_ADDRESS
+        return Operation("create_group", (CreateGroupArgs(admin=admin, members=listed),))
+
+    def _create_bill(self, group_id: int, invalid: bool) -> Operation:
+        rng = self.rng
+        members = self.reference.groups[group_id].members
+        payer = rng.choice(members)
+        chosen = rng.sample(members, rng.randint(1, min(self.debtors, len(members))))
+        debtors = [(debtor, rng.randint(1, 1_000)) for debtor in chosen]
+        if rng.random() < 0.1:
+            # A repeated debtor is dropped by the contract; the first amount wins.
+            debtors.append((chosen[0], rng.randint(1, 1_000)))
+        payers_debt = (
+            self.graph.plan_netting(group_id, payer, debtors)
+            if rng.random() < self.netting_ratio
+            else []
+        )
+        args = CreateBillArgs(
+            group_id=group_id,
+            payer=payer,
+            total_amount=sum(amount for _, amount in contract_debtors(debtors)),
+            debtors=debtors,
+            memo="".join(rng.choices(MEMO_ALPHABET, k=rng.randint(1, 32))),
+            payers_debt=list(payers_debt),
+        )
+        if invalid:
+            args = self._break_bill(args)
+        return Operation("create_bill", (args,))
+
+    def _break_bill(self, args: CreateBillArgs) -> CreateBillArgs:
+        replace = dataclasses.replace
+        breakers: list[Callable[[], CreateBillArgs]] = [
+            lambda: replace(args, total_amount=args.total_amount + 1),
+            lambda: replace(args, group_id=args.group_id + 1_000),
+            lambda: replace(args, payer=self.outsider),
+            lambda: replace(
+                args,
+                debtors=[*args.debtors, (self.outsider, 1)],
+                total_amount=args.total_amount + 1,
+            ),
+        ]
+        if args.payers_debt:
+            bill_id, bill_payer, payer_index, cutoff, debtor_index = args.payers_debt[0]
+            for entry in [
+                (bill_id, bill_payer, payer_index, cutoff + 1, debtor_index),
+                (bill_id, bill_payer, payer_index + 1_000, cutoff, debtor_index),
+                (bill_id, bill_payer, payer_index, cutoff, debtor_index + 1_000),
+                (bill_id + 1_000_000, bill_payer, payer_index, cutoff, debtor_index),
+                (bill_id, self.outsider, payer_index, cutoff, debtor_index),
+            ]:
+                broken = [entry, *args.payers_debt[1:]]
+                breakers.append(lambda broken=broken: replace(args, payers_debt=broken))
+        return self.rng.choice(breakers)()
+
+    def _settle_bill(self, invalid: bool) -> Operation:
+        rng = self.rng
+        for _ in range(8):
+            key = rng.choice(self.bill_keys)
+            bill = self.reference.bills[key]
+            open_rows = [i for i, (_, amount, paid) in enumerate(bill.debtors) if amount > paid]
+            if open_rows:
+                break
+        # Without an open row this settles a paid one, which the contract rejects.
+        index = rng.choice(open_rows) if open_rows else rng.randrange(len(bill.debtors))
+        sender, amount, paid = bill.debtors[index]
+        owed = amount - paid
+        payment = rng.choice([owed, rng.randint(0, owed), owed + rng.randint(1, 100)])
+        receiver = bill.payer
+        if invalid:
+            match rng.randrange(4):
+                case 0:
+                    receiver = self.outsider
+                case 1:
+                    index = len(bill.debtors)
+                case 2:
+                    sender = self.outsider
+                case _:
+                    key = BillKey(group_id=key.group_id, bill_id=key.bill_id + 1_000_000)
+        return Operation(
+            "settle_bill",
+            (key.group_id, key.bill_id, index),
+            {"sender": sender, "receiver": receiver, "amount": payment},
+        )
+
+
+def _replay(graph: DebtGraph, operation: Operation, result: Any) -> None:
+    """Apply an accepted call to the graph from its arguments alone."""
+    if operation.method == "create_bill":
+        graph.apply_create_bill(result, operation.args[0])
+    elif operation.method == "settle_bill":
+        group_id, bill_id, sender_index = operation.args
+        graph.apply_settle(
+            BillKey(group_id=group_id, bill_id=bill_id), sender_index, operation.kwargs["amount"]
+        )
+
+
+def _describe_box(name: bytes, value: bytes | None) -> object:
+    if value is None:
+        return None
+    return decode_bill(value) if name.startswith(BILLS_PREFIX) else decode_group(value)
+
+
+def compare_state(
+    reference: ReferenceSplitrix, emulated: EmulatedSplitrix, graph: DebtGraph
+) -> None:
+    """Raise `DivergenceError` unless both apps and the replayed graph agree."""
+    if reference.group_counter != emulated.group_counter:
+        raise DivergenceError(
+            f"group_counter: reference {reference.group_counter}, "
+            f"emulator {emulated.group_counter}"
+        )
+    expected, actual = reference.boxes(), emulated.boxes()
+    if expected != actual:
+        name = min(
+            set(expected) ^ set(actual) or {n for n in expected if expected[n] != actual[n]}
+        )
+        raise DivergenceError(
+            f"box {name!r}: reference {_describe_box(name, expected.get(name))}, "
+            f"emulator {_describe_box(name, actual.get(name))}"
+        )
+    stored = DebtGraph.from_bills(emulated.iter_bills())
+    for group_id, group in reference.groups.items():
+        for member in group.members:
+            owes, replayed_owes = stored.owes(member, group_id), graph.owes(member, group_id)
+            balance = stored.balance(member, group_id)
+            replayed_balance = graph.balance(member, group_id)
+            if owes != replayed_owes or balance != replayed_balance:
+                raise DivergenceError(
+                    f"group {group_id} member {member}: stored bills owe {owes} "
+                    f"(balance {balance}), replayed graph owes {replayed_owes} "
+                    f"(balance {replayed_balance})"
+                )
+
+
+def run(
+    operations: int,
+    *,
+    seed: int = 1,
+    groups: int = 4,
+    members: int = 8,
+    debtors: int = 6,
+    invalid_ratio: float = 0.15,
+    settle_ratio: float = 0.5,
+    netting_ratio: float = 0.5,
+    check_every: int = 250,
+) -> DifferentialReport:
+    report = DifferentialReport()
+    reference = ReferenceSplitrix()
+    graph = DebtGraph()
+    generator = OperationGenerator(
+        random.Random(seed),
+        reference,
+        graph,
+        groups=groups,
+        members=members,
+        debtors=debtors,
+        invalid_ratio=invalid_ratio,
+        settle_ratio=settle_ratio,
+        netting_ratio=netting_ratio,
+    )
+    with EmulatedSplitrix() as emulated:
+        for index in range(operations):
+            operation = generator.next()
+            started = time.perf_counter()
+            expected = operation.apply(reference)
+            applied = time.perf_counter()
+            actual = operation.apply(emulated)
+            report.reference_s += applied - started
+            report.emulator_s += time.perf_counter() - applied
+            report.operations += 1
+            if expected != actual:
+                raise DivergenceError(
+                    f"operation {index} {operation}: reference {expected}, emulator {actual}"
+                )
+            status, result = expected
+            if status == "ok":
+                report.accepted[operation.method] += 1
+                generator.accepted(operation, result)
+                _replay(graph, operation, result)
+            else:
+                report.rejected[result] += 1
+            if (index + 1) % check_every == 0:
+                try:
+                    compare_state(reference, emulated, graph)
+                except DivergenceError as error:
+                    raise DivergenceError(f"after operation {index}: {error}") from error
+                report.state_checks += 1
+        compare_state(reference, emulated, graph)
+        report.state_checks += 1
+    return report
+
+
+def main(args: argparse.Namespace) -> None:
+    try:
+        report = run(
+            args.operations,
+            seed=args.seed,
+            groups=args.groups,
+            members=args.members,
+            debtors=args.debtors,
+            invalid_ratio=args.invalid_ratio,
+            settle_ratio=args.settle_ratio,
+            netting_ratio=args.netting_ratio,
+            check_every=args.check_every,
+        )
+    except DivergenceError as error:
+        raise SystemExit(f"seed {args.seed}: {error}") from error
+    summary = report.summary()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"seed {args.seed}: {args.groups} groups x {args.members} members, no divergence")
+    for name, value in summary.items():
+        print(f"{name:<24} {value}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--operations", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--groups", type=int, default=4)
+    parser.add_argument("--members", type=int, default=8)
+    parser.add_argument("--debtors", type=int, default=6)
+    parser.add_argument("--invalid-ratio", type=float, default=0.15)
+    parser.add_argument("--settle-ratio", type=float, default=0.5)
+    parser.add_argument("--netting-ratio", type=float, default=0.5)
+    parser.add_argument("--check-every", type=int, default=250)
+    parser.add_argument("--json", action="store_true")
+    main(parser.parse_args())
@@ -0,0 +1,377 @@
+"""
+Drive synthetic `create_bill`/`settle_bill` load against a local algod and report throughput.
+
+    python -m benchmarks.loadgen [--app-id 1234] [--groups 16] [--members 8] [--debtors 4]
+        [--operations 2000] [--concurrency 16] [--settle-ratio 0.4] [--netting-ratio 0.5]
+
+Meant for AlgoKit LocalNet (`algokit localnet start`) or any dev-mode algod:
+the algod, the dispenser and an optional deployer are read from the usual
+`ALGOD_*`/`DISPENSER_*`/`DEPLOYER_*` environment, defaulting to LocalNet.
+Without `--app-id` a fresh app is deployed and funded.
+
+Each operation is one atomic group sent and awaited with `composer.send()`, so
+latency is submission to confirmation. Operations on the same Splitrix group
+are serialised by a lock, because `create_bill` takes its id from the group's
+`bill_counter` and the box references must name that id; concurrency applies
+across groups. Netting bills get their `payers_debt` from a `DebtGraph` fed
+with every confirmed operation, and settlements are built by `SenderIndex`
+without reading the bill first.
+"""
+
+import argparse
+import dataclasses
+import json
+import math
+import random
+import statistics
+import threading
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+import algokit_utils
+from dotenv import load_dotenv
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    BillKey,
+    CreateBillArgs,
+    CreateGroupArgs,
+    SplitrixClient,
+    SplitrixComposer,
+    SplitrixFactory,
+)
+from smart_contracts.splitrix.box_loader import BILLS_PREFIX, GROUPS_PREFIX
+from smart_contracts.splitrix.bulk_submit import (
+    BOX_IO_BYTES_PER_REF,
+    MAX_REFS_PER_APP_CALL,
+    estimate_create_group_cost,
+    gas_calls_needed,
+)
+from smart_contracts.splitrix.codec import BILL_KEY_LAYOUT, U64, bill_size, group_size
+from smart_contracts.splitrix.debt_graph import DebtGraph, contract_debtors
+from smart_contracts.splitrix.sender_index import SenderIndex
+
+
+@dataclasses.dataclass(kw_only=True)
+class LoadReport:
+    operations: int = 0
+    create_bills: int = 0
+    netted_bills: int = 0
+    settlements: int = 0
+    transactions: int = 0
+    errors: int = 0
+    first_error: str | None = None
+    elapsed: float = 0.0
+    fees: int = 0
+    box_mbr: int = 0
+    latencies: list[float] = dataclasses.field(default_factory=list, repr=False)
+
+    def percentile(self, percent: int) -> float:
+        if len(self.latencies) < 2:
+            return self.latencies[0] if self.latencies else 0.0
+        return statistics.quantiles(self.latencies, n=100)[percent - 1]
+
+    def summary(self) -> dict[str, object]:
+        return {
+            "operations": self.operations,
+            "create_bills": self.create_bills,
+            "netted_bills": self.netted_bills,
+            "settlements": self.settlements,
+            "transactions": self.transactions,
+            "errors": self.errors,
+            "first_error": self.first_error,
+            "elapsed_s": round(self.elapsed, 3),
+            "ops_per_s": round(self.operations / self.elapsed, 2) if self.elapsed else 0.0,
+            "txns_per_s": round(self.transactions / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 1),
+            "p95_ms": round(self.percentile(95) * 1000, 1),
+            "p99_ms": round(self.percentile(99) * 1000, 1),
+            "fees_micro_algo": self.fees,
+            "fee_per_op_micro_algo": self.fees // self.operations if self.operations else 0,
+            "box_mbr_micro_algo": self.box_mbr,
+        }
+
+
+def _box_reference_slots(
+    boxes: dict[bytes, int], min_app_calls: int = 1
+) -> list[list[algokit_utils.BoxReference]]:
+    """Box references per app call, with empty references added for extra box I/O."""
+    refs = max(len(boxes), math.ceil(sum(boxes.values()) / BOX_IO_BYTES_PER_REF))
+    names = list(boxes) + [b""] * (refs - len(boxes))
+    app_calls = max(min_app_calls, math.ceil(refs / MAX_REFS_PER_APP_CALL))
+    slots: list[list[algokit_utils.BoxReference]] = [[] for _ in range(app_calls)]
+    for index, name in enumerate(names):
+        slots[index // MAX_REFS_PER_APP_CALL].append(
+            algokit_utils.BoxReference(app_id=0, name=name)
+        )
+    return slots
+
+
+class LoadGenerator:
+    """Synthetic groups and a local model of their debts, used to build each next operation."""
+
+    def __init__(
+        self,
+        client: SplitrixClient,
+        *,
+        debtors: int,
+        settle_ratio: float,
+        netting_ratio: float,
+        gas_calls: int,
+        seed: int | None = None,
+    ) -> None:
+        self.client = client
+        self.debtors = debtors
+        self.settle_ratio = settle_ratio
+        self.netting_ratio = netting_ratio
+        self.gas_calls = gas_calls
+        self.random = random.Random(seed)
+        self.graph = DebtGraph()
+        self.sender_index = SenderIndex(client)
+        self.groups: dict[int, list[str]] = {}
+        self._bill_counters: dict[int, int] = {}
+        self._bill_sizes: dict[tuple[int, int], int] = {}
+        self._locks: dict[int, threading.Lock] = {}
+        self._next_group = 0
+        self._group_lock = threading.Lock()
+
+    # ---- setup ----
+
+    def create_groups(self, members: list[list[str]]) -> None:
+        for group in members:
+            group_id = self.client.state.global_state.group_counter
+            # Every member is compared with the ones before it, so larger groups
+            # need gas() calls to pool enough opcode budget.
+            slots = _box_reference_slots(
+                {GROUPS_PREFIX + U64.pack(group_id): group_size(len(group))},
+                1 + gas_calls_needed(estimate_create_group_cost(len(group))),
+            )
+            composer = self.client.new_group().create_group(
+                CreateGroupArgs(admin=group[0], members=group[1:]),
+                algokit_utils.CommonAppCallParams(sender=group[0], box_references=slots[0]),
+            )
+            for index, refs in enumerate(slots[1:]):
+                composer.gas(
+                    algokit_utils.CommonAppCallParams(
+                        sender=group[0],
+                        box_references=refs,
+                        note=f"load group gas {group_id}/{index}".encode(),
+                    )
+                )
+            group_id = typing.cast(int, composer.send().returns[0].value)
+            self.groups[group_id] = group
+            self._bill_counters[group_id] = 0
+            self._locks[group_id] = threading.Lock()
+
+    # ---- operations ----
+
+    def _create_bill(
+        self, group_id: int, netting: bool
+    ) -> tuple[CreateBillArgs, SplitrixComposer]:
+        members = self.groups[group_id]
+        payer = self.random.choice(members)
+        debtors = [
+            (debtor, self.random.randrange(1_000, 100_000))
+            for debtor in self.random.sample(members, min(self.debtors, len(members)))
+        ]
+        memo = f"load {group_id}/{self._bill_counters[group_id]}"
+        if netting:
+            args = self.graph.create_bill_args(group_id, payer, debtors, memo)
+        else:
+            args = CreateBillArgs(
+                group_id=group_id,
+                payer=payer,
+                total_amount=sum(amount for _, amount in contract_debtors(debtors)),
+                debtors=debtors,
+                memo=memo,
+                payers_debt=[],
+            )
+        bill_id = self._bill_counters[group_id]
+        boxes = {
+            GROUPS_PREFIX + U64.pack(group_id): group_size(len(members)),
+            BILLS_PREFIX + BILL_KEY_LAYOUT.pack(group_id, bill_id): bill_size(
+                len(contract_debtors(debtors)), memo
+            ),
+        }
+        for old_bill_id, *_ in args.payers_debt:
+            boxes[BILLS_PREFIX + BILL_KEY_LAYOUT.pack(group_id, old_bill_id)] = (
+                self._bill_sizes[(group_id, old_bill_id)]
+            )
+        slots = _box_reference_slots(boxes, 1 + self.gas_calls)
+        composer = self.client.new_group().create_bill(
+            args, algokit_utils.CommonAppCallParams(sender=payer, box_references=slots[0])
+        )
+        for index, refs in enumerate(slots[1:]):
+            composer.gas(
+                algokit_utils.CommonAppCallParams(
+                    sender=payer, box_references=refs, note=f"load gas {index}".encode()
+                )
+            )
+        return args, composer
+
+    def _open_debt(self, group_id: int) -> tuple[BillKey, str, int] | None:
+        members = self.groups[group_id]
+        for debtor in self.random.sample(members, len(members)):
+            creditors = self.graph.owes(debtor, group_id)
+            if creditors:
+                creditor = self.random.choice(list(creditors))
+                bills = self.graph.bills_behind(group_id, debtor, creditor)
+                bill_id = self.random.choice(list(bills))
+                return BillKey(group_id=group_id, bill_id=bill_id), debtor, bills[bill_id]
+        return None
+
+    def _group_id(self) -> int:
+        with self._group_lock:
+            group_ids = list(self.groups)
+            group_id = group_ids[self._next_group % len(group_ids)]
+            self._next_group += 1
+            return group_id
+
+    def operation(self, report: LoadReport, report_lock: threading.Lock) -> None:
+        """Build, send and record one operation on the next group in turn."""
+        group_id = self._group_id()
+        with self._locks[group_id]:
+            debt = self._open_debt(group_id) if self.random.random() < self.settle_ratio else None
+            netting = debt is None and self.random.random() < self.netting_ratio
+            args: CreateBillArgs | None = None
+            try:
+                if debt is not None:
+                    bill_key, debtor, amount = debt
+                    composer = self.sender_index.settle(bill_key, amount, sender=debtor)
+                else:
+                    args, composer = self._create_bill(group_id, netting)
+                start = time.perf_counter()
+                result = composer.send()
+                latency = time.perf_counter() - start
+            except Exception as error:
+                with report_lock:
+                    report.errors += 1
+                    report.first_error = report.first_error or repr(error)
+                return
+            if args is None:
+                bill_key, debtor, amount = debt  # type: ignore[misc]
+                index = self.sender_index.sender_index(bill_key, debtor)
+                self.graph.apply_settle(bill_key, index, amount)  # type: ignore[arg-type]
+            else:
+                bill_id = result.returns[0].value
+                self._bill_counters[group_id] = bill_id + 1
+                self._bill_sizes[(group_id, bill_id)] = bill_size(
+                    len(contract_debtors(args.debtors)), args.memo
+                )
+                self.graph.apply_create_bill(bill_id, args)
+                self.sender_index.apply_create_bill(bill_id, args)
+        with report_lock:
+            report.operations += 1
+            report.transactions += len(result.transactions)
+            report.fees += sum(txn.raw.fee for txn in result.transactions)
+            report.latencies.append(latency)
+            if args is None:
+                report.settlements += 1
+            else:
+                report.create_bills += 1
+                report.netted_bills += bool(args.payers_debt)
+
+    def run(self, operations: int, concurrency: int) -> LoadReport:
+        report = LoadReport()
+        report_lock = threading.Lock()
+        app_address = self.client.app_address
+        account = self.client.algorand.account
+        min_balance = account.get_information(app_address).min_balance.micro_algo
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(operations):
+                executor.submit(self.operation, report, report_lock)
+        report.elapsed = time.perf_counter() - start
+        report.box_mbr = account.get_information(app_address).min_balance.micro_algo - min_balance
+        return report
+
+
+# ---------------------------- Environment setup ---------------------------- #
+
+
+def _funded_accounts(
+    algorand: algokit_utils.AlgorandClient, count: int, algo_each: int
+) -> list[str]:
+    dispenser = algorand.account.dispenser_from_environment()
+    addresses = [algorand.account.random().address for _ in range(count)]
+    for start in range(0, count, 16):
+        composer = algorand.new_group()
+        for address in addresses[start : start + 16]:
+            composer.add_payment(
+                algokit_utils.PaymentParams(
+                    sender=dispenser.address,
+                    receiver=address,
+                    amount=algokit_utils.AlgoAmount(algo=algo_each),
+                )
+            )
+        composer.send()
+    return addresses
+
+
+def _app_client(
+    algorand: algokit_utils.AlgorandClient, app_id: int | None, funding_algo: int
+) -> SplitrixClient:
+    if app_id is not None:
+        return algorand.client.get_typed_app_client_by_id(SplitrixClient, app_id=app_id)
+    dispenser = algorand.account.dispenser_from_environment()
+    factory = algorand.client.get_typed_app_factory(
+        SplitrixFactory, default_sender=dispenser.address
+    )
+    client, _ = factory.send.create.bare()
+    algorand.send.payment(
+        algokit_utils.PaymentParams(
+            sender=dispenser.address,
+            receiver=client.app_address,
+            amount=algokit_utils.AlgoAmount(algo=funding_algo),
+        )
+    )
+    return client
+
+
+def main(args: argparse.Namespace) -> None:
+    load_dotenv()
+    algorand = algokit_utils.AlgorandClient.from_environment()
+    client = _app_client(algorand, args.app_id, args.app_funding)
+    accounts = _funded_accounts(algorand, args.groups * args.members, args.account_funding)
+    generator = LoadGenerator(
+        client,
+        debtors=args.debtors,
+        settle_ratio=args.settle_ratio,
+        netting_ratio=args.netting_ratio,
+        gas_calls=args.gas_calls,
+        seed=args.seed,
+    )
+    generator.create_groups(
+        [
+            accounts[start : start + args.members]
+            for start in range(0, len(accounts), args.members)
+        ]
+    )
+    report = generator.run(args.operations, args.concurrency)
+    summary = report.summary()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"app {client.app_id}: {args.groups} groups x {args.members} members")
+    for name, value in summary.items():
+        print(f"{name:<24} {value}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app-id", type=int)
+    parser.add_argument("--groups", type=int, default=16)
+    parser.add_argument("--members", type=int, default=8)
+    parser.add_argument("--debtors", type=int, default=4)
+    parser.add_argument("--operations", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--settle-ratio", type=float, default=0.4)
+    parser.add_argument("--netting-ratio", type=float, default=0.5)
+    parser.add_argument(
+        "--gas-calls", type=int, default=2, help="extra gas() calls per create_bill"
+    )
+    parser.add_argument("--app-funding", type=int, default=100, help="Algo sent to a new app")
+    parser.add_argument("--account-funding", type=int, default=20, help="Algo per member")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--json", action="store_true")
+    main(parser.parse_args())
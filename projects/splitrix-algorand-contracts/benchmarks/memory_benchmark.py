@@ -0,0 +1,80 @@
+"""
+Compare the memory held by dataclass maps with the compact representation.
+
+    python -m benchmarks.memory_benchmark [--bills 50000] [--debtors 8]
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from collections.abc import Callable
+
+from algokit_utils.applications.abi import get_abi_decoded_value
+from algosdk import account
+
+from smart_contracts.artifacts.splitrix.splitrix_client import APP_SPEC, Bill, BillKey
+from smart_contracts.splitrix import codec
+from smart_contracts.splitrix.compact import CompactState
+
+
+def _measure(build: Callable[[], object]) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+
+def main(bill_count: int, debtor_count: int, member_count: int) -> None:
+    members = [account.generate_account()[1] for _ in range(member_count)]
+    raw_bills = [
+        codec.encode_bill(
+            Bill(
+                payer=random.choice(members),
+                total_amount=debtor_count * 1_000,
+                debtors=[
+                    [member, 1_000, 0]
+                    for member in random.sample(members, debtor_count)
+                ],
+                memo=f"bill {i}",
+            )
+        )
+        for i in range(bill_count)
+    ]
+
+    def build_dataclasses() -> dict[BillKey, Bill]:
+        # The generated client's decode path, one string per decoded address.
+        return {
+            BillKey(group_id=0, bill_id=i): Bill(
+                **get_abi_decoded_value(raw, "Bill", APP_SPEC.structs)  # type: ignore[arg-type]
+            )
+            for i, raw in enumerate(raw_bills)
+        }
+
+    def build_compact() -> CompactState:
+        state = CompactState()
+        for i, raw in enumerate(raw_bills):
+            state.set_bill_bytes(BillKey(group_id=0, bill_id=i), raw)
+        return state
+
+    dataclasses_map, dataclass_bytes = _measure(build_dataclasses)
+    compact, compact_bytes = _measure(build_compact)
+    assert compact.to_maps()[1] == dataclasses_map  # type: ignore[union-attr]
+
+    debtors = bill_count * debtor_count
+    print(f"{bill_count:,} bills, {debtors:,} debtors")
+    print(f"  dataclasses {dataclass_bytes / 2**20:8.1f} MiB  {dataclass_bytes / debtors:6.0f} B/debtor")
+    print(f"  compact     {compact_bytes / 2**20:8.1f} MiB  {compact_bytes / debtors:6.0f} B/debtor")
+    print(f"  reduction   {dataclass_bytes / compact_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bills", type=int, default=50_000)
+    parser.add_argument("--debtors", type=int, default=8)
+    parser.add_argument("--members", type=int, default=16)
+    args = parser.parse_args()
+    main(args.bills, args.debtors, args.members)
@@ -0,0 +1,472 @@
+"""
+Simulate every Splitrix ABI method over a size grid and guard the costs with JSON baselines.
+
+    python -m benchmarks.opcode_costs [--update] [--threshold 0.05]
+        [--keys 1 8 32] [--baseline benchmarks/baselines/opcode_costs.json]
+
+Runs against AlgoKit LocalNet (or any algod from the `ALGOD_*` environment):
+a fresh app is deployed from the built artifacts, so run `algokit project run
+build` after changing `contract.py`. Fixture groups and bills are created once,
+then each cell is simulated with unnamed resources and extra opcode budget
+allowed, so no references or `gas()` padding skew the numbers; the fixture
+calls themselves are padded with `gas()` to their estimated cost. Cells whose
+app args would not fit in one call, such as the largest `create_bill` cells,
+or whose estimated cost is more than an atomic group can pool, such as groups
+of 32 members, are left out of the grid. Per cell it records:
+
+    opcode_cost      app budget consumed by the group
+    box_read_bytes   size, before the call, of every box the call accessed
+    box_write_bytes  final size of every box the call wrote
+    log_bytes        bytes logged (ARC-28 events and readonly returns)
+
+`--update` writes the baseline. Otherwise the run exits non-zero when the
+baseline is missing or any metric of any cell grows by more than `--threshold`
+over its baseline.
+"""
+
+import argparse
+import base64
+import dataclasses
+import itertools
+import json
+import sys
+import typing
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import algokit_utils
+from algosdk.error import AlgodHTTPError
+from algosdk.v2client.models import SimulateTraceConfig
+from dotenv import load_dotenv
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    BillKey,
+    CreateBillArgs,
+    CreateGroupArgs,
+    GetBillArgs,
+    GetBillsArgs,
+    GetGroupArgs,
+    GetGroupsArgs,
+    SettleBillArgs,
+    SplitrixClient,
+    SplitrixComposer,
+    SplitrixFactory,
+)
+from smart_contracts.splitrix.bulk_reads import MAX_APP_ARGS_BYTES, MAX_LOGS_PER_CALL
+from smart_contracts.splitrix.bulk_submit import (
+    MAX_GROUP_OPCODE_BUDGET,
+    estimate_cost,
+    estimate_create_group_cost,
+    gas_calls_needed,
+)
+from smart_contracts.splitrix.codec import ADDRESS_SIZE, BILL_KEY_SIZE, PAYER_DEBT_SIZE
+
+METRICS = ("opcode_cost", "box_read_bytes", "box_write_bytes", "log_bytes")
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "opcode_costs.json"
+# Largest extra budget simulate grants a group.
+_EXTRA_OPCODE_BUDGET = 320_000
+_OLD_BILL_AMOUNT = 1_000_000
+# ABI selector, uint64 and dynamic array or string length prefix.
+_SELECTOR_BYTES = 4
+_UINT64_BYTES = 8
+_LENGTH_BYTES = 2
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Cell:
+    method: str
+    members: int = 0
+    debtors: int = 0
+    memo: int = 0
+    payers_debt: int = 0
+    keys: int = 0
+
+    @property
+    def key(self) -> str:
+        sizes = [
+            f"{name}={value}"
+            for name, value in dataclasses.asdict(self).items()
+            if name != "method" and value
+        ]
+        return "/".join([self.method, *sizes])
+
+
+def app_args_bytes(cell: Cell) -> int:
+    """Encoded size of the app args, selector included, of the call `cell` measures."""
+    if cell.method == "create_group":
+        # The admin is a separate argument from the other members.
+        return _SELECTOR_BYTES + ADDRESS_SIZE + _LENGTH_BYTES + ADDRESS_SIZE * (cell.members - 1)
+    if cell.method == "create_bill":
+        return (
+            _SELECTOR_BYTES
+            + _UINT64_BYTES
+            + ADDRESS_SIZE
+            + _UINT64_BYTES
+            + _LENGTH_BYTES
+            + (ADDRESS_SIZE + _UINT64_BYTES) * cell.debtors
+            + _LENGTH_BYTES
+            + cell.memo
+            + _LENGTH_BYTES
+            + PAYER_DEBT_SIZE * cell.payers_debt
+        )
+    if cell.method == "get_groups":
+        return _SELECTOR_BYTES + _LENGTH_BYTES + _UINT64_BYTES * cell.keys
+    if cell.method == "get_bills":
+        return _SELECTOR_BYTES + _LENGTH_BYTES + BILL_KEY_SIZE * cell.keys
+    # gas, get_group, get_bill and settle_bill take at most three uint64s.
+    return _SELECTOR_BYTES + 3 * _UINT64_BYTES
+
+
+def _estimated_cost(cell: Cell) -> int:
+    """Opcodes `estimate_cost` expects for `cell`, 0 for the methods it does not model."""
+    if cell.method != "create_bill":
+        return 0
+    args = CreateBillArgs(
+        group_id=0,
+        payer="",
+        total_amount=0,
+        debtors=[("", 0)] * cell.debtors,
+        memo="",
+        payers_debt=[(0, "", 0, 0, 0)] * cell.payers_debt,
+    )
+    return estimate_cost(args, cell.members)
+
+
+def fits(cell: Cell) -> bool:
+    """
+    Whether one app call can carry `cell` (app args within the AVM limit, one
+    log per key) and an atomic group can pool its opcodes and create its group.
+    """
+    return (
+        app_args_bytes(cell) <= MAX_APP_ARGS_BYTES
+        and cell.keys <= MAX_LOGS_PER_CALL
+        and estimate_create_group_cost(cell.members) <= MAX_GROUP_OPCODE_BUDGET
+        and _estimated_cost(cell) <= MAX_GROUP_OPCODE_BUDGET
+    )
+
+
+def grid(
+    members: Iterable[int],
+    debtors: Iterable[int],
+    memos: Iterable[int],
+    payers_debts: Iterable[int],
+    keys: Iterable[int] = (),
+) -> list[Cell]:
+    """
+    Cells per method, keeping only the dimensions each method depends on and
+    leaving out the cells that do not fit in one app call.
+    """
+    members, debtors, memos, payers_debts, keys = (
+        sorted(set(values)) for values in (members, debtors, memos, payers_debts, keys)
+    )
+    cells = [Cell(method="gas")]
+    cells += [Cell(method="create_group", members=count) for count in members]
+    cells += [Cell(method="get_group", members=count) for count in members]
+    cells += [
+        Cell(method="get_groups", members=member_count, keys=key_count)
+        for member_count, key_count in itertools.product(members, keys)
+    ]
+    for member_count, debtor_count in itertools.product(members, debtors):
+        if debtor_count > member_count:
+            continue
+        if debtor_count >= 2:
+            # Fixture bills need a payer and a settling debtor.
+            cells.append(Cell(method="get_bill", members=member_count, debtors=debtor_count))
+            cells.append(Cell(method="settle_bill", members=member_count, debtors=debtor_count))
+            cells += [
+                Cell(method="get_bills", members=member_count, debtors=debtor_count, keys=count)
+                for count in keys
+            ]
+        cells += [
+            Cell(
+                method="create_bill",
+                members=member_count,
+                debtors=debtor_count,
+                memo=memo,
+                payers_debt=payers_debt,
+            )
+            for memo, payers_debt in itertools.product(memos, payers_debts)
+        ]
+    return [cell for cell in cells if fits(cell)]
+
+
+def measure(
+    response: dict[str, object], app_id: int, box_size: Callable[[bytes], int]
+) -> dict[str, int]:
+    """Metrics of one simulated group; `box_size` gives a box's size before the call."""
+    group = response["txn-groups"][0]  # type: ignore[index]
+    opcode_cost = log_bytes = 0
+    accessed: list[bytes] = []
+    written: dict[bytes, int] = {}
+    for resources in [
+        group.get("unnamed-resources-accessed") or {},
+        *(result.get("unnamed-resources-accessed") or {} for result in group["txn-results"]),
+    ]:
+        accessed.extend(
+            base64.b64decode(box["name"])
+            for box in resources.get("boxes", [])
+            if box.get("app", 0) in (0, app_id)
+        )
+    for result in group["txn-results"]:
+        opcode_cost += result.get("app-budget-consumed", 0)
+        logs = result["txn-result"].get("logs", [])
+        log_bytes += sum(len(base64.b64decode(log)) for log in logs)
+        trace = (result.get("exec-trace") or {}).get("approval-program-trace", [])
+        for step in trace:
+            for change in step.get("state-changes", []):
+                if change.get("app-state-type") != "b":
+                    continue
+                name = base64.b64decode(change["key"])
+                if change.get("operation") == "w":
+                    value = change.get("new-value", {}).get("bytes", "")
+                    written[name] = len(base64.b64decode(value))
+                else:
+                    written[name] = 0
+    return {
+        "opcode_cost": opcode_cost,
+        "box_read_bytes": sum(box_size(name) for name in dict.fromkeys(accessed)),
+        "box_write_bytes": sum(written.values()),
+        "log_bytes": log_bytes,
+    }
+
+
+def compare(
+    baseline: dict[str, dict[str, int]], results: dict[str, dict[str, int]], threshold: float
+) -> list[str]:
+    """Human-readable regressions of `results` over `baseline`, empty when none."""
+    regressions = []
+    for key, metrics in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        for metric in METRICS:
+            before, after = expected.get(metric, 0), metrics[metric]
+            if after > before * (1 + threshold):
+                change = f"+{(after - before) / before:.1%}" if before else "new"
+                regressions.append(f"{key} {metric}: {before} -> {after} ({change})")
+    return regressions
+
+
+class Fixture:
+    """Groups and bills on a fresh app, sized so every grid cell has state to run against."""
+
+    def __init__(self, algorand: algokit_utils.AlgorandClient, cells: list[Cell]) -> None:
+        self.algorand = algorand
+        self.dispenser = algorand.account.dispenser_from_environment()
+        factory = algorand.client.get_typed_app_factory(
+            SplitrixFactory, default_sender=self.dispenser.address
+        )
+        self.client: SplitrixClient = factory.send.create.bare()[0]
+        self._pay(self.client.app_address, 10_000_000_000)
+        max_payers_debt = max((cell.payers_debt for cell in cells), default=0)
+        # `get_groups`/`get_bills` read that many distinct groups and bills of each size.
+        max_keys = max((cell.keys for cell in cells), default=0)
+        self.members: dict[int, list[str]] = {}
+        self.group_ids: dict[int, list[int]] = {}
+        self.old_bills: dict[int, list[int]] = {}
+        self.bills: dict[tuple[int, int], list[int]] = {}
+        self._box_sizes: dict[bytes, int] = {}
+        # Fixture calls repeat, a distinct note keeps their transaction ids apart.
+        self._notes = itertools.count()
+        for member_count in sorted({cell.members for cell in cells if cell.members}):
+            members = [algorand.account.random().address for _ in range(member_count)]
+            # members[1] pays settlements and owes members[0] on the old bills used for netting.
+            self._pay(members[1], 100_000_000)
+            group_ids = [
+                self._send(
+                    self.client.new_group().create_group(
+                        CreateGroupArgs(admin=members[0], members=members[1:]), self._params()
+                    ),
+                    estimate_create_group_cost(member_count),
+                )
+                for _ in range(max(1, max_keys))
+            ]
+            group_id = group_ids[0]
+            self.members[member_count] = members
+            self.group_ids[member_count] = group_ids
+            self.old_bills[member_count] = [
+                self._create_bill(group_id, member_count, members[0], members[:2], "old")
+                for _ in range(max_payers_debt)
+            ]
+            for debtor_count in sorted({c.debtors for c in cells if c.members == member_count}):
+                if 2 <= debtor_count <= member_count:
+                    # The settling debtor goes last, the costliest position to reach.
+                    debtors = [members[0], *members[2:debtor_count], members[1]]
+                    self.bills[(member_count, debtor_count)] = [
+                        self._create_bill(group_id, member_count, members[0], debtors, "settle")
+                        for _ in range(max(1, max_keys))
+                    ]
+
+    def _pay(self, receiver: str, micro_algos: int) -> None:
+        self.algorand.send.payment(
+            algokit_utils.PaymentParams(
+                sender=self.dispenser.address,
+                receiver=receiver,
+                amount=algokit_utils.AlgoAmount(micro_algo=micro_algos),
+            )
+        )
+
+    def _params(self) -> algokit_utils.CommonAppCallParams:
+        return algokit_utils.CommonAppCallParams(
+            sender=self.dispenser.address, note=f"fixture {next(self._notes)}".encode()
+        )
+
+    def _send(self, composer: SplitrixComposer, cost: int) -> int:
+        """Send the single call in `composer`, padded with `gas()` calls to pool `cost` opcodes."""
+        for _ in range(gas_calls_needed(cost)):
+            composer = composer.gas(self._params())
+        result = composer.send(algokit_utils.SendParams(populate_app_call_resources=True))
+        return typing.cast(int, result.returns[0].value)
+
+    def _create_bill(
+        self, group_id: int, member_count: int, payer: str, debtors: list[str], memo: str
+    ) -> int:
+        args = CreateBillArgs(
+            group_id=group_id,
+            payer=payer,
+            total_amount=_OLD_BILL_AMOUNT * len(debtors),
+            debtors=[(debtor, _OLD_BILL_AMOUNT) for debtor in debtors],
+            memo=memo,
+            payers_debt=[],
+        )
+        return self._send(
+            self.client.new_group().create_bill(args, self._params()),
+            estimate_cost(args, member_count),
+        )
+
+    def composer(self, cell: Cell) -> SplitrixComposer:
+        """A composer holding exactly the call `cell` measures."""
+        sender = algokit_utils.CommonAppCallParams(sender=self.dispenser.address)
+        composer = self.client.new_group()
+        if cell.method == "gas":
+            return composer.gas(sender)
+        members = self.members.get(cell.members, [])
+        group_ids = self.group_ids.get(cell.members, [0])
+        group_id = group_ids[0]
+        if cell.method == "create_group":
+            return composer.create_group(
+                CreateGroupArgs(admin=members[0], members=members[1:]), sender
+            )
+        if cell.method == "get_group":
+            return composer.get_group(GetGroupArgs(group_id=group_id), sender)
+        if cell.method == "get_groups":
+            return composer.get_groups(GetGroupsArgs(group_ids=group_ids[: cell.keys]), sender)
+        if cell.method == "get_bill":
+            bill_id = self.bills[(cell.members, cell.debtors)][0]
+            return composer.get_bill(
+                GetBillArgs(bill_key=BillKey(group_id=group_id, bill_id=bill_id)), sender
+            )
+        if cell.method == "get_bills":
+            bill_ids = self.bills[(cell.members, cell.debtors)][: cell.keys]
+            return composer.get_bills(
+                GetBillsArgs(bill_keys=[(group_id, bill_id) for bill_id in bill_ids]), sender
+            )
+        if cell.method == "settle_bill":
+            payer, debtor = members[0], members[1]
+            payment = self.algorand.create_transaction.payment(
+                algokit_utils.PaymentParams(
+                    sender=debtor,
+                    receiver=payer,
+                    amount=algokit_utils.AlgoAmount(micro_algo=_OLD_BILL_AMOUNT),
+                )
+            )
+            return composer.settle_bill(
+                SettleBillArgs(
+                    group_id=group_id,
+                    bill_id=self.bills[(cell.members, cell.debtors)][0],
+                    sender_index=cell.debtors - 1,
+                    payment=payment,
+                ),
+                algokit_utils.CommonAppCallParams(sender=debtor),
+            )
+        # create_bill: members[1] pays and nets what it owes members[0], the first debtor.
+        # The payer only joins the debtors when every member is one.
+        debtors = [members[0], *members[2:]][: cell.debtors]
+        if len(debtors) < cell.debtors:
+            debtors.append(members[1])
+        return composer.create_bill(
+            CreateBillArgs(
+                group_id=group_id,
+                payer=members[1],
+                total_amount=_OLD_BILL_AMOUNT * len(debtors),
+                debtors=[(debtor, _OLD_BILL_AMOUNT) for debtor in debtors],
+                memo="m" * cell.memo,
+                payers_debt=[
+                    (old_bill_id, members[0], 1, 1, 0)
+                    for old_bill_id in self.old_bills[cell.members][: cell.payers_debt]
+                ],
+            ),
+            sender,
+        )
+
+    def box_size(self, name: bytes) -> int:
+        """Committed size of a box, 0 if it does not exist; simulate never changes it."""
+        if name not in self._box_sizes:
+            try:
+                response = self.algorand.client.algod.application_box_by_name(
+                    self.client.app_id, name
+                )
+            except AlgodHTTPError:
+                self._box_sizes[name] = 0
+            else:
+                value = response["value"]  # type: ignore[call-overload]
+                self._box_sizes[name] = len(base64.b64decode(value))
+        return self._box_sizes[name]
+
+    def simulate(self, cell: Cell, trace: SimulateTraceConfig) -> dict[str, object]:
+        """Raw simulate response for `cell`, free of reference and budget limits."""
+        result = self.composer(cell).simulate(
+            # Groups and bills of 32 members log more than the 1KB a call may.
+            allow_more_logs=True,
+            allow_unnamed_resources=True,
+            extra_opcode_budget=_EXTRA_OPCODE_BUDGET,
+            exec_trace_config=trace,
+            skip_signatures=True,
+        )
+        return result.simulate_response or {}
+
+    def run(self, cell: Cell) -> dict[str, int]:
+        response = self.simulate(cell, SimulateTraceConfig(enable=True, state_change=True))
+        return measure(response, self.client.app_id, self.box_size)
+
+
+def main(args: argparse.Namespace) -> int:
+    load_dotenv()
+    cells = grid(args.members, args.debtors, args.memo, args.payers_debt, args.keys)
+    fixture = Fixture(algokit_utils.AlgorandClient.from_environment(), cells)
+    results: dict[str, dict[str, int]] = {}
+    for cell in cells:
+        results[cell.key] = fixture.run(cell)
+        print(f"{cell.key:<60} " + " ".join(f"{results[cell.key][m]:>8}" for m in METRICS))
+
+    baseline_path: Path = args.baseline
+    if args.update:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Wrote {len(results)} cells to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update to record one")
+        return 1
+    baseline = json.loads(baseline_path.read_text())
+    regressions = compare(baseline, results, args.threshold)
+    missing = sorted(baseline.keys() - results.keys())
+    if missing:
+        print(f"{len(missing)} baseline cells were not measured, e.g. {missing[0]}")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(results)} cells, {len(regressions)} regressions (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--members", type=int, nargs="+", default=[2, 8, 24])
+    parser.add_argument("--debtors", type=int, nargs="+", default=[1, 2, 8, 32])
+    parser.add_argument("--memo", type=int, nargs="+", default=[1, 32, 256])
+    parser.add_argument("--payers-debt", type=int, nargs="+", default=[0, 1, 8])
+    parser.add_argument("--keys", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.05)
+    parser.add_argument("--update", action="store_true", help="record a new baseline")
+    sys.exit(main(parser.parse_args()))
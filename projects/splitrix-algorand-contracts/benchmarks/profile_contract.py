@@ -0,0 +1,223 @@
+"""
+Profile a Splitrix call by source line and subroutine from a simulate exec trace.
+
+    python -m benchmarks.profile_contract create_bill [--members 8] [--debtors 8]
+        [--memo 32] [--payers-debt 4] [--keys 8] [--top 25] [--folded create_bill.folded]
+    python -m benchmarks.profile_contract --trace simulate_response.json
+
+The call is built by the `opcode_costs` fixture on LocalNet (run `algokit
+project run build` first so the artifacts match `contract.py`) and simulated
+with the exec trace enabled; `--trace` profiles a saved simulate response
+instead. `--keys` sets how many groups or bills `get_groups`/`get_bills` read.
+Every executed pc is mapped to `splitrix/contract.py` through
+`Splitrix.approval.puya.map`. Subroutine costs follow `callsub`/`retsub`, so
+inclusive totals cover callees; subroutines puya inlined, such as
+`check_debtor_exists`, show up through their source lines instead. `--folded`
+writes folded stacks for flamegraph.pl or speedscope.
+"""
+
+import argparse
+import collections
+import dataclasses
+import json
+from collections.abc import Iterable
+from pathlib import Path
+
+import algokit_utils
+from algosdk.v2client.models import SimulateTraceConfig
+from dotenv import load_dotenv
+
+from benchmarks.opcode_costs import Cell, Fixture, fits
+
+ARTIFACTS = Path(__file__).parent.parent / "smart_contracts" / "artifacts" / "splitrix"
+DEFAULT_SOURCE_MAP = ARTIFACTS / "Splitrix.approval.puya.map"
+# Opcodes that cost more than 1; none are used by Splitrix today.
+OPCODE_COSTS = {
+    "sha256": 35,
+    "keccak256": 130,
+    "sha512_256": 45,
+    "sha3_256": 130,
+    "ed25519verify": 1900,
+    "ed25519verify_bare": 1900,
+    "ecdsa_verify": 1700,
+    "ecdsa_pk_decompress": 650,
+    "ecdsa_pk_recover": 2000,
+    "vrf_verify": 5700,
+}
+_BASE64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+_BASE64_VALUES = {char: index for index, char in enumerate(_BASE64)}
+
+
+def _decode_vlq(segment: str) -> list[int]:
+    values = []
+    value = shift = 0
+    for char in segment:
+        digit = _BASE64_VALUES[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+            continue
+        values.append(-(value >> 1) if value & 1 else value >> 1)
+        value = shift = 0
+    return values
+
+
+@dataclasses.dataclass(kw_only=True)
+class SourceMap:
+    """Per-pc op, source line and enclosing subroutine of a puya-compiled program."""
+
+    ops: dict[int, str]
+    lines: dict[int, int]
+    subroutines: dict[int, str]
+    labels: dict[str, str]
+    source: list[str]
+
+    @classmethod
+    def load(cls, path: str | Path = DEFAULT_SOURCE_MAP) -> "SourceMap":
+        path = Path(path)
+        data = json.loads(path.read_text())
+        # puya emits one generated "line" per program byte, so the line index is the pc.
+        lines: dict[int, int] = {}
+        source_line = 0
+        for pc, group in enumerate(data["mappings"].split(";")):
+            for segment in filter(None, group.split(",")):
+                fields = _decode_vlq(segment)
+                if len(fields) >= 4:
+                    source_line += fields[2]
+                    lines.setdefault(pc, source_line + 1)
+        ops: dict[int, str] = {}
+        subroutines: dict[int, str] = {}
+        labels: dict[str, str] = {}
+        current = ""
+        for pc, event in sorted(data["pc_events"].items(), key=lambda item: int(item[0])):
+            if "subroutine" in event:
+                current = event["subroutine"].rsplit(".", 1)[-1]
+                labels[event.get("block", current)] = current
+            ops[int(pc)] = event.get("op", "")
+            subroutines[int(pc)] = current
+        source_path = path.parent / data["sources"][0]
+        source = source_path.read_text().splitlines() if source_path.exists() else []
+        return cls(ops=ops, lines=lines, subroutines=subroutines, labels=labels, source=source)
+
+    def cost(self, pc: int) -> int:
+        op = self.ops.get(pc, "")
+        return OPCODE_COSTS.get(op.split(" ", 1)[0], 1)
+
+
+@dataclasses.dataclass(kw_only=True)
+class Profile:
+    line_cost: collections.Counter[int] = dataclasses.field(default_factory=collections.Counter)
+    self_cost: collections.Counter[str] = dataclasses.field(default_factory=collections.Counter)
+    total_cost: collections.Counter[str] = dataclasses.field(default_factory=collections.Counter)
+    calls: collections.Counter[str] = dataclasses.field(default_factory=collections.Counter)
+    folded: collections.Counter[str] = dataclasses.field(default_factory=collections.Counter)
+    cost: int = 0
+    budget_consumed: int = 0
+
+    def add_trace(self, source_map: SourceMap, pcs: Iterable[int]) -> None:
+        """Attribute one app call's executed pcs, in execution order."""
+        stack: list[str] = []
+        for pc in pcs:
+            if not stack:
+                stack.append(source_map.subroutines.get(pc, "?"))
+            cost = source_map.cost(pc)
+            self.cost += cost
+            self.line_cost[source_map.lines.get(pc, 0)] += cost
+            self.self_cost[stack[-1]] += cost
+            for name in set(stack):
+                self.total_cost[name] += cost
+            self.folded[";".join(stack)] += cost
+            op = source_map.ops.get(pc, "")
+            if op.startswith("callsub "):
+                callee = source_map.labels.get(op.split()[1], op.split()[1])
+                self.calls[callee] += 1
+                stack.append(callee)
+            elif op == "retsub" and len(stack) > 1:
+                stack.pop()
+
+    def add_response(self, source_map: SourceMap, response: dict[str, object]) -> None:
+        for group in response["txn-groups"]:  # type: ignore[attr-defined]
+            for result in group["txn-results"]:
+                self.budget_consumed += result.get("app-budget-consumed", 0)
+                trace = (result.get("exec-trace") or {}).get("approval-program-trace")
+                if trace:
+                    self.add_trace(source_map, (step["pc"] for step in trace))
+
+    def report(self, source_map: SourceMap, top: int = 25) -> str:
+        total = self.cost or 1
+        rows = [f"{'line':>6} {'cost':>8} {'share':>7}  source"]
+        for line, cost in self.line_cost.most_common(top):
+            in_source = 0 < line <= len(source_map.source)
+            text = source_map.source[line - 1].strip() if in_source else ""
+            label = str(line) if line else "-"
+            rows.append(f"{label:>6} {cost:>8} {cost / total:>7.1%}  {text[:70]}")
+        rows.append("")
+        rows.append(f"{'subroutine':<28} {'calls':>7} {'self':>8} {'total':>8} {'share':>7}")
+        for name, inclusive in self.total_cost.most_common():
+            rows.append(
+                f"{name:<28} {self.calls[name]:>7} {self.self_cost[name]:>8} "
+                f"{inclusive:>8} {inclusive / total:>7.1%}"
+            )
+        rows.append("")
+        rows.append(f"attributed cost {self.cost}, app budget consumed {self.budget_consumed}")
+        return "\n".join(rows)
+
+
+def _simulate(args: argparse.Namespace) -> dict[str, object]:
+    load_dotenv()
+    cell = Cell(
+        method=args.method,
+        members=args.members,
+        debtors=args.debtors,
+        memo=args.memo,
+        payers_debt=args.payers_debt,
+        keys=args.keys if args.method in ("get_groups", "get_bills") else 0,
+    )
+    if not fits(cell):
+        raise SystemExit(f"{cell.key} does not fit in one app call")
+    fixture = Fixture(algokit_utils.AlgorandClient.from_environment(), [cell])
+    return fixture.simulate(cell, SimulateTraceConfig(enable=True))
+
+
+def main(args: argparse.Namespace) -> None:
+    source_map = SourceMap.load(args.source_map)
+    if args.trace:
+        response = json.loads(Path(args.trace).read_text())
+    else:
+        response = _simulate(args)
+    profile = Profile()
+    profile.add_response(source_map, response)
+    print(profile.report(source_map, args.top))
+    if args.folded:
+        Path(args.folded).write_text(
+            "".join(f"{stack} {cost}\n" for stack, cost in sorted(profile.folded.items()))
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "method",
+        nargs="?",
+        default="create_bill",
+        choices=[
+            "create_group",
+            "create_bill",
+            "settle_bill",
+            "get_group",
+            "get_bill",
+            "get_groups",
+            "get_bills",
+            "gas",
+        ],
+    )
+    parser.add_argument("--members", type=int, default=8)
+    parser.add_argument("--debtors", type=int, default=8)
+    parser.add_argument("--memo", type=int, default=32)
+    parser.add_argument("--payers-debt", type=int, default=4)
+    parser.add_argument("--keys", type=int, default=8)
+    parser.add_argument("--trace", type=Path, help="saved simulate response to profile")
+    parser.add_argument("--source-map", type=Path, default=DEFAULT_SOURCE_MAP)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--folded", type=Path, help="write folded stacks here")
+    main(parser.parse_args())
@@ -0,0 +1,80 @@
+"""
+Measure signing throughput of `create_bill` groups, in-thread and across a process pool.
+
+    python -m benchmarks.signing_benchmark [--groups 500] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import time
+
+from algosdk import account, transaction
+from algosdk.atomic_transaction_composer import AccountTransactionSigner
+
+from smart_contracts.artifacts.splitrix.splitrix_client import CreateBillArgs
+from smart_contracts.splitrix.abi_args import encode_app_args
+from smart_contracts.splitrix.signing import SigningPool
+
+_GROUP_SIZE = 16
+_GENESIS_HASH = "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI="
+
+
+def _groups(group_count: int, sender: str) -> list[list[transaction.Transaction]]:
+    members = [account.generate_account()[1] for _ in range(8)]
+    sp = transaction.SuggestedParams(1000, 1, 1001, _GENESIS_HASH, "mainnet-v1.0", flat_fee=True)
+    app_args = encode_app_args(
+        CreateBillArgs.abi_method_signature.fget(None),  # type: ignore[attr-defined]
+        [
+            CreateBillArgs(
+                group_id=1,
+                payer=members[0],
+                total_amount=8_000,
+                debtors=[(member, 1_000) for member in members],
+                memo=f"bill {i}",
+                payers_debt=[],
+            )
+            for i in range(group_count * _GROUP_SIZE)
+        ],
+    )
+    txns = [transaction.ApplicationNoOpTxn(sender, sp, 1, args) for args in app_args]
+    groups = [txns[i : i + _GROUP_SIZE] for i in range(0, len(txns), _GROUP_SIZE)]
+    for group in groups:
+        transaction.assign_group_id(group)
+    return groups
+
+
+def main(group_count: int, worker_counts: list[int]) -> None:
+    private_key, sender = account.generate_account()
+    groups = _groups(group_count, sender)
+    indexes = list(range(_GROUP_SIZE))
+    txn_count = group_count * _GROUP_SIZE
+
+    signer = AccountTransactionSigner(private_key)
+    start = time.perf_counter()
+    for group in groups:
+        signer.sign_transactions(group, indexes)
+    baseline = txn_count / (time.perf_counter() - start)
+    print(f"in-thread     {baseline:>10,.0f} txn/s")
+
+    for workers in worker_counts:
+        with SigningPool([private_key], max_workers=workers, chunk_size=_GROUP_SIZE) as pool:
+            # Warm the workers up so start-up cost is not measured.
+            pool.sign_groups([(sender, groups[0], indexes)] * workers)
+            start = time.perf_counter()
+            signed = pool.sign_groups([(sender, group, indexes) for group in groups])
+            rate = txn_count / (time.perf_counter() - start)
+        assert signed[0] == signer.sign_transactions(groups[0], indexes)
+        print(f"{workers:>2} workers    {rate:>10,.0f} txn/s  {rate / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--groups", type=int, default=500)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    args = parser.parse_args()
+    main(args.groups, args.workers)
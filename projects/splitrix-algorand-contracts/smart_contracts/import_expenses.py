@@ -0,0 +1,566 @@
+"""
+Import historical expenses into a deployed Splitrix app.
+
+    python -m smart_contracts.import_expenses expenses.csv --app-id 1234 \\
+        --addresses people.csv [--unit algo] [--checkpoint import.checkpoint.json]
+
+Each input row is one bill. CSV files need the columns `group`, `payer`,
+`amount`, `debtors` and `memo`, where `debtors` is `;`-separated and each
+entry is either `name` (the amount is split evenly) or `name:amount`. JSON-lines
+rows use the same keys, with `debtors` a list of names or a `{name: amount}`
+object. Names are mapped to addresses with `--addresses` (a `name,address` CSV
+or a JSON object); values that already are addresses are used as is.
+
+A first streaming pass collects each group's members and creates the groups
+that do not exist yet, the first payer becoming admin. The second pass streams
+`create_bill` calls through `BulkSubmitter`, so memory stays bounded by the
+submission window, not the file. Before each atomic group of `create_group` calls
+is sent, the group ids it should get are checkpointed; a resumed import reads
+those boxes and adopts the groups whose admin and members match, creates the
+missing ones again and stops if another group took one of the ids.
+
+Progress is checkpointed as the number of fully confirmed rows plus, per group,
+its id, the `bill_counter` it had before the import and how many of its rows
+were imported. A row's bill id is therefore known before it is sent, and on
+resume every row whose bill id is below the group's current on-chain
+`bill_counter` is skipped, so rows confirmed after the last checkpoint are not
+created twice. This assumes nobody else adds bills to the imported groups
+during the import and that the input and address files do not change between
+runs.
+"""
+
+import argparse
+import collections
+import contextlib
+import csv
+import dataclasses
+import decimal
+import json
+import logging
+import math
+import os
+import time
+import typing
+from collections.abc import Iterator
+from pathlib import Path
+
+import algokit_utils
+from algosdk import encoding
+from algosdk.constants import ZERO_ADDRESS
+from dotenv import load_dotenv
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    CreateBillArgs,
+    CreateGroupArgs,
+    SplitrixClient,
+)
+from smart_contracts.splitrix import bulk_reads
+from smart_contracts.splitrix.box_loader import GROUPS_PREFIX
+from smart_contracts.splitrix.bulk_submit import (
+    BOX_IO_BYTES_PER_REF,
+    MAX_GROUP_OPCODE_BUDGET,
+    MAX_GROUP_SIZE,
+    MAX_REFS_PER_APP_CALL,
+    BulkSubmitter,
+    estimate_create_group_cost,
+    gas_calls_needed,
+)
+from smart_contracts.splitrix.codec import U64, group_size
+
+logger = logging.getLogger(__name__)
+
+_MICRO_ALGOS_PER_ALGO = 1_000_000
+
+
+class RowError(ValueError):
+    """An input row that cannot become a bill; it is reported and skipped."""
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Expense:
+    row: int
+    group: str
+    payer: str
+    debtors: list[tuple[str, int]]
+    memo: str
+
+
+# ---------------------------- Input parsing ---------------------------- #
+
+
+def load_addresses(path: str | os.PathLike[str] | None) -> dict[str, str]:
+    """Name to address map from a `name,address` CSV or a JSON object."""
+    if path is None:
+        return {}
+    path = Path(path)
+    if path.suffix == ".json":
+        return typing.cast(dict[str, str], json.loads(path.read_text()))
+    with path.open(newline="") as file:
+        return {row[0].strip(): row[1].strip() for row in csv.reader(file) if len(row) >= 2}
+
+
+def _parse_amount(value: object, unit: str) -> int:
+    try:
+        amount = decimal.Decimal(str(value).strip())
+    except decimal.InvalidOperation:
+        raise RowError(f"Invalid amount {value!r}") from None
+    if unit == "algo":
+        amount *= _MICRO_ALGOS_PER_ALGO
+    if amount < 0 or amount != amount.to_integral_value():
+        raise RowError(f"Amount {value!r} is not a whole number of microAlgos")
+    return int(amount)
+
+
+def _raw_rows(path: Path, input_format: str) -> Iterator[object]:
+    with path.open(newline="") as file:
+        if input_format == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # Still a row, so later rows keep their numbers.
+                        yield line
+
+
+def _split_debtors(raw: object, unit: str) -> list[tuple[str, int | None]]:
+    if isinstance(raw, dict):
+        return [(str(name), _parse_amount(value, unit)) for name, value in raw.items()]
+    entries = raw if isinstance(raw, list) else str(raw or "").split(";")
+    debtors: list[tuple[str, int | None]] = []
+    for entry in entries:
+        name, _, share = str(entry).partition(":")
+        if name.strip():
+            debtors.append((name.strip(), _parse_amount(share, unit) if share else None))
+    return debtors
+
+
+class ExpenseReader:
+    """Streams `Expense`s from a CSV or JSON-lines file, resolving names to addresses."""
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        addresses: dict[str, str],
+        *,
+        input_format: str = "auto",
+        unit: str = "microalgo",
+    ) -> None:
+        self.path = Path(path)
+        self.addresses = addresses
+        if input_format == "auto":
+            input_format = "csv" if self.path.suffix.lower() == ".csv" else "jsonl"
+        self.input_format = input_format
+        self.unit = unit
+
+    def address(self, name: str) -> str:
+        address = self.addresses.get(name, name)
+        if not encoding.is_valid_address(address) or address == ZERO_ADDRESS:
+            raise RowError(f"No address for {name!r}")
+        return address
+
+    def _expense(self, row: int, raw: object) -> Expense:
+        if not isinstance(raw, dict):
+            raise RowError("Not a JSON object")
+        group = str(raw.get("group") or "").strip()
+        if not group:
+            raise RowError("Missing group")
+        payer = self.address(str(raw.get("payer") or "").strip())
+        amount = _parse_amount(raw.get("amount") or 0, self.unit)
+        debtors = _split_debtors(raw.get("debtors"), self.unit)
+        if not debtors:
+            raise RowError("No debtors")
+        explicit = sum(share for _, share in debtors if share is not None)
+        implicit = [index for index, (_, share) in enumerate(debtors) if share is None]
+        if implicit:
+            remaining = amount - explicit
+            if remaining < 0:
+                raise RowError(f"Debtor amounts exceed the total {amount}")
+            share, extra = divmod(remaining, len(implicit))
+            for position, index in enumerate(implicit):
+                debtors[index] = (debtors[index][0], share + (position < extra))
+        elif amount and explicit != amount:
+            raise RowError(f"Debtor amounts add up to {explicit}, not {amount}")
+        # The contract keeps the first entry per debtor, so repeated names are merged here.
+        merged: dict[str, int] = collections.defaultdict(int)
+        for name, share in debtors:
+            merged[self.address(name)] += typing.cast(int, share)
+        if not sum(merged.values()):
+            raise RowError("Total amount must be greater than 0")
+        memo = str(raw.get("memo") or "").strip() or f"Imported expense {row}"
+        return Expense(row=row, group=group, payer=payer, debtors=list(merged.items()), memo=memo)
+
+    def __iter__(self) -> Iterator[Expense | tuple[int, RowError]]:
+        """Expenses in file order, with `(row, error)` in place of rows that are invalid."""
+        for row, raw in enumerate(_raw_rows(self.path, self.input_format)):
+            try:
+                yield self._expense(row, raw)
+            except RowError as error:
+                yield row, error
+
+
+# ------------------------------ Checkpoint ------------------------------ #
+
+
+@dataclasses.dataclass(kw_only=True)
+class ImportedGroup:
+    group_id: int
+    base_counter: int
+    imported: int = 0
+
+
+@dataclasses.dataclass(kw_only=True)
+class ImportCheckpoint:
+    """Rows fully handled so far and per-group progress, persisted atomically as JSON."""
+
+    path: Path
+    app_id: int
+    source: str
+    rows: int = 0
+    groups: dict[str, ImportedGroup] = dataclasses.field(default_factory=dict)
+    # Group name -> predicted group id, for `create_group` calls sent but not confirmed.
+    creating: dict[str, int] = dataclasses.field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str], app_id: int, source: str) -> "ImportCheckpoint":
+        path = Path(path)
+        if not path.exists():
+            return cls(path=path, app_id=app_id, source=source)
+        data = json.loads(path.read_text())
+        if data["app_id"] != app_id or data["source"] != source:
+            raise ValueError(
+                f"Checkpoint {path} belongs to {data['source']} on app {data['app_id']}"
+            )
+        return cls(
+            path=path,
+            app_id=app_id,
+            source=source,
+            rows=data["rows"],
+            groups={name: ImportedGroup(**group) for name, group in data["groups"].items()},
+            creating=data.get("creating", {}),
+        )
+
+    def save(self) -> None:
+        data = {
+            "app_id": self.app_id,
+            "source": self.source,
+            "rows": self.rows,
+            "groups": {name: dataclasses.asdict(group) for name, group in self.groups.items()},
+            "creating": self.creating,
+        }
+        temporary = self.path.with_suffix(self.path.suffix + ".tmp")
+        temporary.write_text(json.dumps(data))
+        os.replace(temporary, self.path)
+
+
+# -------------------------------- Import -------------------------------- #
+
+
+@dataclasses.dataclass(kw_only=True)
+class _PendingRow:
+    row: int
+    group: str | None = None
+    imported: int = 0
+    done: bool = True
+
+
+@dataclasses.dataclass(kw_only=True)
+class ImportStats:
+    imported: int = 0
+    skipped: int = 0
+    rejected: int = 0
+    groups_created: int = 0
+
+
+def _collect_members(
+    reader: ExpenseReader, known: typing.Container[str]
+) -> dict[str, dict[str, None]]:
+    """Ordered members of each group not created yet, payers first seen first."""
+    members: dict[str, dict[str, None]] = {}
+    for expense in reader:
+        if isinstance(expense, Expense) and expense.group not in known:
+            group = members.setdefault(expense.group, {})
+            group.setdefault(expense.payer)
+            for debtor, _ in expense.debtors:
+                group.setdefault(debtor)
+    return members
+
+
+def _resume_creating(
+    client: SplitrixClient,
+    members: dict[str, dict[str, None]],
+    checkpoint: ImportCheckpoint,
+    *,
+    sender: str,
+) -> int:
+    """
+    Settle the `create_group` calls a previous run sent without seeing them
+    confirmed: adopt the groups found at their predicted ids, leave the others
+    to be created again. Returns how many groups were adopted.
+    """
+    names = list(checkpoint.creating)
+    group_ids = [checkpoint.creating[name] for name in names]
+    on_chain = bulk_reads.get_groups(client, group_ids, sender=sender)
+    adopted = 0
+    for name, group_id, group in zip(names, group_ids, on_chain, strict=True):
+        if group is None:
+            logger.info(f"Group {name!r} was not created before the import stopped")
+            continue
+        expected = list(members.get(name, ()))
+        if not expected or group.admin != expected[0] or list(group.members) != expected:
+            raise ValueError(
+                f"Group {group_id} was expected to be {name!r} but has admin {group.admin} "
+                f"and members {group.members}; it was created by someone else"
+            )
+        checkpoint.groups[name] = ImportedGroup(group_id=group_id, base_counter=0)
+        adopted += 1
+    checkpoint.creating.clear()
+    checkpoint.save()
+    if adopted:
+        logger.info(f"Found {adopted} groups created before the import stopped")
+    return adopted
+
+
+def create_groups(
+    client: SplitrixClient,
+    members: dict[str, dict[str, None]],
+    checkpoint: ImportCheckpoint,
+    *,
+    sender: str,
+) -> int:
+    """
+    Create the groups in `members`, padding each atomic group with `gas()` calls
+    to cover the estimated opcode cost. The ids an atomic group should get are
+    checkpointed before it is sent and its confirmed ids after.
+    """
+    created = 0
+    if checkpoint.creating:
+        created += _resume_creating(client, members, checkpoint, sender=sender)
+    pending: list[tuple[str, list[str]]] = []
+    for name, group in members.items():
+        if name in checkpoint.groups:
+            continue
+        if len(group) < 2:
+            logger.warning(f"Group {name!r} has a single member and cannot be created")
+        elif 1 + gas_calls_needed(estimate_create_group_cost(len(group))) > MAX_GROUP_SIZE:
+            logger.warning(
+                f"Group {name!r} has {len(group)} members, creating it needs more than "
+                f"the {MAX_GROUP_OPCODE_BUDGET} opcodes an atomic group can pool"
+            )
+        else:
+            pending.append((name, list(group)))
+    while pending:
+        next_id = client.state.global_state.group_counter
+        composer = client.new_group()
+        batch: list[str] = []
+        cost = 0
+        while pending:
+            name, group = pending[0]
+            group_cost = estimate_create_group_cost(len(group))
+            calls = len(batch) + 1
+            if calls + gas_calls_needed(cost + group_cost, calls) > MAX_GROUP_SIZE:
+                break
+            box_refs = math.ceil(group_size(len(group)) / BOX_IO_BYTES_PER_REF)
+            if box_refs > MAX_REFS_PER_APP_CALL:
+                raise ValueError(f"Group {name!r} has too many members for one app call")
+            group_box = GROUPS_PREFIX + U64.pack(next_id + len(batch))
+            composer.create_group(
+                CreateGroupArgs(admin=group[0], members=group[1:]),
+                algokit_utils.CommonAppCallParams(
+                    sender=sender,
+                    box_references=[
+                        algokit_utils.BoxReference(app_id=0, name=name_bytes)
+                        for name_bytes in [group_box] + [b""] * (box_refs - 1)
+                    ],
+                ),
+            )
+            batch.append(name)
+            cost += group_cost
+            pending.pop(0)
+        for index in range(gas_calls_needed(cost, len(batch))):
+            composer.gas(
+                algokit_utils.CommonAppCallParams(
+                    sender=sender,
+                    # Identical gas() calls would share a transaction id.
+                    note=f"import gas {index}".encode(),
+                )
+            )
+        checkpoint.creating = {name: next_id + index for index, name in enumerate(batch)}
+        checkpoint.save()
+        result = composer.send()
+        for name, returned in zip(batch, result.returns[: len(batch)], strict=True):
+            checkpoint.groups[name] = ImportedGroup(
+                group_id=typing.cast(int, returned.value), base_counter=0
+            )
+        checkpoint.creating = {}
+        checkpoint.save()
+        created += len(batch)
+        logger.info(f"Created {created} groups")
+    return created
+
+
+def run_import(
+    client: SplitrixClient,
+    reader: ExpenseReader,
+    checkpoint: ImportCheckpoint,
+    *,
+    sender: str,
+    max_in_flight: int = 32,
+    prefetch_window: int = 512,
+    checkpoint_interval: float = 5.0,
+    rejects: typing.TextIO | None = None,
+) -> ImportStats:
+    """Create every remaining bill of `reader`, resuming from `checkpoint`."""
+    stats = ImportStats()
+    stats.groups_created = create_groups(
+        client, _collect_members(reader, checkpoint.groups), checkpoint, sender=sender
+    )
+    names = sorted(checkpoint.groups)
+    group_ids = [checkpoint.groups[name].group_id for name in names]
+    on_chain = bulk_reads.get_groups(client, group_ids, sender=sender) if names else []
+    counters = {
+        name: group.bill_counter
+        for name, group in zip(names, on_chain, strict=True)
+        if group is not None
+    }
+    imported = {name: group.imported for name, group in checkpoint.groups.items()}
+    # Every row past the checkpoint, in file order, until it and all rows before it are done.
+    window: collections.deque[_PendingRow] = collections.deque()
+    # Submission index -> (row, expected bill id) for bills in flight.
+    in_flight: dict[int, tuple[_PendingRow, int]] = {}
+
+    def reject(row: int, error: Exception) -> None:
+        stats.rejected += 1
+        logger.warning(f"Row {row} rejected: {error}")
+        if rejects is not None:
+            rejects.write(json.dumps({"row": row, "error": str(error)}) + "\n")
+
+    def items() -> Iterator[CreateBillArgs]:
+        for expense in reader:
+            if isinstance(expense, tuple):
+                row, error = expense
+                if row >= checkpoint.rows:
+                    reject(row, error)
+                    window.append(_PendingRow(row=row))
+                continue
+            if expense.row < checkpoint.rows:
+                continue
+            group = checkpoint.groups.get(expense.group)
+            if group is None or expense.group not in counters:
+                reject(expense.row, RowError(f"Group {expense.group!r} was not created"))
+                window.append(_PendingRow(row=expense.row))
+                continue
+            bill_id = group.base_counter + imported[expense.group]
+            imported[expense.group] += 1
+            pending = _PendingRow(
+                row=expense.row, group=expense.group, imported=imported[expense.group]
+            )
+            window.append(pending)
+            if bill_id < counters[expense.group]:
+                stats.skipped += 1
+                continue
+            pending.done = False
+            in_flight[len(in_flight) + stats.imported] = (pending, bill_id)
+            yield CreateBillArgs(
+                group_id=group.group_id,
+                payer=expense.payer,
+                total_amount=sum(amount for _, amount in expense.debtors),
+                debtors=expense.debtors,
+                memo=expense.memo,
+                payers_debt=[],
+            )
+
+    def advance() -> None:
+        while window and window[0].done:
+            pending = window.popleft()
+            checkpoint.rows = pending.row + 1
+            if pending.group is not None:
+                checkpoint.groups[pending.group].imported = pending.imported
+
+    submitter = BulkSubmitter(
+        client, sender, max_in_flight=max_in_flight, prefetch_window=prefetch_window
+    )
+    last_save = time.monotonic()
+    try:
+        for result in submitter.submit_iter(items()):
+            pending, expected = in_flight.pop(result.index)
+            if result.error is not None:
+                raise RuntimeError(
+                    f"Row {pending.row} failed, fix it and re-run to resume: {result.error}"
+                ) from result.error
+            if result.bill_id != expected:
+                logger.warning(
+                    f"Row {pending.row} became bill {result.bill_id}, expected {expected}; "
+                    "were bills added to the group during the import?"
+                )
+            stats.imported += 1
+            pending.done = True
+            advance()
+            if time.monotonic() - last_save >= checkpoint_interval:
+                checkpoint.save()
+                last_save = time.monotonic()
+                logger.info(
+                    f"{checkpoint.rows} rows done: {stats.imported} imported, "
+                    f"{stats.skipped} already on chain, {stats.rejected} rejected"
+                )
+        advance()
+    finally:
+        checkpoint.save()
+    return stats
+
+
+# --------------------------------- CLI --------------------------------- #
+
+
+def main(argv: list[str] | None = None) -> ImportStats:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("input", type=Path, help="CSV or JSON-lines expense file")
+    parser.add_argument("--app-id", type=int, required=True)
+    parser.add_argument("--addresses", type=Path, help="name,address CSV or JSON object")
+    parser.add_argument("--format", choices=["auto", "csv", "jsonl"], default="auto")
+    parser.add_argument("--unit", choices=["microalgo", "algo"], default="microalgo")
+    parser.add_argument("--checkpoint", type=Path, help="defaults to <input>.checkpoint.json")
+    parser.add_argument("--rejects", type=Path, help="JSON-lines file for rejected rows")
+    parser.add_argument("--sender", default="DEPLOYER", help="environment account name")
+    parser.add_argument("--max-in-flight", type=int, default=32)
+    parser.add_argument("--prefetch-window", type=int, default=512)
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    algorand = algokit_utils.AlgorandClient.from_environment()
+    sender = algorand.account.from_environment(args.sender)
+    client = algorand.client.get_typed_app_client_by_id(
+        SplitrixClient, app_id=args.app_id, default_sender=sender.address
+    )
+    reader = ExpenseReader(
+        args.input,
+        load_addresses(args.addresses),
+        input_format=args.format,
+        unit=args.unit,
+    )
+    checkpoint = ImportCheckpoint.load(
+        args.checkpoint or args.input.with_name(args.input.name + ".checkpoint.json"),
+        args.app_id,
+        str(args.input.resolve()),
+    )
+    if checkpoint.rows:
+        logger.info(f"Resuming {args.input} after row {checkpoint.rows}")
+    with open(args.rejects, "a") if args.rejects else contextlib.nullcontext() as rejects:
+        stats = run_import(
+            client,
+            reader,
+            checkpoint,
+            sender=sender.address,
+            max_in_flight=args.max_in_flight,
+            prefetch_window=args.prefetch_window,
+            rejects=rejects,
+        )
+    logger.info(f"Import finished: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-10s: %(message)s")
+    main()
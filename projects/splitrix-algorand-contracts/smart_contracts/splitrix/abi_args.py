@@ -0,0 +1,172 @@
+"""
+Precompiled ABI argument converters and a bulk encoder for high-rate submission.
+
+`parse_abi_args` is a drop-in for the generated client's `_parse_abi_args` that
+compiles one converter per dataclass type instead of walking `dataclasses.fields`
+on every call. `encode_app_args` goes further and turns argument lists straight
+into application-call `app_args`, reusing the method selector and ABI types.
+"""
+
+import dataclasses
+import functools
+import operator
+import typing
+from collections.abc import Callable, Iterable, Sequence
+
+import algokit_utils
+from algosdk import abi
+
+from smart_contracts.artifacts.splitrix.splitrix_client import CreateBillArgs
+from smart_contracts.splitrix.codec import (
+    U16,
+    U64,
+    address_to_bytes,
+    encode_payer_debt,
+)
+
+_Converter = Callable[[typing.Any], typing.Any]
+
+
+def _convert_any(value: typing.Any) -> typing.Any:
+    """Fallback for values whose type is only known at runtime."""
+    if isinstance(value, algokit_utils.AppMethodCallTransactionArgument):
+        return value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return converter_for(type(value))(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(_convert_any(item) for item in value)
+    return value
+
+
+def _field_converter(field_type: object) -> _Converter | None:
+    if isinstance(field_type, type) and dataclasses.is_dataclass(field_type):
+        nested = converter_for(field_type)
+        return lambda value: nested(value) if dataclasses.is_dataclass(value) else value
+    if field_type in (int, str, bool, bytes):
+        return None
+    origin = typing.get_origin(field_type)
+    item_types = typing.get_args(field_type)
+    if origin in (list, tuple) and all(
+        _field_converter(item_type) is None for item_type in item_types
+    ):
+        return None
+    return _convert_any
+
+
+@functools.cache
+def converter_for(cls: type) -> Callable[[typing.Any], tuple]:
+    """Compile a dataclass-to-tuple converter for `cls`, cached per class."""
+    fields = dataclasses.fields(cls)
+    names = [field.name for field in fields]
+    get_values = (
+        operator.attrgetter(*names)
+        if len(names) > 1
+        else lambda value: tuple(getattr(value, name) for name in names)
+    )
+    converters = [
+        (index, convert)
+        for index, field in enumerate(fields)
+        if (convert := _field_converter(field.type)) is not None
+    ]
+    if not converters:
+        return get_values  # type: ignore[return-value]
+
+    def convert(value: typing.Any) -> tuple:
+        values = list(get_values(value))
+        for index, convert_field in converters:
+            values[index] = convert_field(values[index])
+        return tuple(values)
+
+    return convert
+
+
+def parse_abi_args(args: object | None = None) -> list[object] | None:
+    """Same contract as the generated `_parse_abi_args`, with cached converters."""
+    if args is None:
+        return None
+
+    match args:
+        case tuple():
+            method_args = [_convert_any(arg) for arg in args]
+        case _ if dataclasses.is_dataclass(args):
+            method_args = list(converter_for(type(args))(args))
+        case _:
+            raise ValueError(
+                "Invalid 'args' type. Expected 'tuple' or 'TypedDict' for respective typed arguments."
+            )
+
+    return method_args or None
+
+
+@functools.cache
+def method_for(signature: str) -> abi.Method:
+    return abi.Method.from_signature(signature)
+
+
+def _encode_create_bill(args: Sequence[typing.Any]) -> list[bytes]:
+    group_id, payer, total_amount, debtors, memo, payers_debt = args
+    memo_bytes = memo.encode("utf-8")
+    return [
+        U64.pack(group_id),
+        address_to_bytes(payer),
+        U64.pack(total_amount),
+        b"".join(
+            [
+                U16.pack(len(debtors)),
+                *(address_to_bytes(debtor) + U64.pack(amount) for debtor, amount in debtors),
+            ]
+        ),
+        U16.pack(len(memo_bytes)) + memo_bytes,
+        b"".join(
+            [U16.pack(len(payers_debt)), *(encode_payer_debt(tuple(pd)) for pd in payers_debt)]  # type: ignore[arg-type]
+        ),
+    ]
+
+
+_FAST_ENCODERS: dict[str, Callable[[Sequence[typing.Any]], list[bytes]]] = {
+    CreateBillArgs.abi_method_signature.fget(None): _encode_create_bill,  # type: ignore[attr-defined]
+}
+
+
+@functools.cache
+def _abi_arg_positions(signature: str) -> tuple[int, ...]:
+    return tuple(
+        i
+        for i, arg in enumerate(method_for(signature).args)
+        if not abi.is_abi_transaction_type(arg.type)
+    )
+
+
+@functools.cache
+def _generic_encoder(signature: str) -> Callable[[Sequence[typing.Any]], list[bytes]]:
+    args = method_for(signature).args
+    types = [args[i].type for i in _abi_arg_positions(signature)]
+
+    def encode(values: Sequence[typing.Any]) -> list[bytes]:
+        return [abi_type.encode(value) for abi_type, value in zip(types, values, strict=True)]  # type: ignore[union-attr]
+
+    return encode
+
+
+def encode_app_args(
+    signature: str, args_list: Iterable[object]
+) -> list[list[bytes]]:
+    """
+    Encode many calls of one method into `app_args` lists (selector first).
+
+    Each item is a tuple or args dataclass as accepted by the generated client.
+    Transaction arguments, such as `settle_bill`'s payment, are skipped since they
+    are passed as group members rather than application arguments.
+    """
+    selector = method_for(signature).get_selector()
+    positions = _abi_arg_positions(signature)
+    encode = _FAST_ENCODERS.get(signature) or _generic_encoder(signature)
+    encoded = []
+    for args in args_list:
+        values = (
+            converter_for(type(args))(args)
+            if dataclasses.is_dataclass(args)
+            else tuple(_convert_any(arg) for arg in args)  # type: ignore[attr-defined]
+        )
+        encoded.append([selector, *encode([values[i] for i in positions])])
+    return encoded
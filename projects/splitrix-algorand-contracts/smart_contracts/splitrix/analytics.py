@@ -0,0 +1,250 @@
+"""
+Vectorized balances and debt matrices over Splitrix bills.
+
+Bills are flattened into `DebtColumns`: one row per debtor entry, holding the
+bill, payer index, debtor index, amount and paid columns as NumPy arrays.
+Indexes point into `DebtColumns.addresses`, so every aggregate is a handful of
+array operations instead of a Python loop over `Bill.debtors`. A `CompactState`
+(or a `SplitrixMirror`'s) converts without decoding a single bill, its debtor
+columns are already flat arrays.
+
+Sums are exact `int64` arithmetic. Bill amounts are arbitrary uint64 values on
+chain, so building columns raises `OverflowError` when the amounts of the rows add
+up to 2**63 or more; below that no balance or total can wrap. NumPy is an optional
+dependency (the `analytics` extra), needed only by this module.
+"""
+
+import dataclasses
+import typing
+from collections.abc import Iterable, Mapping, Sequence
+
+from smart_contracts.artifacts.splitrix.splitrix_client import Bill, BillKey
+from smart_contracts.splitrix.compact import CompactState
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+if typing.TYPE_CHECKING:
+    from numpy.typing import NDArray
+else:
+    NDArray = typing.Any
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("smart_contracts.splitrix.analytics needs NumPy: pip install numpy")
+
+
+def _to_int64(
+    amount: "NDArray[np.uint64]", paid: "NDArray[np.uint64]"
+) -> tuple["NDArray[np.int64]", "NDArray[np.int64]"]:
+    """Convert amount columns, raising rather than wrapping once their total passes int64."""
+    # Split into 32-bit halves so neither partial sum can wrap, for up to 2**32 rows.
+    high = int((amount >> np.uint64(32)).sum(dtype=np.uint64))
+    low = int((amount & np.uint64(0xFFFFFFFF)).sum(dtype=np.uint64))
+    total = (high << 32) + low
+    if total >= 2**63:
+        raise OverflowError(f"Bill amounts add up to {total}, past the int64 analytics range")
+    # `paid` never exceeds `amount` row by row, so it is in range too.
+    return amount.astype(np.int64), paid.astype(np.int64)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class DebtColumns:
+    """One row per debtor entry; `payer`/`debtor` index into `addresses`."""
+
+    addresses: list[str]
+    group_id: "NDArray[np.uint64]"
+    bill_id: "NDArray[np.uint64]"
+    payer: "NDArray[np.int64]"
+    debtor: "NDArray[np.int64]"
+    amount: "NDArray[np.int64]"
+    paid: "NDArray[np.int64]"
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    def index_of(self, address: str) -> int | None:
+        try:
+            return self.addresses.index(address)
+        except ValueError:
+            return None
+
+
+def columns_from_bills(
+    bills: Mapping[BillKey, Bill] | Iterable[tuple[BillKey, Bill]],
+    addresses: Sequence[str] = (),
+) -> DebtColumns:
+    """
+    Flatten decoded bills. Pass a group's `members` as `addresses` to have
+    indexes follow member order; unseen addresses are appended after them.
+    """
+    _require_numpy()
+    items = bills.items() if isinstance(bills, Mapping) else bills
+    ids = {address: index for index, address in enumerate(dict.fromkeys(addresses))}
+    group_ids: list[int] = []
+    bill_ids: list[int] = []
+    payers: list[int] = []
+    debtors: list[int] = []
+    amounts: list[int] = []
+    paid: list[int] = []
+    for key, bill in items:
+        payer = ids.setdefault(bill.payer, len(ids))
+        for debtor, amount, debtor_paid in bill.debtors:
+            group_ids.append(key.group_id)
+            bill_ids.append(key.bill_id)
+            payers.append(payer)
+            debtors.append(ids.setdefault(debtor, len(ids)))  # type: ignore[arg-type]
+            amounts.append(amount)  # type: ignore[arg-type]
+            paid.append(debtor_paid)  # type: ignore[arg-type]
+    amount_column, paid_column = _to_int64(
+        np.array(amounts, dtype=np.uint64), np.array(paid, dtype=np.uint64)
+    )
+    return DebtColumns(
+        addresses=list(ids),
+        group_id=np.array(group_ids, dtype=np.uint64),
+        bill_id=np.array(bill_ids, dtype=np.uint64),
+        payer=np.array(payers, dtype=np.int64),
+        debtor=np.array(debtors, dtype=np.int64),
+        amount=amount_column,
+        paid=paid_column,
+    )
+
+
+def columns_from_compact(state: CompactState, group_id: int | None = None) -> DebtColumns:
+    """
+    Gather the debtor rows of every bill, or of one group's bills, straight from
+    the state's columns. With `group_id`, indexes follow the group's member order.
+    """
+    _require_numpy()
+    selected = [
+        (key, bill)
+        for key, bill in state.bills.items()
+        if group_id is None or key[0] == group_id
+    ]
+    counts = np.fromiter((bill.count for _, bill in selected), np.int64, len(selected))
+    starts = np.fromiter((bill.start for _, bill in selected), np.int64, len(selected))
+    total = int(counts.sum())
+    # Row numbers of each bill's `start:start + count` slice, concatenated.
+    rows = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+    global_debtor = np.frombuffer(state.debtors, dtype=np.uint32)[rows].astype(np.int64)
+    global_payer = np.repeat(
+        np.fromiter((bill.payer for _, bill in selected), np.int64, len(selected)), counts
+    )
+
+    group = state.groups.get(group_id) if group_id is not None else None
+    members = (
+        np.array(list(dict.fromkeys(group.members)), dtype=np.int64)
+        if group is not None
+        else np.empty(0, dtype=np.int64)
+    )
+    used = np.unique(np.concatenate([global_payer, global_debtor]))
+    ids = np.concatenate([members, used[~np.isin(used, members)]])
+    lookup = np.full(len(state.addresses), -1, dtype=np.int64)
+    lookup[ids] = np.arange(len(ids))
+    amount, paid = _to_int64(
+        np.frombuffer(state.amounts, dtype=np.uint64)[rows],
+        np.frombuffer(state.paid, dtype=np.uint64)[rows],
+    )
+    return DebtColumns(
+        addresses=[state.addresses.address(int(address_id)) for address_id in ids],
+        group_id=np.repeat(
+            np.fromiter((key[0] for key, _ in selected), np.uint64, len(selected)), counts
+        ),
+        bill_id=np.repeat(
+            np.fromiter((key[1] for key, _ in selected), np.uint64, len(selected)), counts
+        ),
+        payer=lookup[global_payer],
+        debtor=lookup[global_debtor],
+        amount=amount,
+        paid=paid,
+    )
+
+
+def outstanding(columns: DebtColumns) -> "NDArray[np.int64]":
+    """Amount still owed per row; the payer's own share never counts as debt."""
+    _require_numpy()
+    owed = columns.amount - columns.paid
+    owed[columns.debtor == columns.payer] = 0
+    return owed
+
+
+def net_balances(columns: DebtColumns) -> "NDArray[np.int64]":
+    """What others owe each address minus what it owes, indexed like `addresses`."""
+    _require_numpy()
+    owed = outstanding(columns)
+    balances = np.zeros(len(columns.addresses), dtype=np.int64)
+    np.add.at(balances, columns.payer, owed)
+    np.subtract.at(balances, columns.debtor, owed)
+    return balances
+
+
+def debt_matrix(columns: DebtColumns) -> "NDArray[np.int64]":
+    """
+    Dense `[debtor, creditor]` matrix of outstanding amounts. Sized by the
+    number of addresses squared, so meant for one group's columns; use
+    `debt_pairs` across a whole app.
+    """
+    _require_numpy()
+    size = len(columns.addresses)
+    matrix = np.zeros(size * size, dtype=np.int64)
+    np.add.at(matrix, columns.debtor * size + columns.payer, outstanding(columns))
+    return matrix.reshape(size, size)
+
+
+def net_debt_matrix(columns: DebtColumns) -> "NDArray[np.int64]":
+    """`debt_matrix` with opposite debts cancelled: positive entries only, one per pair."""
+    matrix = debt_matrix(columns)
+    return np.maximum(matrix - matrix.T, 0)  # type: ignore[no-any-return]
+
+
+def debt_pairs(
+    columns: DebtColumns,
+) -> tuple["NDArray[np.int64]", "NDArray[np.int64]", "NDArray[np.int64]"]:
+    """Sparse form of `debt_matrix`: `(debtor, creditor, amount)` arrays of non-zero debts."""
+    _require_numpy()
+    owed = outstanding(columns)
+    mask = owed > 0
+    size = len(columns.addresses)
+    pair_keys = columns.debtor[mask] * size + columns.payer[mask]
+    unique_keys, inverse = np.unique(pair_keys, return_inverse=True)
+    amounts = np.zeros(len(unique_keys), dtype=np.int64)
+    np.add.at(amounts, inverse, owed[mask])
+    return unique_keys // size, unique_keys % size, amounts
+
+
+def outstanding_by_bill(
+    columns: DebtColumns,
+) -> tuple["NDArray[np.uint64]", "NDArray[np.uint64]", "NDArray[np.int64]"]:
+    """`(group_id, bill_id, outstanding)` for every bill, sorted by key."""
+    _require_numpy()
+    if not len(columns):
+        empty = np.empty(0, dtype=np.uint64)
+        return empty, empty, np.empty(0, dtype=np.int64)
+    # Both constructors emit each bill's rows contiguously, so bills are runs.
+    changed = (np.diff(columns.group_id) != 0) | (np.diff(columns.bill_id) != 0)
+    starts = np.concatenate([[0], np.flatnonzero(changed) + 1])
+    sums = np.add.reduceat(outstanding(columns), starts)
+    group_ids, bill_ids = columns.group_id[starts], columns.bill_id[starts]
+    order = np.lexsort((bill_ids, group_ids))
+    return group_ids[order], bill_ids[order], sums[order]
+
+
+def totals(columns: DebtColumns) -> dict[str, int]:
+    """Amount, paid and outstanding summed over every row."""
+    _require_numpy()
+    return {
+        "amount": int(columns.amount.sum()),
+        "paid": int(columns.paid.sum()),
+        "outstanding": int(outstanding(columns).sum()),
+    }
+
+
+def balances_by_address(columns: DebtColumns) -> dict[str, int]:
+    """`net_balances` keyed by address, skipping settled members."""
+    balances = net_balances(columns)
+    return {
+        columns.addresses[index]: int(balances[index]) for index in np.flatnonzero(balances)
+    }
@@ -0,0 +1,873 @@
+"""
+asyncio-native Splitrix client.
+
+Mirrors the generated client's surface (`send.create_bill`, `new_group()`,
+`state.box.bills.get_value`, ...) on top of `AsyncAlgod`, a pooled
+`httpx.AsyncClient` transport, so a single event loop can keep hundreds of
+algod requests in flight. Transactions are still built and signed with algosdk;
+only network I/O is asynchronous. Deployment stays with the synchronous
+`SplitrixFactory`.
+"""
+
+import asyncio
+import base64
+import dataclasses
+import logging
+import typing
+from collections.abc import Callable, Sequence
+
+import algokit_utils
+import httpx
+from algosdk import abi, encoding, error, transaction
+from algosdk.atomic_transaction_composer import TransactionSigner, TransactionWithSigner
+from algosdk.v2client.algod import AlgodClient
+from algosdk.v2client.models import SimulateRequest, SimulateRequestTransactionGroup
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    CreateBillArgs,
+    CreateGroupArgs,
+    GetBillArgs,
+    GetBillsArgs,
+    GetGroupArgs,
+    GetGroupsArgs,
+    Group,
+    SettleBillArgs,
+    SplitrixClient,
+)
+from smart_contracts.splitrix.abi_args import encode_app_args, method_for, parse_abi_args
+from smart_contracts.splitrix.box_loader import (
+    BILLS_PREFIX,
+    GROUPS_PREFIX,
+    bill_key_from_box_name,
+    group_id_from_box_name,
+)
+from smart_contracts.splitrix.codec import BILL_KEY_LAYOUT, U64, decode_bill, decode_group
+from smart_contracts.splitrix.retry import NOT_PROCESSED_STATUS_CODES, RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+_T = typing.TypeVar("_T")
+
+_RETURN_PREFIX = bytes.fromhex("151f7c75")
+MAX_REFS_PER_APP_CALL = 8
+
+
+class AsyncAlgod:
+    """Pooled, retrying asynchronous algod transport covering what the client needs."""
+
+    def __init__(
+        self,
+        algod_address: str,
+        algod_token: str = "",
+        headers: dict[str, str] | None = None,
+        *,
+        max_connections: int = 256,
+        retries: int = 5,
+        backoff: float = 0.2,
+        timeout: float = 30.0,
+    ) -> None:
+        request_headers = {"X-Algo-API-Token": algod_token} if algod_token else {}
+        request_headers.update(headers or {})
+        self.retry = RetryPolicy(retries=retries, backoff=backoff)
+        # A 5xx on submit may come after algod accepted the group, so only
+        # requests turned away unprocessed are sent again.
+        self._submit_retry = dataclasses.replace(
+            self.retry, status_codes=NOT_PROCESSED_STATUS_CODES
+        )
+        self._http = httpx.AsyncClient(
+            base_url=f"{algod_address.rstrip('/')}/v2",
+            headers=request_headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    @classmethod
+    def from_algod(cls, algod: AlgodClient, **kwargs: typing.Any) -> "AsyncAlgod":
+        return cls(algod.algod_address, algod.algod_token, algod.headers, **kwargs)
+
+    async def __aenter__(self) -> "AsyncAlgod":
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, str] | None = None,
+        content: bytes | None = None,
+        content_type: str | None = None,
+        retry: RetryPolicy | None = None,
+    ) -> httpx.Response:
+        headers = {"Content-Type": content_type} if content_type else None
+        return await (retry or self.retry).send_async(
+            lambda: self._http.request(
+                method, path, params=params, content=content, headers=headers
+            ),
+            f"{method} {path}",
+        )
+
+    @staticmethod
+    def _json(response: httpx.Response) -> typing.Any:
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            raise error.AlgodHTTPError(message, response.status_code)
+        return response.json()
+
+    async def status(self) -> dict[str, typing.Any]:
+        return self._json(await self._request("GET", "/status"))  # type: ignore[no-any-return]
+
+    async def status_after_block(self, round_num: int) -> dict[str, typing.Any]:
+        return self._json(  # type: ignore[no-any-return]
+            await self._request("GET", f"/status/wait-for-block-after/{round_num}")
+        )
+
+    async def suggested_params(self) -> transaction.SuggestedParams:
+        res = self._json(await self._request("GET", "/transactions/params"))
+        return transaction.SuggestedParams(
+            res["fee"],
+            res["last-round"],
+            res["last-round"] + 1000,
+            res["genesis-hash"],
+            res["genesis-id"],
+            False,
+            res["consensus-version"],
+            res["min-fee"],
+        )
+
+    async def send_transactions(
+        self, signed: Sequence[transaction.GenericSignedTransaction]
+    ) -> str:
+        body = b"".join(base64.b64decode(encoding.msgpack_encode(stxn)) for stxn in signed)
+        # Resubmitting after a dropped connection is harmless, the txid is unchanged.
+        response = await self._request(
+            "POST",
+            "/transactions",
+            content=body,
+            content_type="application/x-binary",
+            retry=self._submit_retry,
+        )
+        return typing.cast(str, self._json(response)["txId"])
+
+    async def pending_transaction_info(self, tx_id: str) -> dict[str, typing.Any]:
+        return self._json(  # type: ignore[no-any-return]
+            await self._request("GET", f"/transactions/pending/{tx_id}")
+        )
+
+    async def wait_for_confirmation(
+        self, tx_id: str, wait_rounds: int = 10
+    ) -> dict[str, typing.Any]:
+        """Async port of `algosdk.transaction.wait_for_confirmation`."""
+        last_round = (await self.status())["last-round"]
+        current_round = last_round + 1
+        while current_round <= last_round + wait_rounds:
+            try:
+                info = await self.pending_transaction_info(tx_id)
+            except error.AlgodHTTPError:
+                # Another node behind a load balancer may not know the txn yet.
+                info = {}
+            if info.get("pool-error"):
+                raise error.TransactionRejectedError("Transaction rejected: " + info["pool-error"])
+            if info.get("confirmed-round"):
+                return info
+            await self.status_after_block(current_round)
+            current_round += 1
+        raise error.ConfirmationTimeoutError(f"Wait for transaction id {tx_id} timed out")
+
+    async def simulate(self, request: SimulateRequest) -> dict[str, typing.Any]:
+        body = base64.b64decode(encoding.msgpack_encode(request))
+        return self._json(  # type: ignore[no-any-return]
+            await self._request(
+                "POST", "/transactions/simulate", content=body, content_type="application/msgpack"
+            )
+        )
+
+    async def application_info(self, app_id: int) -> dict[str, typing.Any]:
+        return self._json(await self._request("GET", f"/applications/{app_id}"))  # type: ignore[no-any-return]
+
+    async def box_names(self, app_id: int) -> list[bytes]:
+        res = self._json(await self._request("GET", f"/applications/{app_id}/boxes"))
+        return [base64.b64decode(box["name"]) for box in res.get("boxes", [])]
+
+    async def box_value(self, app_id: int, name: bytes) -> bytes | None:
+        response = await self._request(
+            "GET",
+            f"/applications/{app_id}/box",
+            params={"name": "b64:" + base64.b64encode(name).decode()},
+        )
+        if response.status_code == 404:
+            return None
+        return base64.b64decode(self._json(response)["value"])
+
+
+@dataclasses.dataclass(kw_only=True)
+class AsyncSendResults:
+    """Outcome of an async composer send/simulate, `returns` has one entry per method call."""
+
+    group_id: str
+    tx_ids: list[str]
+    confirmations: list[dict[str, typing.Any]]
+    returns: list[typing.Any]
+    simulate_response: dict[str, typing.Any] | None = None
+
+
+@dataclasses.dataclass(kw_only=True)
+class AsyncSendResult(typing.Generic[_T]):
+    """Outcome of a single `send.*` call, shaped like `SendAppTransactionResult`."""
+
+    tx_id: str
+    tx_ids: list[str]
+    confirmation: dict[str, typing.Any]
+    confirmations: list[dict[str, typing.Any]]
+    abi_return: _T | None
+
+
+@dataclasses.dataclass(kw_only=True)
+class _MethodCall:
+    signature: str
+    args: object | None
+    params: algokit_utils.CommonAppCallParams
+
+
+def _fee(
+    params: algokit_utils.CommonAppCallParams,
+    sp: transaction.SuggestedParams,
+    txn: transaction.Transaction,
+) -> int:
+    """Fee for `txn`: `sp.fee` is per byte, so it is scaled by the signed size."""
+    if params.static_fee is not None:
+        return params.static_fee.micro_algo
+    fee = max(sp.min_fee or 1000, sp.fee * txn.estimate_size())
+    if params.extra_fee is not None:
+        fee += params.extra_fee.micro_algo
+    if params.max_fee is not None and fee > params.max_fee.micro_algo:
+        raise ValueError(f"Transaction fee {fee} is greater than max_fee {params.max_fee}")
+    return fee
+
+
+def _decode_return(signature: str, confirmation: dict[str, typing.Any]) -> typing.Any:
+    returns = method_for(signature).returns
+    if returns.type == "void":
+        return None
+    logs = confirmation.get("logs") or []
+    last_log = base64.b64decode(logs[-1]) if logs else b""
+    if not last_log.startswith(_RETURN_PREFIX):
+        raise ValueError(f"No ABI return found for {signature}")
+    return returns.type.decode(last_log[len(_RETURN_PREFIX) :])  # type: ignore[union-attr]
+
+
+class AsyncSplitrixComposer:
+    """Async counterpart of `SplitrixComposer`, chain method calls then `send()`/`simulate()`."""
+
+    def __init__(self, client: "AsyncSplitrixClient") -> None:
+        self.client = client
+        self._items: list[_MethodCall | TransactionWithSigner] = []
+
+    def _call(
+        self,
+        signature: str,
+        args: object | None,
+        params: algokit_utils.CommonAppCallParams | None,
+    ) -> "AsyncSplitrixComposer":
+        self._items.append(
+            _MethodCall(
+                signature=signature,
+                args=args,
+                params=params or algokit_utils.CommonAppCallParams(),
+            )
+        )
+        return self
+
+    def create_group(
+        self,
+        args: tuple[str, list[str]] | CreateGroupArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> "AsyncSplitrixComposer":
+        return self._call("create_group(address,address[])uint64", args, params)
+
+    def create_bill(
+        self,
+        args: tuple[int, str, int, list[tuple[str, int]], str, list[tuple[int, str, int, int, int]]]
+        | CreateBillArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> "AsyncSplitrixComposer":
+        return self._call(
+            "create_bill(uint64,address,uint64,(address,uint64)[],string,(uint64,address,uint64,uint64,uint64)[])uint64",
+            args,
+            params,
+        )
+
+    def settle_bill(
+        self,
+        args: tuple[int, int, int, algokit_utils.AppMethodCallTransactionArgument] | SettleBillArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> "AsyncSplitrixComposer":
+        return self._call("settle_bill(uint64,uint64,uint64,pay)void", args, params)
+
+    def gas(
+        self, params: algokit_utils.CommonAppCallParams | None = None
+    ) -> "AsyncSplitrixComposer":
+        return self._call("gas()void", (), params)
+
+    def get_group(
+        self,
+        args: tuple[int] | GetGroupArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> "AsyncSplitrixComposer":
+        return self._call("get_group(uint64)void", args, params)
+
+    def get_bill(
+        self,
+        args: tuple[tuple[int, int] | BillKey] | GetBillArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> "AsyncSplitrixComposer":
+        return self._call("get_bill((uint64,uint64))void", args, params)
+
+    def get_groups(
+        self,
+        args: tuple[list[int]] | GetGroupsArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> "AsyncSplitrixComposer":
+        return self._call("get_groups(uint64[])void", args, params)
+
+    def get_bills(
+        self,
+        args: tuple[list[tuple[int, int]]] | GetBillsArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> "AsyncSplitrixComposer":
+        return self._call("get_bills((uint64,uint64)[])void", args, params)
+
+    def add_transaction(
+        self, txn: transaction.Transaction, signer: TransactionSigner | None = None
+    ) -> "AsyncSplitrixComposer":
+        self._items.append(
+            TransactionWithSigner(txn, signer or self.client.signer_for(txn.sender))
+        )
+        return self
+
+    # ---- building ----
+
+    def _build(
+        self, sp: transaction.SuggestedParams
+    ) -> tuple[list[TransactionWithSigner], list[tuple[int, _MethodCall]]]:
+        """Unsigned group and `(index, call)` of every method call in it."""
+        txns: list[TransactionWithSigner] = []
+        calls: list[tuple[int, _MethodCall]] = []
+        for item in self._items:
+            if isinstance(item, TransactionWithSigner):
+                txns.append(item)
+                continue
+            method_args = parse_abi_args(item.args) or []
+            method = method_for(item.signature)
+            for position, arg in enumerate(method.args):
+                if not abi.is_abi_transaction_type(arg.type):
+                    continue
+                argument = method_args[position]
+                if isinstance(argument, TransactionWithSigner):
+                    txns.append(argument)
+                elif isinstance(argument, transaction.Transaction):
+                    txns.append(
+                        TransactionWithSigner(argument, self.client.signer_for(argument.sender))
+                    )
+                else:
+                    raise ValueError(
+                        f"Argument {arg.name} of {item.signature} must be a transaction, "
+                        "other transaction parameter types are not supported asynchronously"
+                    )
+            txns.append(self._app_call(item, method_args, sp))
+            calls.append((len(txns) - 1, item))
+        if len(txns) > 16:
+            raise error.TransactionGroupSizeError
+        self._assign_fees_and_group(txns, calls, sp)
+        return txns, calls
+
+    @staticmethod
+    def _assign_fees_and_group(
+        txns: list[TransactionWithSigner],
+        calls: list[tuple[int, _MethodCall]],
+        sp: transaction.SuggestedParams,
+    ) -> None:
+        """Price the method calls at their final size, then compute the group id."""
+        grouped = len(txns) > 1
+        for txn in txns:
+            # Any 32 bytes stand in for the group id while sizing.
+            txn.txn.group = bytes(32) if grouped else None
+        for i, call in calls:
+            txns[i].txn.fee = _fee(call.params, sp, txns[i].txn)
+        if grouped:
+            group_id = transaction.calculate_group_id([t.txn for t in txns])
+            for txn in txns:
+                txn.txn.group = group_id
+
+    def _app_call(
+        self,
+        call: _MethodCall,
+        method_args: list[object],
+        sp: transaction.SuggestedParams,
+    ) -> TransactionWithSigner:
+        params = call.params
+        sender = params.sender or self.client.default_sender
+        if sender is None:
+            raise ValueError("No sender provided and no default_sender set on the client")
+        call_sp = transaction.SuggestedParams(
+            sp.min_fee or 1000,
+            params.first_valid_round or sp.first,
+            params.last_valid_round
+            or (params.first_valid_round or sp.first) + (params.validity_window or 1000),
+            sp.gh,
+            sp.gen,
+            flat_fee=True,
+            min_fee=sp.min_fee,
+        )
+        txn = transaction.ApplicationCallTxn(
+            sender,
+            call_sp,
+            self.client.app_id,
+            params.on_complete or transaction.OnComplete.NoOpOC,
+            app_args=encode_app_args(call.signature, [tuple(method_args)])[0],
+            accounts=params.account_references,
+            foreign_apps=params.app_references,
+            foreign_assets=params.asset_references,
+            boxes=[
+                algokit_utils.AppManager.get_box_reference(ref)
+                for ref in params.box_references or []
+            ],
+            note=params.note,
+            lease=params.lease,
+            rekey_to=params.rekey_to,
+        )
+        return TransactionWithSigner(txn, params.signer or self.client.signer_for(sender))
+
+    async def _simulate_group(
+        self,
+        txns: list[TransactionWithSigner],
+        *,
+        sign: bool,
+        **options: typing.Any,
+    ) -> dict[str, typing.Any]:
+        signed = (
+            _sign_group(txns)
+            if sign
+            else [transaction.SignedTransaction(t.txn, None) for t in txns]
+        )
+        response = await self.client.algod.simulate(
+            SimulateRequest(
+                txn_groups=[SimulateRequestTransactionGroup(txns=signed)],
+                **{key: value for key, value in options.items() if value is not None},
+            )
+        )
+        group = response["txn-groups"][0]
+        if group.get("failure-message"):
+            failed_at = group.get("failed-at")
+            raise error.AlgodResponseError(
+                f"Simulate failed at {failed_at}: {group['failure-message']}"
+            )
+        return response
+
+    def _populate_resources(
+        self, txns: list[TransactionWithSigner], response: dict[str, typing.Any]
+    ) -> None:
+        """
+        Add the box references simulate reported as accessed to our app calls.
+
+        Splitrix only touches its own boxes, so boxes and the extra I/O budget refs
+        are the only resources that need populating.
+        """
+        group = response["txn-groups"][0]
+        needed: list[bytes] = []
+        extra_refs = 0
+        for resources in [
+            group.get("unnamed-resources-accessed") or {},
+            *(result.get("unnamed-resources-accessed") or {} for result in group["txn-results"]),
+        ]:
+            needed.extend(
+                base64.b64decode(box["name"])
+                for box in resources.get("boxes", [])
+                if box.get("app", 0) in (0, self.client.app_id)
+            )
+            extra_refs += resources.get("extra-box-refs", 0)
+        refs = list(dict.fromkeys(needed)) + [b""] * extra_refs
+        if not refs:
+            return
+        for txn in txns:
+            app_call = txn.txn
+            if not (
+                isinstance(app_call, transaction.ApplicationCallTxn)
+                and app_call.index == self.client.app_id
+            ):
+                continue
+            boxes = list(app_call.boxes or [])
+            used = (
+                len(boxes)
+                + len(app_call.accounts or [])
+                + len(app_call.foreign_apps or [])
+                + len(app_call.foreign_assets or [])
+            )
+            take = max(0, MAX_REFS_PER_APP_CALL - used)
+            boxes.extend(transaction.BoxReference(0, name) for name in refs[:take])
+            refs = refs[take:]
+            app_call.boxes = boxes
+            if not refs:
+                return
+        raise ValueError(
+            f"{len(refs)} box references do not fit in the group, add gas() calls for more slots"
+        )
+
+    # ---- execution ----
+
+    async def simulate(
+        self,
+        allow_more_logs: bool | None = None,
+        allow_empty_signatures: bool | None = None,
+        allow_unnamed_resources: bool | None = None,
+        extra_opcode_budget: int | None = None,
+        simulation_round: int | None = None,
+        skip_signatures: bool | None = None,
+    ) -> AsyncSendResults:
+        sp = await self.client.suggested_params()
+        txns, calls = self._build(sp)
+        response = await self._simulate_group(
+            txns,
+            sign=not skip_signatures,
+            allow_more_logs=allow_more_logs,
+            allow_empty_signatures=allow_empty_signatures or skip_signatures,
+            allow_unnamed_resources=allow_unnamed_resources,
+            extra_opcode_budget=extra_opcode_budget,
+            round=simulation_round,
+        )
+        confirmations = [result["txn-result"] for result in response["txn-groups"][0]["txn-results"]]
+        return AsyncSendResults(
+            group_id=base64.b64encode(txns[0].txn.group or b"").decode(),
+            tx_ids=[t.txn.get_txid() for t in txns],
+            confirmations=confirmations,
+            returns=[_decode_return(call.signature, confirmations[i]) for i, call in calls],
+            simulate_response=response,
+        )
+
+    async def send(
+        self,
+        *,
+        populate_app_call_resources: bool = True,
+        max_rounds_to_wait: int = 10,
+    ) -> AsyncSendResults:
+        """
+        Sign, submit and confirm the group. With `populate_app_call_resources` the
+        group is simulated first to discover the box references it needs.
+        """
+        sp = await self.client.suggested_params()
+        txns, calls = self._build(sp)
+        if populate_app_call_resources:
+            response = await self._simulate_group(
+                txns, sign=False, allow_empty_signatures=True, allow_unnamed_resources=True
+            )
+            self._populate_resources(txns, response)
+            # References grow the transactions, so fees and the group id are redone.
+            self._assign_fees_and_group(txns, calls, sp)
+        signed = _sign_group(txns)
+        algod = self.client.algod
+        await algod.send_transactions(signed)
+        tx_ids = [t.txn.get_txid() for t in txns]
+        # The group confirms as a whole, so once the last transaction has a round
+        # the others' pending info carries their logs and confirmed round too.
+        last = await algod.wait_for_confirmation(tx_ids[-1], max_rounds_to_wait)
+        confirmations = await asyncio.gather(
+            *(algod.pending_transaction_info(tx_id) for tx_id in tx_ids[:-1])
+        )
+        confirmations = [*confirmations, last]
+        return AsyncSendResults(
+            group_id=base64.b64encode(txns[0].txn.group or b"").decode(),
+            tx_ids=tx_ids,
+            confirmations=confirmations,
+            returns=[_decode_return(call.signature, confirmations[i]) for i, call in calls],
+        )
+
+
+def _sign_group(txns: list[TransactionWithSigner]) -> list[transaction.GenericSignedTransaction]:
+    """Sign with one `sign_transactions` call per distinct signer."""
+    signed: list[transaction.GenericSignedTransaction | None] = [None] * len(txns)
+    by_signer: dict[int, tuple[TransactionSigner, list[int]]] = {}
+    for i, txn in enumerate(txns):
+        by_signer.setdefault(id(txn.signer), (txn.signer, []))[1].append(i)
+    unsigned = [t.txn for t in txns]
+    for signer, indexes in by_signer.values():
+        for i, stxn in zip(indexes, signer.sign_transactions(unsigned, indexes), strict=True):
+            signed[i] = stxn
+    return typing.cast(list[transaction.GenericSignedTransaction], signed)
+
+
+class _AsyncSplitrixSend:
+    def __init__(self, client: "AsyncSplitrixClient") -> None:
+        self.client = client
+
+    async def _send(
+        self,
+        add: Callable[[AsyncSplitrixComposer], AsyncSplitrixComposer],
+        readonly: bool = False,
+    ) -> AsyncSendResult[typing.Any]:
+        composer = add(self.client.new_group())
+        # Readonly calls are simulated rather than sent, as the generated client does.
+        results = (
+            await composer.simulate(allow_unnamed_resources=True, skip_signatures=True)
+            if readonly
+            else await composer.send()
+        )
+        return AsyncSendResult(
+            tx_id=results.tx_ids[-1],
+            tx_ids=results.tx_ids,
+            confirmation=results.confirmations[-1],
+            confirmations=results.confirmations,
+            abi_return=results.returns[-1] if results.returns else None,
+        )
+
+    async def create_group(
+        self,
+        args: tuple[str, list[str]] | CreateGroupArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> AsyncSendResult[int]:
+        return await self._send(lambda c: c.create_group(args, params))
+
+    async def create_bill(
+        self,
+        args: tuple[int, str, int, list[tuple[str, int]], str, list[tuple[int, str, int, int, int]]]
+        | CreateBillArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> AsyncSendResult[int]:
+        return await self._send(lambda c: c.create_bill(args, params))
+
+    async def settle_bill(
+        self,
+        args: tuple[int, int, int, algokit_utils.AppMethodCallTransactionArgument] | SettleBillArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> AsyncSendResult[None]:
+        return await self._send(lambda c: c.settle_bill(args, params))
+
+    async def gas(
+        self, params: algokit_utils.CommonAppCallParams | None = None
+    ) -> AsyncSendResult[None]:
+        return await self._send(lambda c: c.gas(params))
+
+    async def get_group(
+        self,
+        args: tuple[int] | GetGroupArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> AsyncSendResult[None]:
+        return await self._send(lambda c: c.get_group(args, params), readonly=True)
+
+    async def get_bill(
+        self,
+        args: tuple[tuple[int, int] | BillKey] | GetBillArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> AsyncSendResult[None]:
+        return await self._send(lambda c: c.get_bill(args, params), readonly=True)
+
+    async def get_groups(
+        self,
+        args: tuple[list[int]] | GetGroupsArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> AsyncSendResult[None]:
+        return await self._send(lambda c: c.get_groups(args, params), readonly=True)
+
+    async def get_bills(
+        self,
+        args: tuple[list[tuple[int, int]]] | GetBillsArgs,
+        params: algokit_utils.CommonAppCallParams | None = None,
+    ) -> AsyncSendResult[None]:
+        return await self._send(lambda c: c.get_bills(args, params), readonly=True)
+
+
+class _AsyncMapState(typing.Generic[_T]):
+    """Async `_MapState` for one box map, values are decoded with the struct codecs."""
+
+    def __init__(
+        self,
+        client: "AsyncSplitrixClient",
+        prefix: bytes,
+        key_to_name: Callable[[typing.Any], bytes],
+        name_to_key: Callable[[bytes], typing.Any],
+        decode: Callable[[bytes], _T],
+    ) -> None:
+        self._client = client
+        self._prefix = prefix
+        self._key_to_name = key_to_name
+        self._name_to_key = name_to_key
+        self._decode = decode
+
+    async def get_value(self, key: typing.Any) -> _T | None:
+        raw = await self._client.algod.box_value(self._client.app_id, self._key_to_name(key))
+        return self._decode(raw) if raw is not None else None
+
+    async def get_map(self) -> dict[typing.Any, _T]:
+        algod = self._client.algod
+        names = [
+            name
+            for name in await algod.box_names(self._client.app_id)
+            if name.startswith(self._prefix)
+        ]
+        # The connection pool bounds concurrency, the semaphore bounds queued tasks.
+        limit = asyncio.Semaphore(self._client.max_concurrency)
+
+        async def fetch(name: bytes) -> bytes | None:
+            async with limit:
+                return await algod.box_value(self._client.app_id, name)
+
+        values = await asyncio.gather(*(fetch(name) for name in names))
+        return {
+            self._name_to_key(name): self._decode(value)
+            for name, value in zip(names, values, strict=True)
+            if value is not None
+        }
+
+
+def _bill_box_name(key: BillKey | tuple[int, int]) -> bytes:
+    group_id, bill_id = (key.group_id, key.bill_id) if isinstance(key, BillKey) else key
+    return BILLS_PREFIX + BILL_KEY_LAYOUT.pack(group_id, bill_id)
+
+
+class _AsyncBoxState:
+    def __init__(self, client: "AsyncSplitrixClient") -> None:
+        self.client = client
+
+    @property
+    def groups(self) -> _AsyncMapState[Group]:
+        return _AsyncMapState(
+            self.client,
+            GROUPS_PREFIX,
+            lambda group_id: GROUPS_PREFIX + U64.pack(group_id),
+            group_id_from_box_name,
+            decode_group,
+        )
+
+    @property
+    def bills(self) -> _AsyncMapState[Bill]:
+        return _AsyncMapState(
+            self.client, BILLS_PREFIX, _bill_box_name, bill_key_from_box_name, decode_bill
+        )
+
+    async def get_all(self) -> dict[str, typing.Any]:
+        groups, bills = await asyncio.gather(self.groups.get_map(), self.bills.get_map())
+        return {"groups": groups, "bills": bills}
+
+
+class _AsyncGlobalState:
+    def __init__(self, client: "AsyncSplitrixClient") -> None:
+        self.client = client
+
+    async def get_all(self) -> dict[str, typing.Any]:
+        info = await self.client.algod.application_info(self.client.app_id)
+        values: dict[str, typing.Any] = {}
+        for entry in info["params"].get("global-state", []):
+            value = entry["value"]
+            values[base64.b64decode(entry["key"]).decode()] = (
+                value.get("uint", 0) if value["type"] == 2 else base64.b64decode(value["bytes"])
+            )
+        return values
+
+    async def group_counter(self) -> int:
+        return typing.cast(int, (await self.get_all()).get("group_counter", 0))
+
+
+class _AsyncSplitrixState:
+    def __init__(self, client: "AsyncSplitrixClient") -> None:
+        self.client = client
+
+    @property
+    def global_state(self) -> _AsyncGlobalState:
+        return _AsyncGlobalState(self.client)
+
+    @property
+    def box(self) -> _AsyncBoxState:
+        return _AsyncBoxState(self.client)
+
+
+class AsyncSplitrixClient:
+    """
+    asyncio client for a deployed Splitrix app.
+
+    `signer_for` resolves signers for senders without an explicit signer, e.g.
+    `AlgorandClient.account.get_signer`. Suggested params are shared between
+    concurrent calls for `suggested_params_ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        app_id: int,
+        algod: AsyncAlgod,
+        *,
+        default_sender: str | None = None,
+        signer_for: Callable[[str], TransactionSigner],
+        suggested_params_ttl: float = 3.0,
+        max_concurrency: int = 256,
+    ) -> None:
+        self.app_id = app_id
+        self.algod = algod
+        self.default_sender = default_sender
+        self.signer_for = signer_for
+        self.suggested_params_ttl = suggested_params_ttl
+        self.max_concurrency = max_concurrency
+        self._params: asyncio.Task[transaction.SuggestedParams] | None = None
+        self._params_expiry = 0.0
+        self.send = _AsyncSplitrixSend(self)
+        self.state = _AsyncSplitrixState(self)
+
+    @classmethod
+    def from_client(
+        cls,
+        client: SplitrixClient,
+        *,
+        default_sender: str | None = None,
+        max_connections: int = 256,
+        **kwargs: typing.Any,
+    ) -> "AsyncSplitrixClient":
+        """Async client for the same app, algod and account registry as `client`."""
+        return cls(
+            client.app_id,
+            AsyncAlgod.from_algod(client.algorand.client.algod, max_connections=max_connections),
+            default_sender=default_sender,
+            signer_for=client.algorand.account.get_signer,
+            max_concurrency=max_connections,
+            **kwargs,
+        )
+
+    async def __aenter__(self) -> "AsyncSplitrixClient":
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.algod.aclose()
+
+    async def suggested_params(self) -> transaction.SuggestedParams:
+        loop = asyncio.get_running_loop()
+        # One in-flight request serves every caller that arrives while it is pending.
+        if self._params is None or loop.time() >= self._params_expiry:
+            self._params = asyncio.ensure_future(self.algod.suggested_params())
+            self._params_expiry = loop.time() + self.suggested_params_ttl
+        try:
+            params = await asyncio.shield(self._params)
+        except Exception:
+            self._params = None
+            raise
+        return transaction.SuggestedParams(
+            params.fee,
+            params.first,
+            params.last,
+            params.gh,
+            params.gen,
+            flat_fee=params.flat_fee,
+            consensus_version=params.consensus_version,
+            min_fee=params.min_fee,
+        )
+
+    def new_group(self) -> AsyncSplitrixComposer:
+        return AsyncSplitrixComposer(self)
@@ -0,0 +1,168 @@
+import base64
+import logging
+import struct
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    APP_SPEC,
+    Bill,
+    BillKey,
+    Group,
+    SplitrixClient,
+)
+from smart_contracts.splitrix.codec import decode_bill, decode_group
+from smart_contracts.splitrix.retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+GROUPS_PREFIX = base64.b64decode(APP_SPEC.state.maps.box["groups"].prefix or "")
+BILLS_PREFIX = base64.b64decode(APP_SPEC.state.maps.box["bills"].prefix or "")
+
+
+class BoxFetcher:
+    """Pooled, retrying HTTP reader for the boxes of a single application."""
+
+    def __init__(
+        self,
+        algod: AlgodClient,
+        app_id: int,
+        *,
+        max_connections: int = 16,
+        retries: int = 5,
+        backoff: float = 0.2,
+        timeout: float = 30.0,
+    ) -> None:
+        headers = {"X-Algo-API-Token": algod.algod_token} if algod.algod_token else {}
+        headers.update(algod.headers or {})
+        self.app_id = app_id
+        self.retry = RetryPolicy(retries=retries, backoff=backoff)
+        self._http = httpx.Client(
+            base_url=f"{algod.algod_address.rstrip('/')}/v2",
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def __enter__(self) -> "BoxFetcher":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._http.close()
+
+    def _get(self, path: str, params: dict[str, str] | None = None) -> httpx.Response:
+        return self.retry.send(lambda: self._http.get(path, params=params), path)
+
+    def box_names(self) -> list[bytes]:
+        """List the names of every box owned by the application."""
+        response = self._get(f"/applications/{self.app_id}/boxes")
+        response.raise_for_status()
+        return [base64.b64decode(box["name"]) for box in response.json().get("boxes", [])]
+
+    def box_value(self, name: bytes) -> bytes | None:
+        """Fetch a box value, `None` if the box was deleted after being listed."""
+        response = self._get(
+            f"/applications/{self.app_id}/box",
+            params={"name": "b64:" + base64.b64encode(name).decode()},
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return base64.b64decode(response.json()["value"])
+
+
+def _name_prefix(map_name: str | None, group_id: int | None) -> list[bytes]:
+    map_prefixes = {"groups": GROUPS_PREFIX, "bills": BILLS_PREFIX}
+    if map_name is not None and map_name not in map_prefixes:
+        raise ValueError(f"Unknown box map: {map_name}")
+    selected = [map_prefixes[map_name]] if map_name else list(map_prefixes.values())
+    if group_id is None:
+        return selected
+    return [prefix + struct.pack(">Q", group_id) for prefix in selected]
+
+
+def iter_box_values(
+    client: SplitrixClient,
+    map_name: str | None = None,
+    group_id: int | None = None,
+    *,
+    max_workers: int = 16,
+    retries: int = 5,
+    backoff: float = 0.2,
+) -> Iterator[tuple[bytes, bytes]]:
+    """
+    Yield `(box name, raw value)` pairs for the app's boxes, fetched concurrently.
+    `map_name` restricts the load to `groups` or `bills` and `group_id` to a single group.
+    """
+    prefixes = tuple(_name_prefix(map_name, group_id))
+    with BoxFetcher(
+        client.algorand.client.algod,
+        client.app_id,
+        max_connections=max_workers,
+        retries=retries,
+        backoff=backoff,
+    ) as fetcher:
+        names = [name for name in fetcher.box_names() if name.startswith(prefixes)]
+        logger.debug(f"Loading {len(names)} boxes with {max_workers} workers")
+        # Windows keep the number of in-flight values bounded for huge apps.
+        window = max_workers * 64
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for start in range(0, len(names), window):
+                batch = names[start : start + window]
+                for name, value in zip(batch, executor.map(fetcher.box_value, batch)):
+                    if value is not None:
+                        yield name, value
+
+
+def group_id_from_box_name(name: bytes) -> int:
+    return struct.unpack_from(">Q", name, len(GROUPS_PREFIX))[0]
+
+
+def bill_key_from_box_name(name: bytes) -> BillKey:
+    group_id, bill_id = struct.unpack_from(">QQ", name, len(BILLS_PREFIX))
+    return BillKey(group_id=group_id, bill_id=bill_id)
+
+
+def load_groups(
+    client: SplitrixClient, group_id: int | None = None, *, max_workers: int = 16
+) -> dict[int, Group]:
+    """Concurrently load the `groups` map, optionally just one group."""
+    return {
+        group_id_from_box_name(name): decode_group(value)
+        for name, value in iter_box_values(
+            client, "groups", group_id, max_workers=max_workers
+        )
+    }
+
+
+def load_bills(
+    client: SplitrixClient, group_id: int | None = None, *, max_workers: int = 16
+) -> dict[BillKey, Bill]:
+    """Concurrently load the `bills` map, optionally only the bills of one group."""
+    return {
+        bill_key_from_box_name(name): decode_bill(value)
+        for name, value in iter_box_values(
+            client, "bills", group_id, max_workers=max_workers
+        )
+    }
+
+
+def load_all(client: SplitrixClient, *, max_workers: int = 16) -> dict[str, dict]:
+    """Concurrent replacement for reading both maps through `_MapState.get_map`."""
+    groups: dict[int, Group] = {}
+    bills: dict[BillKey, Bill] = {}
+    for name, value in iter_box_values(client, max_workers=max_workers):
+        if name.startswith(GROUPS_PREFIX):
+            groups[group_id_from_box_name(name)] = decode_group(value)
+        else:
+            bills[bill_key_from_box_name(name)] = decode_bill(value)
+    return {"groups": groups, "bills": bills}
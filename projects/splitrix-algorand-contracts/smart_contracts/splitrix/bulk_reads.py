@@ -0,0 +1,172 @@
+import base64
+import logging
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+import algokit_utils
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    GetBillsArgs,
+    GetGroupsArgs,
+    Group,
+    SplitrixClient,
+    SplitrixComposer,
+)
+from smart_contracts.splitrix.codec import decode_bill, decode_group
+
+logger = logging.getLogger(__name__)
+
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+
+# AVM limits that bound a single readonly call.
+MAX_LOGS_PER_CALL = 32
+MAX_APP_ARGS_BYTES = 2048
+MAX_GROUP_SIZE = 16
+# Every app call may carry 8 references and each box reference buys 1KB of box
+# I/O budget, so one simulated group can read at most 16 * 8 boxes.
+MAX_BOX_REFS_PER_GROUP = 8 * MAX_GROUP_SIZE
+MAX_SIMULATE_OPCODE_BUDGET = 20_000 * MAX_GROUP_SIZE
+
+_SELECTOR_BYTES = 4
+_ARRAY_LENGTH_BYTES = 2
+_GROUP_ID_BYTES = 8
+_BILL_KEY_BYTES = 16
+
+
+def _keys_per_call(key_size: int) -> int:
+    """Largest key list that fits both the log count and the app-args budget."""
+    arg_capacity = (MAX_APP_ARGS_BYTES - _SELECTOR_BYTES - _ARRAY_LENGTH_BYTES) // key_size
+    return min(MAX_LOGS_PER_CALL, arg_capacity)
+
+
+def chunk_keys(
+    keys: Sequence[_K], keys_per_call: int, keys_per_group: int
+) -> Iterator[list[list[_K]]]:
+    """Split `keys` into simulate groups, each a list of per-call key chunks."""
+    for group_start in range(0, len(keys), keys_per_group):
+        group_keys = keys[group_start : group_start + keys_per_group]
+        yield [
+            list(group_keys[i : i + keys_per_call])
+            for i in range(0, len(group_keys), keys_per_call)
+        ]
+
+
+def decode_group_log(log: bytes) -> Group | None:
+    """Decode one `get_group`/`get_groups` log, an empty log means a missing group."""
+    if not log:
+        return None
+    return decode_group(log)
+
+
+def decode_bill_log(log: bytes) -> Bill | None:
+    """Decode one `get_bill`/`get_bills` log, an empty log means a missing bill."""
+    if not log:
+        return None
+    return decode_bill(log)
+
+
+def _simulate_logs(composer: SplitrixComposer) -> list[bytes]:
+    result = composer.simulate(
+        allow_more_logs=True,
+        allow_empty_signatures=True,
+        allow_unnamed_resources=True,
+        extra_opcode_budget=MAX_SIMULATE_OPCODE_BUDGET,
+        skip_signatures=True,
+    )
+    return [
+        base64.b64decode(log)
+        for confirmation in result.confirmations
+        for log in confirmation.get("logs", [])
+    ]
+
+
+def _read_many(
+    client: SplitrixClient,
+    keys: Sequence[_K],
+    add_call: Callable[[SplitrixComposer, list[_K]], SplitrixComposer],
+    decode: Callable[[bytes], _V | None],
+    keys_per_call: int,
+    keys_per_group: int,
+    max_workers: int,
+) -> list[_V | None]:
+    # Duplicate keys would produce identical transactions within one group.
+    unique_keys = list(dict.fromkeys(keys))
+    groups = list(chunk_keys(unique_keys, keys_per_call, keys_per_group))
+    if not groups:
+        return []
+
+    def run(chunks: list[list[_K]]) -> list[bytes]:
+        composer = client.new_group()
+        for chunk in chunks:
+            composer = add_call(composer, chunk)
+        logs = _simulate_logs(composer)
+        expected = sum(len(chunk) for chunk in chunks)
+        if len(logs) != expected:
+            raise ValueError(f"Expected {expected} logs from simulate, got {len(logs)}")
+        return logs
+
+    logger.debug(f"Reading {len(unique_keys)} keys in {len(groups)} simulate calls")
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+        logs = [log for group_logs in executor.map(run, groups) for log in group_logs]
+
+    by_key = {key: decode(log) for key, log in zip(unique_keys, logs, strict=True)}
+    return [by_key[key] for key in keys]
+
+
+def get_groups(
+    client: SplitrixClient,
+    group_ids: Sequence[int],
+    *,
+    sender: str | None = None,
+    keys_per_group: int = MAX_BOX_REFS_PER_GROUP,
+    max_workers: int = 8,
+) -> list[Group | None]:
+    """
+    Read many groups through chunked, concurrent `get_groups` simulate calls.
+    Results are aligned with `group_ids`, with `None` for groups that do not exist.
+    """
+    params = algokit_utils.CommonAppCallParams(sender=sender)
+    return _read_many(
+        client,
+        group_ids,
+        lambda composer, chunk: composer.get_groups(
+            GetGroupsArgs(group_ids=chunk), params=params
+        ),
+        decode_group_log,
+        _keys_per_call(_GROUP_ID_BYTES),
+        keys_per_group,
+        max_workers,
+    )
+
+
+def get_bills(
+    client: SplitrixClient,
+    bill_keys: Sequence[BillKey],
+    *,
+    sender: str | None = None,
+    keys_per_group: int = MAX_BOX_REFS_PER_GROUP,
+    max_workers: int = 8,
+) -> list[Bill | None]:
+    """
+    Read many bills through chunked, concurrent `get_bills` simulate calls.
+    Results are aligned with `bill_keys`, with `None` for bills that do not exist.
+    Bills larger than 1KB use more than one box reference of I/O budget, so lower
+    `keys_per_group` when reading groups with many debtors.
+    """
+    params = algokit_utils.CommonAppCallParams(sender=sender)
+    return _read_many(
+        client,
+        bill_keys,
+        lambda composer, chunk: composer.get_bills(
+            GetBillsArgs(bill_keys=[(k.group_id, k.bill_id) for k in chunk]),
+            params=params,
+        ),
+        decode_bill_log,
+        _keys_per_call(_BILL_KEY_BYTES),
+        keys_per_group,
+        max_workers,
+    )
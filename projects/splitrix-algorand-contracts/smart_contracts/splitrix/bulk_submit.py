@@ -0,0 +1,507 @@
+"""
+Bulk `create_bill`/`settle_bill` submission with automatic atomic-group packing.
+
+Items are packed in stream order into the largest atomic groups that respect the
+16 transaction cap, the 8 references per app call (shared across the group), the
+1KB of box I/O each box reference buys and the pooled opcode budget. Groups are
+signed and submitted on a worker pool while earlier groups confirm. Groups that
+touch the same Splitrix group are chained, because `create_bill` derives the new
+bill id from the group's `bill_counter` at execution time.
+"""
+
+import contextlib
+import copy
+import dataclasses
+import itertools
+import logging
+import math
+import threading
+import typing
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from algosdk import transaction
+from algosdk.atomic_transaction_composer import TransactionSigner, TransactionWithSigner
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    BillKey,
+    CreateBillArgs,
+    SettleBillArgs,
+    SplitrixClient,
+)
+from smart_contracts.splitrix import bulk_reads
+from smart_contracts.splitrix.abi_args import encode_app_args
+from smart_contracts.splitrix.box_loader import BILLS_PREFIX, GROUPS_PREFIX
+from smart_contracts.splitrix.codec import (
+    BILL_KEY_LAYOUT,
+    U64,
+    bill_size,
+    encode_bill,
+    group_size,
+)
+from smart_contracts.splitrix.confirmations import ConfirmationTracker, submit_signed
+
+logger = logging.getLogger(__name__)
+
+MAX_GROUP_SIZE = 16
+MAX_REFS_PER_APP_CALL = 8
+BOX_IO_BYTES_PER_REF = 1024
+APP_CALL_OPCODE_BUDGET = 700
+
+# Opcodes executed by the compiled approval program, for members and debtors
+# ordered worst case (every member scan runs to the end of the list).
+CREATE_BILL_BASE_COST = 191
+MEMBER_SCAN_COST = 19
+DEBTOR_COST = 117
+NETTING_COST = 217
+SETTLE_BILL_COST = 168
+CREATE_GROUP_BASE_COST = 22
+CREATE_GROUP_MEMBER_COST = 60
+GAS_CALL_COST = 16
+MAX_GROUP_OPCODE_BUDGET = APP_CALL_OPCODE_BUDGET * MAX_GROUP_SIZE
+
+_ZERO_ADDRESS = "AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAY5HFKQ"
+_CREATE_BILL = CreateBillArgs.abi_method_signature.fget(None)  # type: ignore[attr-defined]
+_SETTLE_BILL = SettleBillArgs.abi_method_signature.fget(None)  # type: ignore[attr-defined]
+_GAS = "gas()void"
+
+BulkItem = CreateBillArgs | SettleBillArgs
+
+
+@dataclasses.dataclass(kw_only=True)
+class BulkItemResult:
+    """Outcome of one submitted item, `bill_id` is set for confirmed `create_bill`s."""
+
+    index: int
+    args: BulkItem
+    tx_id: str | None = None
+    confirmed_round: int | None = None
+    bill_id: int | None = None
+    error: Exception | None = None
+
+
+@dataclasses.dataclass(kw_only=True)
+class _Entry:
+    index: int
+    args: BulkItem
+    boxes: dict[bytes, int]
+    txns: int
+    cost: int
+    epoch: int
+    bill_id: int | None = None
+    tx_id: str | None = None
+
+
+@dataclasses.dataclass(kw_only=True)
+class _PackedGroup:
+    entries: list[_Entry] = dataclasses.field(default_factory=list)
+    boxes: dict[bytes, int] = dataclasses.field(default_factory=dict)
+    txns: int = 0
+    app_calls: int = 0
+    cost: int = 0
+
+    @property
+    def group_ids(self) -> set[int]:
+        return {entry.args.group_id for entry in self.entries}
+
+    def requirements(self, entry: _Entry | None = None) -> tuple[int, int]:
+        """(transactions, app calls) needed, including padding `gas()` calls."""
+        boxes = dict(self.boxes)
+        for name, size in (entry.boxes if entry else {}).items():
+            boxes[name] = max(size, boxes.get(name, 0))
+        txns = self.txns + (entry.txns if entry else 0)
+        app_calls = self.app_calls + (1 if entry else 0)
+        cost = self.cost + (entry.cost if entry else 0)
+        box_refs = max(len(boxes), math.ceil(sum(boxes.values()) / BOX_IO_BYTES_PER_REF))
+        needed_calls = max(
+            app_calls,
+            math.ceil(box_refs / MAX_REFS_PER_APP_CALL),
+            math.ceil(cost / APP_CALL_OPCODE_BUDGET),
+        )
+        return txns + needed_calls - app_calls, needed_calls
+
+    def add(self, entry: _Entry) -> None:
+        self.entries.append(entry)
+        for name, size in entry.boxes.items():
+            self.boxes[name] = max(size, self.boxes.get(name, 0))
+        self.txns += entry.txns
+        self.app_calls += 1
+        self.cost += entry.cost
+
+
+def _group_box(group_id: int) -> bytes:
+    return GROUPS_PREFIX + U64.pack(group_id)
+
+
+def _bill_box(group_id: int, bill_id: int) -> bytes:
+    return BILLS_PREFIX + BILL_KEY_LAYOUT.pack(group_id, bill_id)
+
+
+def _new_bill_debtor_count(args: CreateBillArgs) -> int:
+    return len({debtor for debtor, _ in args.debtors if debtor != _ZERO_ADDRESS})
+
+
+def estimate_cost(args: BulkItem, members: int) -> int:
+    """
+    Upper bound on the opcodes `args` executes against a group of `members` members.
+
+    The payer and every debtor are looked up in the member list, each debtor is
+    compared with the debtors already kept, and each `payers_debt` entry costs the
+    same. Refit the constants with `benchmarks.opcode_costs` when the contract
+    changes.
+    """
+    if isinstance(args, SettleBillArgs):
+        return SETTLE_BILL_COST
+    debtors = len(args.debtors)
+    return (
+        CREATE_BILL_BASE_COST
+        + MEMBER_SCAN_COST * members * (debtors + 1)
+        + DEBTOR_COST * debtors
+        + debtors * (debtors + 1) // 2
+        + NETTING_COST * len(args.payers_debt)
+    )
+
+
+def estimate_create_group_cost(members: int) -> int:
+    """
+    Opcodes `create_group` executes for `members` distinct members, admin
+    included: every member is compared with the ones already kept.
+    """
+    return (
+        CREATE_GROUP_BASE_COST
+        + CREATE_GROUP_MEMBER_COST * members
+        + MEMBER_SCAN_COST * members * (members - 1) // 2
+    )
+
+
+def gas_calls_needed(cost: int, app_calls: int = 1) -> int:
+    """`gas()` calls to add to `app_calls` app calls so their pooled budget covers `cost`."""
+    shortfall = cost - APP_CALL_OPCODE_BUDGET * app_calls
+    return max(0, math.ceil(shortfall / (APP_CALL_OPCODE_BUDGET - GAS_CALL_COST)))
+
+
+class BulkSubmitter:
+    """
+    Packs, signs and submits streams of `CreateBillArgs`/`SettleBillArgs`.
+
+    App calls are sent and fee-pooled by `sender`, so `settle_bill` payments carry
+    a zero fee. Payment signers come from a `TransactionWithSigner` argument or
+    the `AlgorandClient` account registry. Confirmations come from a shared
+    `ConfirmationTracker`, one is started per `submit_iter` call if none is given.
+    Opcode costs come from `cost_estimator`, or `estimate_cost` if none is given.
+
+    Bill counters are read from the app at the start of every `submit_iter` call
+    and again after an atomic group fails, so ids handed out to the failed group
+    and the groups chained to it are reused.
+    """
+
+    def __init__(
+        self,
+        client: SplitrixClient,
+        sender: str,
+        *,
+        signer: TransactionSigner | None = None,
+        max_in_flight: int = 32,
+        prefetch_window: int = 512,
+        cost_estimator: Callable[[BulkItem], int] | None = None,
+        validity_window: int = 1000,
+        tracker: ConfirmationTracker | None = None,
+    ) -> None:
+        self.client = client
+        self.sender = sender
+        self.signer = signer or client.algorand.account.get_signer(sender)
+        self.max_in_flight = max_in_flight
+        self.prefetch_window = prefetch_window
+        self.cost_estimator = cost_estimator
+        self.validity_window = validity_window
+        self.tracker = tracker
+        self._algod = client.algorand.client.algod
+        self._bill_counters: dict[int, int] = {}
+        # Bumped whenever a group's bill counter is dropped after a failure.
+        self._epochs: dict[int, int] = {}
+        self._member_counts: dict[int, int] = {}
+        self._group_sizes: dict[int, int] = {}
+        self._bill_sizes: dict[BillKey, int] = {}
+        self._gas_args = encode_app_args(_GAS, [()])[0]
+
+    # ---- state needed for packing ----
+
+    def _prefetch(self, items: list[BulkItem]) -> None:
+        group_ids = {args.group_id for args in items} - self._bill_counters.keys()
+        if group_ids:
+            ordered_ids = sorted(group_ids)
+            for group_id, group in zip(
+                ordered_ids, bulk_reads.get_groups(self.client, ordered_ids, sender=self.sender)
+            ):
+                if group is not None:
+                    self._bill_counters[group_id] = group.bill_counter
+                    self._member_counts[group_id] = len(group.members)
+                    self._group_sizes[group_id] = group_size(len(group.members))
+
+        bill_keys: set[BillKey] = set()
+        for args in items:
+            if isinstance(args, SettleBillArgs):
+                bill_keys.add(BillKey(group_id=args.group_id, bill_id=args.bill_id))
+            else:
+                bill_keys.update(
+                    BillKey(group_id=args.group_id, bill_id=payer_debt[0])
+                    for payer_debt in args.payers_debt
+                )
+        unknown = sorted(bill_keys - self._bill_sizes.keys(), key=lambda k: (k.group_id, k.bill_id))
+        if unknown:
+            for bill_key, bill in zip(
+                unknown, bulk_reads.get_bills(self.client, unknown, sender=self.sender)
+            ):
+                if bill is not None:
+                    self._bill_sizes[bill_key] = len(encode_bill(bill))
+
+    def _entry(self, index: int, args: BulkItem) -> _Entry:
+        group_id = args.group_id
+        if group_id not in self._bill_counters:
+            # Dropped after a failed group, or outside the prefetched window.
+            self._prefetch([args])
+        if group_id not in self._bill_counters:
+            raise ValueError(f"Group {group_id} does not exist")
+        epoch = self._epochs.get(group_id, 0)
+        cost = (
+            self.cost_estimator(args)
+            if self.cost_estimator
+            else estimate_cost(args, self._member_counts[group_id])
+        )
+        boxes = {_group_box(group_id): self._group_sizes[group_id]}
+        if isinstance(args, CreateBillArgs):
+            # Only claimed by `_claim` once the entry is packed.
+            bill_id = self._bill_counters[group_id]
+            boxes[_bill_box(group_id, bill_id)] = bill_size(
+                _new_bill_debtor_count(args), args.memo
+            )
+            for payer_debt in args.payers_debt:
+                old_key = BillKey(group_id=group_id, bill_id=payer_debt[0])
+                boxes[_bill_box(group_id, payer_debt[0])] = self._bill_sizes.get(old_key, 0)
+            return _Entry(
+                index=index, args=args, boxes=boxes, txns=1, cost=cost, epoch=epoch,
+                bill_id=bill_id,
+            )
+        settle_key = BillKey(group_id=group_id, bill_id=args.bill_id)
+        if settle_key not in self._bill_sizes:
+            raise ValueError(f"Bill {settle_key} does not exist")
+        # settle_bill does not read the group box.
+        boxes = {_bill_box(group_id, args.bill_id): self._bill_sizes[settle_key]}
+        return _Entry(index=index, args=args, boxes=boxes, txns=2, cost=cost, epoch=epoch)
+
+    def _claim(self, entry: _Entry) -> None:
+        """Advance the bill counter past a packed `create_bill` and record its size."""
+        if entry.bill_id is None:
+            return
+        group_id = entry.args.group_id
+        self._bill_counters[group_id] = entry.bill_id + 1
+        self._bill_sizes[BillKey(group_id=group_id, bill_id=entry.bill_id)] = entry.boxes[
+            _bill_box(group_id, entry.bill_id)
+        ]
+
+    def _pack(self, items: Iterable[BulkItem]) -> Iterator[_PackedGroup | BulkItemResult]:
+        group = _PackedGroup()
+        numbered = enumerate(items)
+        while window := list(itertools.islice(numbered, self.prefetch_window)):
+            self._prefetch([args for _, args in window])
+            for index, args in window:
+                try:
+                    entry = self._entry(index, args)
+                except ValueError as error:
+                    yield BulkItemResult(index=index, args=args, error=error)
+                    continue
+                if group.entries and group.requirements(entry)[0] > MAX_GROUP_SIZE:
+                    yield group
+                    group = _PackedGroup()
+                    if entry.epoch != self._epochs.get(args.group_id, 0):
+                        # A failure seen while the full group was out dropped the
+                        # counter this entry's bill id came from.
+                        try:
+                            entry = self._entry(index, args)
+                        except ValueError as error:
+                            yield BulkItemResult(index=index, args=args, error=error)
+                            continue
+                if group.requirements(entry)[0] > MAX_GROUP_SIZE:
+                    yield BulkItemResult(
+                        index=index, args=args,
+                        error=ValueError("Item does not fit in a single atomic group"),
+                    )
+                    continue
+                self._claim(entry)
+                group.add(entry)
+        if group.entries:
+            yield group
+
+    # ---- building, signing and submission ----
+
+    def _build(self, group: _PackedGroup, sp: transaction.SuggestedParams) -> list[TransactionWithSigner]:
+        app_id = self.client.app_id
+        box_names = list(group.boxes)
+        total_txns, app_calls = group.requirements()
+        box_refs = max(len(box_names), math.ceil(sum(group.boxes.values()) / BOX_IO_BYTES_PER_REF))
+        # Empty references only add I/O budget.
+        box_names += [b""] * (box_refs - len(box_names))
+        ref_slots = [
+            box_names[i : i + MAX_REFS_PER_APP_CALL]
+            for i in range(0, len(box_names), MAX_REFS_PER_APP_CALL)
+        ]
+        fee = (sp.min_fee or 1000) * total_txns
+        create_args = iter(
+            encode_app_args(
+                _CREATE_BILL, [e.args for e in group.entries if isinstance(e.args, CreateBillArgs)]
+            )
+        )
+        settle_args = iter(
+            encode_app_args(
+                _SETTLE_BILL, [e.args for e in group.entries if isinstance(e.args, SettleBillArgs)]
+            )
+        )
+
+        def app_call(app_args: list[bytes]) -> TransactionWithSigner:
+            nonlocal fee
+            call_sp = transaction.SuggestedParams(
+                fee, sp.first, sp.last, sp.gh, sp.gen, flat_fee=True, min_fee=sp.min_fee
+            )
+            fee = 0
+            refs = ref_slots.pop(0) if ref_slots else []
+            return TransactionWithSigner(
+                transaction.ApplicationNoOpTxn(
+                    self.sender, call_sp, app_id, app_args, boxes=[(0, name) for name in refs]
+                ),
+                self.signer,
+            )
+
+        txns: list[TransactionWithSigner] = []
+        calls: list[tuple[_Entry, TransactionWithSigner]] = []
+        for entry in group.entries:
+            if isinstance(entry.args, CreateBillArgs):
+                calls.append((entry, app_call(next(create_args))))
+                txns.append(calls[-1][1])
+                continue
+            payment = entry.args.payment
+            payment_signer = (
+                payment.signer
+                if isinstance(payment, TransactionWithSigner)
+                else self.client.algorand.account.get_signer(payment.sender)  # type: ignore[union-attr]
+            )
+            payment_txn = typing.cast(
+                transaction.PaymentTxn,
+                payment.txn if isinstance(payment, TransactionWithSigner) else payment,
+            )
+            payment_txn = copy.copy(payment_txn)
+            payment_txn.group = None
+            payment_txn.fee = 0
+            payment_txn.first_valid_round = sp.first
+            payment_txn.last_valid_round = sp.last
+            txns.append(TransactionWithSigner(payment_txn, payment_signer))
+            calls.append((entry, app_call(next(settle_args))))
+            txns.append(calls[-1][1])
+        for _ in range(app_calls - group.app_calls):
+            txns.append(app_call(self._gas_args))
+
+        transaction.assign_group_id([t.txn for t in txns])
+        for entry, call in calls:
+            entry.tx_id = call.txn.get_txid()
+        return txns
+
+    def _sign(self, txns: list[TransactionWithSigner]) -> list[transaction.GenericSignedTransaction]:
+        signed: list[transaction.GenericSignedTransaction | None] = [None] * len(txns)
+        by_signer: dict[int, list[int]] = {}
+        signers: dict[int, TransactionSigner] = {}
+        for i, txn in enumerate(txns):
+            by_signer.setdefault(id(txn.signer), []).append(i)
+            signers[id(txn.signer)] = txn.signer
+        unsigned = [t.txn for t in txns]
+        for key, indexes in by_signer.items():
+            for i, stxn in zip(indexes, signers[key].sign_transactions(unsigned, indexes)):
+                signed[i] = stxn
+        return typing.cast(list[transaction.GenericSignedTransaction], signed)
+
+    def _send_and_confirm(
+        self, txns: list[TransactionWithSigner], tracker: ConfirmationTracker
+    ) -> int:
+        signed = self._sign(txns)
+        return submit_signed(self._algod, tracker, signed).result()
+
+    def submit_iter(self, items: Iterable[BulkItem]) -> Iterator[BulkItemResult]:
+        """Submit `items`, yielding results as their atomic groups complete."""
+        # Bills may have been created since the last call.
+        self._bill_counters.clear()
+        # Group id -> (epoch, last future touching it); futures from an earlier
+        # epoch belong to a failed chain and are not waited on.
+        last_by_group_id: dict[int, tuple[int, Future[int]]] = {}
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        tracker = self.tracker or ConfirmationTracker(self._algod)
+        pending: list[tuple[_PackedGroup, Future[int]]] = []
+
+        def run(txns: list[TransactionWithSigner], dependencies: list[Future[int]]) -> int:
+            try:
+                for dependency in dependencies:
+                    dependency.result()
+                return self._send_and_confirm(txns, tracker)
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor, contextlib.ExitStack() as stack:
+            if tracker is not self.tracker:
+                stack.callback(tracker.close)
+            for packed in self._pack(items):
+                if isinstance(packed, BulkItemResult):
+                    yield packed
+                    continue
+                in_flight.acquire()
+                try:
+                    sp = self.client.algorand.get_suggested_params()
+                    sp.last = sp.first + self.validity_window
+                    txns = self._build(packed, sp)
+                except Exception as error:
+                    in_flight.release()
+                    yield from self._failed(packed, error)
+                    continue
+                epochs = {entry.args.group_id: entry.epoch for entry in packed.entries}
+                dependencies = [
+                    future
+                    for group_id, (epoch, future) in last_by_group_id.items()
+                    if epochs.get(group_id) == epoch
+                ]
+                future = executor.submit(run, txns, dependencies)
+                for group_id, epoch in epochs.items():
+                    last_by_group_id[group_id] = (epoch, future)
+                pending.append((packed, future))
+                while pending and pending[0][1].done():
+                    yield from self._results(*pending.pop(0))
+            for packed, future in pending:
+                yield from self._results(packed, future)
+
+    def _failed(self, group: _PackedGroup, error: Exception) -> Iterator[BulkItemResult]:
+        # Later groups touching the same Splitrix groups are chained to this one
+        # and fail with the same error, their bill ids can no longer be trusted.
+        # Drop the counters so the next items re-read them from the app; the
+        # failures of the rest of the chain belong to the old epoch.
+        logger.warning(f"Atomic group of {len(group.entries)} items failed: {error}")
+        for entry in group.entries:
+            group_id = entry.args.group_id
+            if entry.epoch == self._epochs.get(group_id, 0):
+                self._epochs[group_id] = entry.epoch + 1
+                self._bill_counters.pop(group_id, None)
+        for entry in group.entries:
+            yield BulkItemResult(index=entry.index, args=entry.args, error=error)
+
+    def _results(self, group: _PackedGroup, future: Future[int]) -> Iterator[BulkItemResult]:
+        try:
+            confirmed_round = future.result()
+        except Exception as error:
+            yield from self._failed(group, error)
+            return
+        for entry in group.entries:
+            yield BulkItemResult(
+                index=entry.index,
+                args=entry.args,
+                tx_id=entry.tx_id,
+                confirmed_round=confirmed_round,
+                bill_id=entry.bill_id,
+            )
+
+    def submit(self, items: Iterable[BulkItem]) -> list[BulkItemResult]:
+        """Submit `items` and return one result per item, in input order."""
+        return sorted(self.submit_iter(items), key=lambda result: result.index)
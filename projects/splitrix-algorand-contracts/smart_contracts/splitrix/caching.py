@@ -0,0 +1,293 @@
+"""
+Round-aware cache for suggested params and readonly `get_group`/`get_bill` results.
+
+Chain state only changes between blocks, so suggested params and simulate results
+fetched in round N stay valid until round N + 1 is observed. `RoundCache` keeps
+both for the current round, shares the suggested params with the `AlgorandClient`
+so every `send.*` call reuses them, and drops individual entries early when a
+`GroupCreated` or `BillChanged` event shows our own transactions changed them.
+"""
+
+import base64
+import dataclasses
+import logging
+import threading
+import time
+import typing
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable, Mapping, Sequence
+
+from algosdk import encoding
+from algosdk.transaction import SuggestedParams
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    Group,
+    SplitrixClient,
+)
+from smart_contracts.splitrix import bulk_reads
+from smart_contracts.splitrix.codec import BILL_KEY_LAYOUT, U64
+
+logger = logging.getLogger(__name__)
+
+_K = typing.TypeVar("_K", bound=Hashable)
+_V = typing.TypeVar("_V")
+
+_MISSING = object()
+
+
+def event_selector(signature: str) -> bytes:
+    """ARC-28 event selector, the first 4 bytes of sha512/256 of the signature."""
+    return encoding.checksum(signature.encode())[:4]  # type: ignore[no-any-return]
+
+
+GROUP_CREATED = event_selector("GroupCreated(uint64)")
+BILL_CHANGED = event_selector("BillChanged((uint64,uint64))")
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class LRUCache(typing.Generic[_K, _V]):
+    """Thread-safe bounded LRU mapping that counts hits, misses and evictions."""
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[_K, _V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def get(self, key: _K, default: typing.Any = None) -> typing.Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)  # type: ignore[call-overload]
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: _K, value: _V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: _K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self._data),
+            maxsize=self.maxsize,
+        )
+
+
+def _confirmation_logs(result: object) -> tuple[list[bytes], int]:
+    """Logs and highest confirmed round of a send result or raw confirmation(s)."""
+    confirmations: list[Mapping[str, typing.Any]]
+    if isinstance(result, Mapping):
+        confirmations = [result]
+    elif isinstance(result, Sequence):
+        confirmations = list(result)
+    else:
+        confirmations = list(getattr(result, "confirmations", None) or [])
+        if not confirmations and getattr(result, "confirmation", None):
+            confirmations = [result.confirmation]  # type: ignore[attr-defined]
+    logs: list[bytes] = []
+    confirmed_round = 0
+    for confirmation in confirmations:
+        logs.extend(base64.b64decode(log) for log in confirmation.get("logs", []))
+        confirmed_round = max(confirmed_round, confirmation.get("confirmed-round") or 0)
+    return logs, confirmed_round
+
+
+class RoundCache:
+    """
+    Caches suggested params and readonly reads for the latest observed round.
+
+    The round is re-checked through algod's suggested params at most once per
+    `round_ttl` seconds (a bit under the block time works well). When it moves,
+    every cached read is dropped. Pass confirmations of our own writes to
+    `invalidate_result` so reads that follow them in the same round stay fresh.
+    """
+
+    def __init__(
+        self,
+        client: SplitrixClient,
+        *,
+        maxsize: int = 4096,
+        round_ttl: float = 1.0,
+        share_suggested_params: bool = True,
+    ) -> None:
+        self.client = client
+        self.round_ttl = round_ttl
+        self.share_suggested_params = share_suggested_params
+        self.reads: LRUCache[tuple[str, Hashable], Group | Bill | None] = LRUCache(maxsize)
+        self.params_hits = 0
+        self.params_misses = 0
+        self._round = 0
+        self._params: SuggestedParams | None = None
+        self._params_expiry = 0.0
+        self._lock = threading.Lock()
+
+    # ---- rounds and suggested params ----
+
+    def _observe_round(self, current_round: int) -> None:
+        if current_round > self._round:
+            if self._round:
+                logger.debug(f"Round {self._round} -> {current_round}, dropping cached reads")
+            self._round = current_round
+            self.reads.clear()
+
+    def _refresh(self) -> SuggestedParams:
+        with self._lock:
+            if self._params is not None and time.monotonic() < self._params_expiry:
+                self.params_hits += 1
+                return self._params
+            self.params_misses += 1
+            params = self.client.algorand.client.algod.suggested_params()
+            self._params = params
+            self._params_expiry = time.monotonic() + self.round_ttl
+            self._observe_round(params.first)
+            if self.share_suggested_params:
+                self.client.algorand.set_suggested_params_cache(
+                    params, time.time() + self.round_ttl
+                )
+            return params
+
+    @property
+    def round(self) -> int:
+        self._refresh()
+        return self._round
+
+    def suggested_params(self) -> SuggestedParams:
+        """Suggested params of the current round, copied so callers may mutate them."""
+        params = self._refresh()
+        return SuggestedParams(
+            params.fee,
+            params.first,
+            params.last,
+            params.gh,
+            params.gen,
+            flat_fee=params.flat_fee,
+            consensus_version=params.consensus_version,
+            min_fee=params.min_fee,
+        )
+
+    # ---- readonly reads ----
+
+    def _read_many(
+        self,
+        kind: str,
+        keys: Sequence[_K],
+        fetch: typing.Callable[[list[_K]], list[typing.Any]],
+    ) -> list[typing.Any]:
+        self._refresh()
+        found: dict[_K, typing.Any] = {}
+        misses: list[_K] = []
+        for key in dict.fromkeys(keys):
+            value = self.reads.get((kind, key), _MISSING)
+            if value is _MISSING:
+                misses.append(key)
+            else:
+                found[key] = value
+        if misses:
+            fetched_round = self._round
+            for key, value in zip(misses, fetch(misses), strict=True):
+                found[key] = value
+                # A read that raced a round change may already be stale.
+                if fetched_round == self._round:
+                    self.reads.put((kind, key), value)
+        return [found[key] for key in keys]
+
+    def get_groups(self, group_ids: Sequence[int]) -> list[Group | None]:
+        return self._read_many(
+            "group", group_ids, lambda ids: bulk_reads.get_groups(self.client, ids)
+        )
+
+    def get_bills(self, bill_keys: Sequence[BillKey]) -> list[Bill | None]:
+        return self._read_many(
+            "bill", bill_keys, lambda keys: bulk_reads.get_bills(self.client, keys)
+        )
+
+    def get_group(self, group_id: int) -> Group | None:
+        return self.get_groups([group_id])[0]  # type: ignore[no-any-return]
+
+    def get_bill(self, bill_key: BillKey) -> Bill | None:
+        return self.get_bills([bill_key])[0]  # type: ignore[no-any-return]
+
+    # ---- invalidation ----
+
+    def invalidate_logs(self, logs: Iterable[bytes]) -> None:
+        """Drop entries named by `GroupCreated`/`BillChanged` events in `logs`."""
+        for log in logs:
+            selector, payload = log[:4], log[4:]
+            if selector == GROUP_CREATED and len(payload) == U64.size:
+                (group_id,) = U64.unpack(payload)
+                self.reads.pop(("group", group_id))
+            elif selector == BILL_CHANGED and len(payload) == BILL_KEY_LAYOUT.size:
+                group_id, bill_id = BILL_KEY_LAYOUT.unpack(payload)
+                self.reads.pop(("bill", BillKey(group_id=group_id, bill_id=bill_id)))
+                # create_bill also bumps the group's bill_counter.
+                self.reads.pop(("group", group_id))
+
+    def invalidate_result(self, result: object) -> None:
+        """
+        Invalidate from a send result (anything with `confirmations`/`confirmation`)
+        or from raw confirmation dicts. A confirmed round newer than the cached one
+        drops every read.
+        """
+        logs, confirmed_round = _confirmation_logs(result)
+        self._observe_round(confirmed_round)
+        self.invalidate_logs(logs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._params = None
+            self._params_expiry = 0.0
+        self.reads.clear()
+
+    def stats(self) -> dict[str, CacheStats]:
+        return {
+            "reads": self.reads.stats(),
+            "suggested_params": CacheStats(
+                hits=self.params_hits,
+                misses=self.params_misses,
+                evictions=0,
+                size=int(self._params is not None),
+                maxsize=1,
+            ),
+        }
@@ -0,0 +1,176 @@
+"""
+Fixed-offset ARC-4 codecs for the Splitrix structs.
+
+These mirror the layouts emitted by the contract and decode to exactly the same
+values as `get_abi_decoded_value` + the generated dataclasses, without going
+through algosdk's generic ABI type machinery.
+
+    Group:     admin[32] bill_counter[8] @members[2] | len[2] address[32]*
+    Bill:      payer[32] total_amount[8] @debtors[2] @memo[2] | len[2] Debtor* | len[2] utf8
+    Debtor:    debtor[32] amount[8] paid[8]
+    BillKey:   group_id[8] bill_id[8]
+    PayerDebt: bill_id[8] bill_payer[32] payer_index[8] amount_to_cutoff[8] debtor_index[8]
+"""
+
+import functools
+import struct
+from collections.abc import Buffer
+
+from algosdk import encoding
+
+from smart_contracts.artifacts.splitrix.splitrix_client import Bill, BillKey, Group
+
+ADDRESS_SIZE = 32
+DEBTOR_SIZE = 48
+BILL_KEY_SIZE = 16
+PAYER_DEBT_SIZE = 64
+GROUP_HEAD_SIZE = 42
+BILL_HEAD_SIZE = 44
+
+U16 = struct.Struct(">H")
+U64 = struct.Struct(">Q")
+ADDRESS_LAYOUT = struct.Struct(">32s")
+GROUP_HEAD_LAYOUT = struct.Struct(">32sQH")
+BILL_HEAD_LAYOUT = struct.Struct(">32sQHH")
+DEBTOR_LAYOUT = struct.Struct(">32sQQ")
+BILL_KEY_LAYOUT = struct.Struct(">QQ")
+PAYER_DEBT_LAYOUT = struct.Struct(">Q32sQQQ")
+
+# Debtors decode to `[debtor, amount, paid]` lists, as the generated client does.
+Debtor = list[str | int]
+PayerDebt = tuple[int, str, int, int, int]
+
+
+@functools.lru_cache(maxsize=65536)
+def address_from_bytes(public_key: bytes) -> str:
+    """Cached base32 encoding, group members repeat across every bill they are in."""
+    return encoding.encode_address(public_key)  # type: ignore[no-any-return]
+
+
+@functools.lru_cache(maxsize=65536)
+def address_to_bytes(address: str) -> bytes:
+    return encoding.decode_address(address)  # type: ignore[no-any-return]
+
+
+def decode_group(buffer: Buffer) -> Group:
+    view = memoryview(buffer)
+    admin, bill_counter, members_offset = GROUP_HEAD_LAYOUT.unpack_from(view, 0)
+    (count,) = U16.unpack_from(view, members_offset)
+    start = members_offset + 2
+    members = [
+        address_from_bytes(member)
+        for (member,) in ADDRESS_LAYOUT.iter_unpack(view[start : start + count * ADDRESS_SIZE])
+    ]
+    return Group(
+        admin=address_from_bytes(admin), bill_counter=bill_counter, members=members
+    )
+
+
+def encode_group(group: Group) -> bytes:
+    members = [address_to_bytes(member) for member in group.members]
+    return b"".join(
+        [
+            GROUP_HEAD_LAYOUT.pack(
+                address_to_bytes(group.admin), group.bill_counter, GROUP_HEAD_SIZE
+            ),
+            U16.pack(len(members)),
+            *members,
+        ]
+    )
+
+
+def decode_debtor(buffer: Buffer, offset: int = 0) -> Debtor:
+    debtor, amount, paid = DEBTOR_LAYOUT.unpack_from(buffer, offset)
+    return [address_from_bytes(debtor), amount, paid]
+
+
+def encode_debtor(debtor: Debtor | tuple[str, int, int]) -> bytes:
+    address, amount, paid = debtor
+    return DEBTOR_LAYOUT.pack(address_to_bytes(address), amount, paid)
+
+
+def decode_bill(buffer: Buffer) -> Bill:
+    view = memoryview(buffer)
+    payer, total_amount, debtors_offset, memo_offset = BILL_HEAD_LAYOUT.unpack_from(view, 0)
+    (count,) = U16.unpack_from(view, debtors_offset)
+    start = debtors_offset + 2
+    debtors = [
+        [address_from_bytes(debtor), amount, paid]
+        for debtor, amount, paid in DEBTOR_LAYOUT.iter_unpack(
+            view[start : start + count * DEBTOR_SIZE]
+        )
+    ]
+    (memo_length,) = U16.unpack_from(view, memo_offset)
+    memo = str(view[memo_offset + 2 : memo_offset + 2 + memo_length], "utf-8")
+    return Bill(
+        payer=address_from_bytes(payer),
+        total_amount=total_amount,
+        debtors=debtors,
+        memo=memo,
+    )
+
+
+def encode_bill(bill: Bill) -> bytes:
+    debtors = [encode_debtor(debtor) for debtor in bill.debtors]
+    memo = bill.memo.encode("utf-8")
+    memo_offset = BILL_HEAD_SIZE + 2 + len(debtors) * DEBTOR_SIZE
+    return b"".join(
+        [
+            BILL_HEAD_LAYOUT.pack(
+                address_to_bytes(bill.payer),
+                bill.total_amount,
+                BILL_HEAD_SIZE,
+                memo_offset,
+            ),
+            U16.pack(len(debtors)),
+            *debtors,
+            U16.pack(len(memo)),
+            memo,
+        ]
+    )
+
+
+def bill_size(debtor_count: int, memo: str) -> int:
+    """Encoded size of a bill, used to budget box references before a bill exists."""
+    return BILL_HEAD_SIZE + 2 + debtor_count * DEBTOR_SIZE + 2 + len(memo.encode("utf-8"))
+
+
+def group_size(member_count: int) -> int:
+    return GROUP_HEAD_SIZE + 2 + member_count * ADDRESS_SIZE
+
+
+def decode_bill_key(buffer: Buffer, offset: int = 0) -> BillKey:
+    group_id, bill_id = BILL_KEY_LAYOUT.unpack_from(buffer, offset)
+    return BillKey(group_id=group_id, bill_id=bill_id)
+
+
+def encode_bill_key(bill_key: BillKey) -> bytes:
+    return BILL_KEY_LAYOUT.pack(bill_key.group_id, bill_key.bill_id)
+
+
+def decode_payer_debt(buffer: Buffer, offset: int = 0) -> PayerDebt:
+    bill_id, bill_payer, payer_index, amount_to_cutoff, debtor_index = (
+        PAYER_DEBT_LAYOUT.unpack_from(buffer, offset)
+    )
+    return (
+        bill_id,
+        address_from_bytes(bill_payer),
+        payer_index,
+        amount_to_cutoff,
+        debtor_index,
+    )
+
+
+def encode_payer_debt(payer_debt: PayerDebt) -> bytes:
+    bill_id, bill_payer, payer_index, amount_to_cutoff, debtor_index = payer_debt
+    return PAYER_DEBT_LAYOUT.pack(
+        bill_id,
+        address_to_bytes(bill_payer),
+        payer_index,
+        amount_to_cutoff,
+        debtor_index,
+    )
+
+
+def encode_uint64(value: int) -> bytes:
+    return U64.pack(value)
@@ -0,0 +1,234 @@
+"""
+Memory-compact mirror representation of Splitrix state.
+
+Addresses are interned once in an `AddressTable` and referenced by integer id,
+records use `__slots__`, and debtor rows live in shared `array.array` columns, so
+a debtor costs ~20 bytes instead of a list holding a 58-char string and two ints.
+"""
+
+from array import array
+from collections.abc import Buffer, Mapping
+
+from smart_contracts.artifacts.splitrix.splitrix_client import Bill, BillKey, Group
+from smart_contracts.splitrix.codec import (
+    ADDRESS_LAYOUT,
+    ADDRESS_SIZE,
+    BILL_HEAD_LAYOUT,
+    DEBTOR_LAYOUT,
+    DEBTOR_SIZE,
+    GROUP_HEAD_LAYOUT,
+    U16,
+    address_from_bytes,
+    address_to_bytes,
+)
+
+
+class AddressTable:
+    """Interns 32-byte public keys as dense integer ids."""
+
+    __slots__ = ("_ids", "_keys")
+
+    def __init__(self) -> None:
+        self._ids: dict[bytes, int] = {}
+        self._keys: list[bytes] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def intern(self, public_key: bytes) -> int:
+        address_id = self._ids.get(public_key)
+        if address_id is None:
+            address_id = self._ids[public_key] = len(self._keys)
+            self._keys.append(public_key)
+        return address_id
+
+    def id_of(self, address: str) -> int:
+        return self.intern(address_to_bytes(address))
+
+    def find(self, address: str) -> int | None:
+        """Id of an already interned address, without interning it."""
+        return self._ids.get(address_to_bytes(address))
+
+    def public_key(self, address_id: int) -> bytes:
+        return self._keys[address_id]
+
+    def address(self, address_id: int) -> str:
+        return address_from_bytes(self._keys[address_id])
+
+
+class CompactGroup:
+    __slots__ = ("admin", "bill_counter", "members")
+
+    def __init__(self, admin: int, bill_counter: int, members: array) -> None:
+        self.admin = admin
+        self.bill_counter = bill_counter
+        self.members = members
+
+
+class CompactBill:
+    """Bill header, its debtors are rows `start:start + count` of the state columns."""
+
+    __slots__ = ("payer", "total_amount", "start", "count", "memo")
+
+    def __init__(
+        self, payer: int, total_amount: int, start: int, count: int, memo: str
+    ) -> None:
+        self.payer = payer
+        self.total_amount = total_amount
+        self.start = start
+        self.count = count
+        self.memo = memo
+
+
+def compact_group(group: Group, table: AddressTable) -> CompactGroup:
+    return CompactGroup(
+        table.id_of(group.admin),
+        group.bill_counter,
+        array("I", [table.id_of(member) for member in group.members]),
+    )
+
+
+def expand_group(group: CompactGroup, table: AddressTable) -> Group:
+    return Group(
+        admin=table.address(group.admin),
+        bill_counter=group.bill_counter,
+        members=[table.address(member) for member in group.members],
+    )
+
+
+def decode_compact_group(buffer: Buffer, table: AddressTable) -> CompactGroup:
+    """Decode raw `groups` box bytes straight into a `CompactGroup`."""
+    view = memoryview(buffer)
+    admin, bill_counter, members_offset = GROUP_HEAD_LAYOUT.unpack_from(view, 0)
+    (count,) = U16.unpack_from(view, members_offset)
+    start = members_offset + 2
+    members = array(
+        "I",
+        [
+            table.intern(member)
+            for (member,) in ADDRESS_LAYOUT.iter_unpack(
+                view[start : start + count * ADDRESS_SIZE]
+            )
+        ],
+    )
+    return CompactGroup(table.intern(admin), bill_counter, members)
+
+
+class CompactState:
+    """
+    Compact in-memory copy of the `groups` and `bills` maps.
+
+    Debtor rows of every bill share three append-only columns. A bill's debtor
+    list never changes length on chain, so updates rewrite its rows in place.
+    """
+
+    __slots__ = ("addresses", "groups", "bills", "debtors", "amounts", "paid")
+
+    def __init__(self) -> None:
+        self.addresses = AddressTable()
+        self.groups: dict[int, CompactGroup] = {}
+        self.bills: dict[tuple[int, int], CompactBill] = {}
+        self.debtors = array("I")
+        self.amounts = array("Q")
+        self.paid = array("Q")
+
+    @classmethod
+    def from_maps(
+        cls, groups: Mapping[int, Group], bills: Mapping[BillKey, Bill]
+    ) -> "CompactState":
+        state = cls()
+        for group_id, group in groups.items():
+            state.set_group(group_id, group)
+        for bill_key, bill in bills.items():
+            state.set_bill(bill_key, bill)
+        return state
+
+    def _rows_for(self, key: tuple[int, int], count: int) -> int:
+        existing = self.bills.get(key)
+        if existing is not None and existing.count == count:
+            return existing.start
+        start = len(self.debtors)
+        self.debtors.extend([0] * count)
+        self.amounts.extend([0] * count)
+        self.paid.extend([0] * count)
+        return start
+
+    def set_group(self, group_id: int, group: Group) -> None:
+        self.groups[group_id] = compact_group(group, self.addresses)
+
+    def set_group_bytes(self, group_id: int, raw: Buffer) -> None:
+        self.groups[group_id] = decode_compact_group(raw, self.addresses)
+
+    def set_bill(self, bill_key: BillKey, bill: Bill) -> None:
+        key = (bill_key.group_id, bill_key.bill_id)
+        start = self._rows_for(key, len(bill.debtors))
+        for row, (debtor, amount, paid) in enumerate(bill.debtors, start):
+            self.debtors[row] = self.addresses.id_of(debtor)  # type: ignore[arg-type]
+            self.amounts[row] = amount  # type: ignore[assignment]
+            self.paid[row] = paid  # type: ignore[assignment]
+        self.bills[key] = CompactBill(
+            self.addresses.id_of(bill.payer),
+            bill.total_amount,
+            start,
+            len(bill.debtors),
+            bill.memo,
+        )
+
+    def set_bill_bytes(self, bill_key: BillKey, raw: Buffer) -> None:
+        """Decode raw `bills` box bytes straight into the columns, skipping base32."""
+        view = memoryview(raw)
+        payer, total_amount, debtors_offset, memo_offset = BILL_HEAD_LAYOUT.unpack_from(
+            view, 0
+        )
+        (count,) = U16.unpack_from(view, debtors_offset)
+        key = (bill_key.group_id, bill_key.bill_id)
+        start = self._rows_for(key, count)
+        first = debtors_offset + 2
+        for row, (debtor, amount, paid) in enumerate(
+            DEBTOR_LAYOUT.iter_unpack(view[first : first + count * DEBTOR_SIZE]), start
+        ):
+            self.debtors[row] = self.addresses.intern(debtor)
+            self.amounts[row] = amount
+            self.paid[row] = paid
+        (memo_length,) = U16.unpack_from(view, memo_offset)
+        memo = str(view[memo_offset + 2 : memo_offset + 2 + memo_length], "utf-8")
+        self.bills[key] = CompactBill(
+            self.addresses.intern(payer), total_amount, start, count, memo
+        )
+
+    def outstanding(self, bill_key: BillKey, index: int) -> int:
+        bill = self.bills[(bill_key.group_id, bill_key.bill_id)]
+        row = bill.start + index
+        return self.amounts[row] - self.paid[row]
+
+    def group(self, group_id: int) -> Group | None:
+        group = self.groups.get(group_id)
+        return expand_group(group, self.addresses) if group is not None else None
+
+    def bill(self, bill_key: BillKey) -> Bill | None:
+        bill = self.bills.get((bill_key.group_id, bill_key.bill_id))
+        return self._expand_bill(bill) if bill is not None else None
+
+    def _expand_bill(self, bill: CompactBill) -> Bill:
+        rows = range(bill.start, bill.start + bill.count)
+        return Bill(
+            payer=self.addresses.address(bill.payer),
+            total_amount=bill.total_amount,
+            debtors=[
+                [self.addresses.address(self.debtors[row]), self.amounts[row], self.paid[row]]
+                for row in rows
+            ],
+            memo=bill.memo,
+        )
+
+    def to_maps(self) -> tuple[dict[int, Group], dict[BillKey, Bill]]:
+        return (
+            {
+                group_id: expand_group(group, self.addresses)
+                for group_id, group in self.groups.items()
+            },
+            {
+                BillKey(group_id=group_id, bill_id=bill_id): self._expand_bill(bill)
+                for (group_id, bill_id), bill in self.bills.items()
+            },
+        )
@@ -0,0 +1,211 @@
+"""
+Block-following confirmation tracker.
+
+Instead of polling `pending_transaction_info` for every submitted transaction,
+`ConfirmationTracker` waits for each new block once with `status_after_block`,
+reads the block's top-level transaction ids and resolves the futures of every
+transaction it contains. Load on algod is O(rounds), not O(transactions).
+"""
+
+import base64
+import dataclasses
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from concurrent.futures import Future
+
+from algokit_utils.transactions.transaction_composer import prepare_group_for_sending
+from algosdk import error
+from algosdk.transaction import GenericSignedTransaction
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts.artifacts.splitrix.splitrix_client import SplitrixComposer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class _Waiter:
+    future: Future[int]
+    last_valid: int | None
+
+
+class ConfirmationTracker:
+    """
+    Resolves `track(tx_id)` futures with the round the transaction committed in.
+
+    A background thread follows blocks only while something is being tracked. The
+    ids of the last `history_rounds` blocks are remembered, so a transaction that
+    committed just before `track` was called still resolves. Futures of
+    transactions whose `last_valid` round passes without them fail with
+    `ConfirmationTimeoutError`.
+    """
+
+    def __init__(
+        self,
+        algod: AlgodClient,
+        *,
+        history_rounds: int = 16,
+        max_wait_rounds: int = 1000,
+    ) -> None:
+        self.algod = algod
+        self.history_rounds = history_rounds
+        self.max_wait_rounds = max_wait_rounds
+        self._waiters: dict[str, _Waiter] = {}
+        self._recent: OrderedDict[int, set[str]] = OrderedDict()
+        self._round: int | None = None
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="confirmation-tracker", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "ConfirmationTracker":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        for waiter in self._waiters.values():
+            waiter.future.cancel()
+        self._waiters.clear()
+
+    @property
+    def pending(self) -> int:
+        return len(self._waiters)
+
+    def track(self, tx_id: str, last_valid: int | None = None) -> Future[int]:
+        """Future resolving to the confirmed round of `tx_id`."""
+        future: Future[int] = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("ConfirmationTracker is closed")
+            for confirmed_round, tx_ids in self._recent.items():
+                if tx_id in tx_ids:
+                    future.set_result(confirmed_round)
+                    return future
+            existing = self._waiters.get(tx_id)
+            if existing is not None:
+                return existing.future
+            self._waiters[tx_id] = _Waiter(future, last_valid)
+            self._condition.notify_all()
+        return future
+
+    def track_many(
+        self, tx_ids: Iterable[str], last_valid: int | None = None
+    ) -> list[Future[int]]:
+        return [self.track(tx_id, last_valid) for tx_id in tx_ids]
+
+    def wait(self, tx_id: str, last_valid: int | None = None, timeout: float | None = None) -> int:
+        return self.track(tx_id, last_valid).result(timeout)
+
+    def _process_round(self, round_num: int) -> None:
+        tx_ids = set(self.algod.get_block_txids(round_num)["blockTxids"] or [])
+        with self._condition:
+            self._recent[round_num] = tx_ids
+            while len(self._recent) > self.history_rounds:
+                self._recent.popitem(last=False)
+            self._round = round_num
+            for tx_id in tx_ids & self._waiters.keys():
+                self._waiters.pop(tx_id).future.set_result(round_num)
+            for tx_id, waiter in list(self._waiters.items()):
+                if waiter.last_valid is not None and waiter.last_valid <= round_num:
+                    del self._waiters[tx_id]
+                    waiter.future.set_exception(
+                        error.ConfirmationTimeoutError(
+                            f"Transaction {tx_id} was not committed by its last valid round {waiter.last_valid}"
+                        )
+                    )
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._waiters and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                cursor = self._round
+            try:
+                last_round = self.algod.status()["last-round"]
+                # Catch up on blocks committed while idle, within the history window.
+                start = last_round - self.history_rounds + 1
+                if cursor is not None:
+                    start = max(start, cursor + 1)
+                for round_num in range(start, last_round + 1):
+                    self._process_round(round_num)
+                while True:
+                    with self._condition:
+                        if not self._waiters or self._closed:
+                            break
+                    last_round = self.algod.status_after_block(last_round)["last-round"]
+                    for round_num in range(self._round + 1, last_round + 1):  # type: ignore[operator]
+                        self._process_round(round_num)
+                    self._expire_stale(last_round)
+            except Exception as e:
+                logger.warning(f"Confirmation tracker failed, failing {self.pending} waiters: {e}")
+                with self._condition:
+                    waiters, self._waiters = self._waiters, {}
+                for waiter in waiters.values():
+                    waiter.future.set_exception(e)
+
+    def _expire_stale(self, current_round: int) -> None:
+        """Give waiters tracked without a `last_valid` a `max_wait_rounds` deadline."""
+        with self._condition:
+            for waiter in self._waiters.values():
+                if waiter.last_valid is None:
+                    waiter.last_valid = current_round + self.max_wait_rounds
+
+
+@dataclasses.dataclass(kw_only=True)
+class SubmittedGroup:
+    group_id: str
+    tx_ids: list[str]
+    confirmed: Future[int]
+
+
+def submit_signed(
+    algod: AlgodClient,
+    tracker: ConfirmationTracker,
+    signed: Sequence[GenericSignedTransaction],
+) -> Future[int]:
+    """Send a signed atomic group and track its commit, without polling it."""
+    algod.send_transactions(signed)
+    # Groups commit atomically, the last transaction stands for the whole group.
+    last = signed[-1]
+    return tracker.track(last.get_txid(), last.transaction.last_valid_round)
+
+
+def send_composers(
+    composers: Iterable[SplitrixComposer],
+    tracker: ConfirmationTracker,
+    *,
+    populate_app_call_resources: bool = True,
+) -> list[SubmittedGroup]:
+    """
+    Build, sign and send many `SplitrixComposer` groups back to back, then leave
+    their confirmation to `tracker`. Use `SubmittedGroup.confirmed.result()` to
+    wait for a group.
+    """
+    submitted = []
+    for composer in composers:
+        algod = composer.client.algorand.client.algod
+        atc = composer.composer().build().atc
+        if populate_app_call_resources:
+            atc = prepare_group_for_sending(atc, algod, populate_app_call_resources=True)
+        txns = [t.txn for t in atc.build_group()]
+        signed = atc.gather_signatures()
+        submitted.append(
+            SubmittedGroup(
+                group_id=base64.b64encode(txns[0].group).decode() if txns[0].group else "",
+                tx_ids=[txn.get_txid() for txn in txns],
+                confirmed=submit_signed(algod, tracker, signed),
+            )
+        )
+    return submitted
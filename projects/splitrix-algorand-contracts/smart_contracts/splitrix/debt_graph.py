@@ -0,0 +1,282 @@
+"""
+Incrementally maintained who-owes-whom graph for Splitrix groups.
+
+Edges are keyed by `(group_id, debtor, creditor)` and hold the debtor's total
+outstanding amount across the creditor's bills. Every change to a bill is
+applied as per-row deltas against the bill's previously recorded rows, so
+creating a bill, cutting off a netted debt or settling one costs O(1) per
+debtor entry. Per-address adjacency maps and per-group creditor totals answer
+"what does X owe in G" and "top creditors" without scanning bills.
+
+The graph also remembers which bills make up each edge, which is exactly what
+the `create_bill` netting planner needs to build `PayerDebt` inputs.
+"""
+
+import heapq
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+
+from algosdk.constants import ZERO_ADDRESS
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    CreateBillArgs,
+    SplitrixClient,
+)
+from smart_contracts.splitrix import bulk_reads
+from smart_contracts.splitrix.codec import PayerDebt
+from smart_contracts.splitrix.compact import CompactState
+from smart_contracts.splitrix.event_indexer import SplitrixEvent
+
+_Edge = tuple[int, str, str]
+
+
+def contract_debtors(debtors: Iterable[tuple[str, int]]) -> list[tuple[str, int]]:
+    """The debtor list `create_bill` stores: zero addresses and repeats dropped, first wins."""
+    kept: dict[str, int] = {}
+    for debtor, amount in debtors:
+        if debtor != ZERO_ADDRESS and debtor not in kept:
+            kept[debtor] = amount
+    return list(kept.items())
+
+
+class _BillRows:
+    """What the graph last recorded for one bill: payer, debtors and outstanding per row."""
+
+    __slots__ = ("payer", "debtors", "outstanding")
+
+    def __init__(self, payer: str, debtors: list[str], outstanding: list[int]) -> None:
+        self.payer = payer
+        self.debtors = debtors
+        self.outstanding = outstanding
+
+
+class DebtGraph:
+    """
+    Outstanding debts per `(group_id, debtor, creditor)`, kept current row by row.
+
+    Feed it with `set_bill` (from a mirror or box load), with `apply_events`
+    from the event indexer, or with `apply_create_bill`/`apply_settle` when the
+    submitted arguments are known, which replays the contract's arithmetic
+    without re-reading the bills.
+    """
+
+    def __init__(self) -> None:
+        self._bills: dict[tuple[int, int], _BillRows] = {}
+        self._edges: dict[_Edge, int] = {}
+        # bill_id -> (row index, outstanding) for every bill behind an edge.
+        self._edge_bills: defaultdict[_Edge, dict[int, tuple[int, int]]] = defaultdict(dict)
+        self._owes: defaultdict[tuple[int, str], dict[str, int]] = defaultdict(dict)
+        self._owed: defaultdict[tuple[int, str], dict[str, int]] = defaultdict(dict)
+        self._credit: defaultdict[int, dict[str, int]] = defaultdict(dict)
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_bills(
+        cls, bills: Mapping[BillKey, Bill] | Iterable[tuple[BillKey, Bill]]
+    ) -> "DebtGraph":
+        graph = cls()
+        for key, bill in bills.items() if isinstance(bills, Mapping) else bills:
+            graph.set_bill(key, bill)
+        return graph
+
+    @classmethod
+    def from_compact(cls, state: CompactState) -> "DebtGraph":
+        """Build from a `CompactState` (e.g. `SplitrixMirror.compact`) without expanding bills."""
+        graph = cls()
+        addresses = state.addresses
+        for (group_id, bill_id), bill in state.bills.items():
+            rows = range(bill.start, bill.start + bill.count)
+            graph._set_rows(
+                (group_id, bill_id),
+                addresses.address(bill.payer),
+                [addresses.address(state.debtors[row]) for row in rows],
+                [state.amounts[row] - state.paid[row] for row in rows],
+            )
+        return graph
+
+    # ---- updates ----
+
+    def _adjust(self, edge: _Edge, bill_id: int, index: int, old: int, new: int) -> None:
+        """Move one bill row from `old` to `new` outstanding, keeping every index in step."""
+        delta = new - old
+        if not delta:
+            return
+        group_id, debtor, creditor = edge
+        total = self._edges.get(edge, 0) + delta
+        bills = self._edge_bills[edge]
+        if new:
+            bills[bill_id] = (index, new)
+        else:
+            bills.pop(bill_id, None)
+        owes = self._owes[(group_id, debtor)]
+        owed = self._owed[(group_id, creditor)]
+        credit = self._credit[group_id]
+        credit[creditor] = credit.get(creditor, 0) + delta
+        if total:
+            self._edges[edge] = owes[creditor] = owed[debtor] = total
+        else:
+            self._edges.pop(edge, None)
+            self._edge_bills.pop(edge, None)
+            owes.pop(creditor, None)
+            owed.pop(debtor, None)
+        if not credit[creditor]:
+            del credit[creditor]
+
+    def _set_rows(
+        self, key: tuple[int, int], payer: str, debtors: list[str], outstanding: list[int]
+    ) -> None:
+        group_id, bill_id = key
+        previous = self._bills.get(key)
+        if previous is not None and (previous.payer != payer or previous.debtors != debtors):
+            # Not something the contract does; drop the old rows before re-adding.
+            for index, (debtor, owed) in enumerate(
+                zip(previous.debtors, previous.outstanding, strict=True)
+            ):
+                if debtor != previous.payer:
+                    self._adjust((group_id, debtor, previous.payer), bill_id, index, owed, 0)
+            previous = None
+        for index, (debtor, owed) in enumerate(zip(debtors, outstanding, strict=True)):
+            if debtor == payer:
+                continue
+            old = previous.outstanding[index] if previous is not None else 0
+            self._adjust((group_id, debtor, payer), bill_id, index, old, owed)
+        self._bills[key] = _BillRows(payer, debtors, outstanding)
+
+    def set_bill(self, key: BillKey, bill: Bill) -> None:
+        """Record the current state of a bill, applying only the rows that changed."""
+        with self._lock:
+            self._set_rows(
+                (key.group_id, key.bill_id),
+                bill.payer,
+                [debtor for debtor, _, _ in bill.debtors],  # type: ignore[misc]
+                [amount - paid for _, amount, paid in bill.debtors],  # type: ignore[operator]
+            )
+
+    def _set_row(self, key: tuple[int, int], index: int, outstanding: int) -> None:
+        rows = self._bills[key]
+        debtor = rows.debtors[index]
+        if debtor != rows.payer:
+            self._adjust(
+                (key[0], debtor, rows.payer), key[1], index, rows.outstanding[index], outstanding
+            )
+        rows.outstanding[index] = outstanding
+
+    def apply_settle(self, key: BillKey, sender_index: int, amount: int) -> int:
+        """Replay a confirmed `settle_bill` payment, returning the amount applied after the cap."""
+        with self._lock:
+            rows = self._bills[(key.group_id, key.bill_id)]
+            applied = min(amount, rows.outstanding[sender_index])
+            self._set_row(
+                (key.group_id, key.bill_id), sender_index, rows.outstanding[sender_index] - applied
+            )
+            return applied
+
+    def apply_create_bill(self, bill_id: int, args: CreateBillArgs) -> None:
+        """
+        Replay a confirmed `create_bill` with the id it returned: record the new
+        bill's rows, then apply every `payers_debt` cutoff to both bills.
+        """
+        with self._lock:
+            debtors = contract_debtors(args.debtors)
+            key = (args.group_id, bill_id)
+            self._set_rows(
+                key,
+                args.payer,
+                [debtor for debtor, _ in debtors],
+                # The payer's own share is stored as paid.
+                [0 if debtor == args.payer else amount for debtor, amount in debtors],
+            )
+            for old_bill_id, _, payer_index, cutoff, debtor_index in args.payers_debt:
+                old_rows = self._bills[(args.group_id, old_bill_id)]
+                self._set_row(
+                    (args.group_id, old_bill_id),
+                    payer_index,
+                    old_rows.outstanding[payer_index] - cutoff,
+                )
+                new_rows = self._bills[key]
+                self._set_row(key, debtor_index, new_rows.outstanding[debtor_index] - cutoff)
+
+    def apply_events(self, client: SplitrixClient, events: Sequence[SplitrixEvent]) -> None:
+        """Indexer handler: re-read the bills named by `events` and apply their changed rows."""
+        bill_keys = {event.args[0] for event in events if event.name == "BillChanged"}
+        ordered_keys = sorted(bill_keys, key=lambda k: (k.group_id, k.bill_id))
+        bills = bulk_reads.get_bills(client, ordered_keys) if ordered_keys else []
+        for key, bill in zip(ordered_keys, bills, strict=True):
+            if bill is not None:
+                self.set_bill(key, bill)
+
+    # ---- queries ----
+
+    def debt(self, group_id: int, debtor: str, creditor: str) -> int:
+        return self._edges.get((group_id, debtor, creditor), 0)
+
+    def owes(self, debtor: str, group_id: int) -> dict[str, int]:
+        """What `debtor` owes each creditor in a group."""
+        with self._lock:
+            return dict(self._owes.get((group_id, debtor), {}))
+
+    def owed_to(self, creditor: str, group_id: int) -> dict[str, int]:
+        """What each debtor in a group owes `creditor`."""
+        with self._lock:
+            return dict(self._owed.get((group_id, creditor), {}))
+
+    def balance(self, address: str, group_id: int) -> int:
+        """What others owe `address` in a group minus what it owes."""
+        with self._lock:
+            return sum(self._owed.get((group_id, address), {}).values()) - sum(
+                self._owes.get((group_id, address), {}).values()
+            )
+
+    def top_creditors(self, group_id: int, count: int = 10) -> list[tuple[str, int]]:
+        """The `count` members owed the most in a group, largest first."""
+        with self._lock:
+            credit = self._credit.get(group_id, {})
+            return heapq.nlargest(count, credit.items(), key=lambda item: item[1])
+
+    def bills_behind(self, group_id: int, debtor: str, creditor: str) -> dict[int, int]:
+        """`bill_id -> outstanding` for the creditor's bills that `debtor` still owes on."""
+        with self._lock:
+            rows = self._edge_bills.get((group_id, debtor, creditor), {})
+            return {bill_id: owed for bill_id, (_, owed) in rows.items()}
+
+    # ---- netting ----
+
+    def plan_netting(
+        self, group_id: int, payer: str, debtors: Sequence[tuple[str, int]]
+    ) -> list[PayerDebt]:
+        """
+        `payers_debt` for a new bill paid by `payer`: for each debtor of the new
+        bill, cut off what `payer` still owes them on older bills, oldest first,
+        up to that debtor's share. Indexes follow the contract's de-duplicated
+        debtor list. Costs O(bills behind each netted edge), never a bill scan.
+        """
+        with self._lock:
+            plan: list[PayerDebt] = []
+            for index, (debtor, capacity) in enumerate(contract_debtors(debtors)):
+                if debtor == payer:
+                    continue
+                edge_bills = self._edge_bills.get((group_id, payer, debtor), {})
+                for bill_id in sorted(edge_bills):
+                    if not capacity:
+                        break
+                    payer_index, owed = edge_bills[bill_id]
+                    cutoff = min(owed, capacity)
+                    plan.append((bill_id, debtor, payer_index, cutoff, index))
+                    capacity -= cutoff
+            return plan
+
+    def create_bill_args(
+        self, group_id: int, payer: str, debtors: Sequence[tuple[str, int]], memo: str
+    ) -> CreateBillArgs:
+        """`CreateBillArgs` for a new bill with netting against `payer`'s open debts filled in."""
+        return CreateBillArgs(
+            group_id=group_id,
+            payer=payer,
+            total_amount=sum(amount for _, amount in contract_debtors(debtors)),
+            debtors=list(debtors),
+            memo=memo,
+            payers_debt=list(self.plan_netting(group_id, payer, debtors)),
+        )
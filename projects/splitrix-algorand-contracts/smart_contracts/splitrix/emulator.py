@@ -0,0 +1,238 @@
+"""
+Run the Splitrix contract in-process on the algorand-python-testing ledger.
+
+`EmulatedSplitrix` instantiates `contract.Splitrix` inside an
+`algopy_testing_context` and exposes its ABI methods with the generated
+client's argument types, so long operation sequences run without algod or
+LocalNet. Box contents are read straight from the emulated ledger and are the
+bytes a deployed app would store.
+
+    with EmulatedSplitrix() as app:
+        group_id = app.create_group(CreateGroupArgs(admin=a, members=[b, c]))
+        bill_id = app.create_bill(CreateBillArgs(group_id=group_id, ...))
+        app.settle_bill(group_id, bill_id, 1, sender=b, receiver=a, amount=10)
+
+The emulator executes the contract's Python source, not the compiled TEAL:
+opcode budgets, resource references and minimum balances are not enforced, and
+payments do not move funds. It also keeps the writes of a call that fails
+part-way, so every call journals the app's global state and boxes and rolls
+them back when the contract rejects it, as the AVM would.
+"""
+
+import contextlib
+import importlib.metadata
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import algopy
+import algopy_testing
+from algopy import arc4
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    CreateBillArgs,
+    CreateGroupArgs,
+    Group,
+)
+from smart_contracts.splitrix import contract
+from smart_contracts.splitrix.box_loader import (
+    BILLS_PREFIX,
+    GROUPS_PREFIX,
+    bill_key_from_box_name,
+    group_id_from_box_name,
+)
+from smart_contracts.splitrix.codec import (
+    decode_bill,
+    decode_group,
+    encode_bill_key,
+    encode_uint64,
+)
+from smart_contracts.splitrix.reference_model import ContractRejected
+
+# What the emulator raises where the AVM would fail the transaction.
+_REJECTIONS = (AssertionError, ArithmeticError, LookupError, ValueError)
+_MISSING = object()
+
+
+@contextlib.contextmanager
+def _one_field_tuples() -> Iterator[None]:
+    """
+    algorand-python-testing 0.x parameterizes the tuple behind a one-field
+    struct as `Tuple[T]` rather than `Tuple[(T,)]` and fails while emitting
+    `GroupCreated`/`BillChanged`; register those tuple types while the
+    emulator runs, leaving the library as it was afterwards.
+    """
+    if not importlib.metadata.version("algorand-python-testing").startswith("0."):
+        yield
+        return
+    added = [
+        field_type
+        for field_type in (arc4.UInt64, contract.BillKey)
+        if field_type not in arc4.Tuple.__concrete__
+    ]
+    for field_type in added:
+        arc4.Tuple.__concrete__[field_type] = arc4.Tuple[(field_type,)]
+    try:
+        yield
+    finally:
+        for field_type in added:
+            arc4.Tuple.__concrete__.pop(field_type, None)
+
+
+class _JournaledDict(dict[bytes, Any]):
+    """Ledger storage that remembers each key's value before its first write."""
+
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+        self.undo: dict[bytes, Any] = {}
+
+    def __setitem__(self, key: bytes, value: Any) -> None:
+        if key not in self.undo:
+            self.undo[key] = self.get(key, _MISSING)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: bytes) -> None:
+        if key not in self.undo:
+            self.undo[key] = self.get(key, _MISSING)
+        super().__delitem__(key)
+
+    def commit(self) -> None:
+        self.undo.clear()
+
+    def rollback(self) -> None:
+        for key, value in self.undo.items():
+            if value is _MISSING:
+                super().pop(key, None)
+            else:
+                super().__setitem__(key, value)
+        self.undo.clear()
+
+
+class EmulatedSplitrix:
+    """A fresh Splitrix app on an emulated ledger, usable as a context manager."""
+
+    def __init__(self) -> None:
+        self._stack = contextlib.ExitStack()
+
+    def __enter__(self) -> "EmulatedSplitrix":
+        self._stack.enter_context(_one_field_tuples())
+        self.context = self._stack.enter_context(algopy_testing.algopy_testing_context())
+        self.contract = contract.Splitrix()
+        # Every write goes through the ledger's per-app dicts, so journaling them
+        # is enough to undo a rejected call.
+        app_data = self.context.ledger._get_app_data(self.contract)
+        self._boxes = app_data.boxes = _JournaledDict(app_data.boxes)
+        self._global_state = app_data.global_state = _JournaledDict(app_data.global_state)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stack.close()
+
+    def _call(self, method: Callable[[], Any]) -> Any:
+        try:
+            result = method()
+        except _REJECTIONS as error:
+            self._boxes.rollback()
+            self._global_state.rollback()
+            message = str(error) if isinstance(error, AssertionError) else repr(error)
+            raise ContractRejected(message) from error
+        self._boxes.commit()
+        self._global_state.commit()
+        return result
+
+    # ---- ABI methods ----
+
+    def create_group(self, args: CreateGroupArgs) -> int:
+        members = arc4.DynamicArray[arc4.Address](*map(arc4.Address, args.members))
+        result = self._call(lambda: self.contract.create_group(arc4.Address(args.admin), members))
+        return int(result.native)
+
+    def create_bill(self, args: CreateBillArgs) -> int:
+        debtors = arc4.DynamicArray[contract.DebtorMinimal](
+            *(
+                contract.DebtorMinimal(debtor=arc4.Address(debtor), amount=arc4.UInt64(amount))
+                for debtor, amount in args.debtors
+            )
+        )
+        payers_debt = arc4.DynamicArray[contract.PayerDebt](
+            *(
+                contract.PayerDebt(
+                    bill_id=arc4.UInt64(bill_id),
+                    bill_payer=arc4.Address(bill_payer),
+                    payer_index_in_bill_debtors=arc4.UInt64(payer_index),
+                    amount_to_cutoff=arc4.UInt64(cutoff),
+                    debtor_index_in_current_bill=arc4.UInt64(debtor_index),
+                )
+                for bill_id, bill_payer, payer_index, cutoff, debtor_index in args.payers_debt
+            )
+        )
+        result = self._call(
+            lambda: self.contract.create_bill(
+                arc4.UInt64(args.group_id),
+                arc4.Address(args.payer),
+                arc4.UInt64(args.total_amount),
+                debtors,
+                arc4.String(args.memo),
+                payers_debt,
+            )
+        )
+        return int(result.native)
+
+    def settle_bill(
+        self,
+        group_id: int,
+        bill_id: int,
+        sender_index: int,
+        *,
+        sender: str,
+        receiver: str,
+        amount: int,
+    ) -> None:
+        """`settle_bill` with a payment of `amount` from `sender` to `receiver` in front of it."""
+        payment = self.context.any.txn.payment(
+            sender=algopy.Account(sender),
+            receiver=algopy.Account(receiver),
+            amount=algopy.UInt64(amount),
+        )
+        call = self.context.txn.defer_app_call(
+            self.contract.settle_bill,
+            arc4.UInt64(group_id),
+            arc4.UInt64(bill_id),
+            arc4.UInt64(sender_index),
+            payment,
+        )
+
+        def submit() -> None:
+            with self.context.txn.create_group([payment, call]):
+                call.submit()
+
+        self._call(submit)
+
+    # ---- state ----
+
+    @property
+    def group_counter(self) -> int:
+        return int(self._global_state[b"group_counter"])
+
+    def get_group(self, group_id: int) -> Group | None:
+        value = self._boxes.get(GROUPS_PREFIX + encode_uint64(group_id))
+        return decode_group(value) if value is not None else None
+
+    def get_bill(self, key: BillKey) -> Bill | None:
+        value = self._boxes.get(BILLS_PREFIX + encode_bill_key(key))
+        return decode_bill(value) if value is not None else None
+
+    def boxes(self) -> dict[bytes, bytes]:
+        """Box name -> value as stored by the contract."""
+        return dict(self._boxes)
+
+    def iter_groups(self) -> Iterator[tuple[int, Group]]:
+        for name, value in self._boxes.items():
+            if name.startswith(GROUPS_PREFIX):
+                yield group_id_from_box_name(name), decode_group(value)
+
+    def iter_bills(self) -> Iterator[tuple[BillKey, Bill]]:
+        for name, value in self._boxes.items():
+            if name.startswith(BILLS_PREFIX):
+                yield bill_key_from_box_name(name), decode_bill(value)
@@ -0,0 +1,326 @@
+"""
+ARC-28 event indexer for Splitrix.
+
+Python counterpart of the backend's block scanner: blocks are fetched in
+concurrent batches as msgpack, application calls (including inner ones) to the
+Splitrix app are picked out, their logs are matched against a precomputed
+selector table and decoded with the struct codecs. The last fully processed round
+is checkpointed to a JSON file after each batch, so a restarted indexer resumes
+where it stopped and handlers see every event at least once.
+
+Blocks can also be recorded to and replayed from a directory with
+`record_blocks` and `RecordedBlockSource`, e.g. to re-run an indexer offline.
+"""
+
+import dataclasses
+import json
+import logging
+import os
+import typing
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+import msgpack
+from algosdk import abi, encoding
+from algosdk.v2client.algod import AlgodClient
+
+from smart_contracts.artifacts.splitrix.splitrix_client import APP_SPEC, BillKey
+from smart_contracts.splitrix.codec import BILL_KEY_LAYOUT, U64
+from smart_contracts.splitrix.retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+Block = dict[str, typing.Any]
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class SplitrixEvent:
+    """One decoded event, `path` locates the emitting call: top-level index then inner indexes."""
+
+    name: str
+    args: tuple[typing.Any, ...]
+    round: int
+    path: tuple[int, ...]
+    log_index: int
+
+
+_EventDecoder = Callable[[bytes], tuple[typing.Any, ...]]
+
+# Fixed-layout decoders for the Splitrix events, anything else goes through algosdk.
+_FAST_DECODERS: dict[str, _EventDecoder] = {
+    "GroupCreated(uint64)": lambda data: U64.unpack(data),
+    "BillChanged((uint64,uint64))": lambda data: (
+        BillKey(*BILL_KEY_LAYOUT.unpack(data)),
+    ),
+}
+
+
+def _event_signatures() -> dict[str, str]:
+    signatures = {}
+    for method in APP_SPEC.methods:
+        for event in method.events or []:
+            types = ",".join(str(arg.type) for arg in event.args)
+            signatures[f"{event.name}({types})"] = event.name
+    return signatures
+
+
+def _generic_decoder(signature: str) -> _EventDecoder:
+    args_type = abi.TupleType.from_string(signature[signature.index("(") :])
+    return lambda data: tuple(args_type.decode(data))
+
+
+def build_selector_table() -> dict[bytes, tuple[str, _EventDecoder]]:
+    """Map each ARC-28 selector (sha512/256 of the event signature, 4 bytes) to its decoder."""
+    return {
+        encoding.checksum(signature.encode())[:4]: (
+            name,
+            _FAST_DECODERS.get(signature) or _generic_decoder(signature),
+        )
+        for signature, name in _event_signatures().items()
+    }
+
+
+SELECTORS = build_selector_table()
+
+
+def _app_calls(
+    entries: list[dict[str, typing.Any]], app_id: int, path: tuple[int, ...] = ()
+) -> Iterator[tuple[tuple[int, ...], list[bytes]]]:
+    """Yield `(path, logs)` for every call, top-level or inner, to `app_id`."""
+    for index, entry in enumerate(entries):
+        txn = entry.get("txn", {})
+        apply_data = entry.get("dt") or {}
+        if txn.get("type") == "appl" and txn.get("apid", entry.get("apid")) == app_id:
+            logs = apply_data.get("lg")
+            if logs:
+                yield (*path, index), logs
+        inner = apply_data.get("itx")
+        if inner:
+            yield from _app_calls(inner, app_id, (*path, index))
+
+
+def decode_block_events(
+    block: Block,
+    app_id: int,
+    selectors: dict[bytes, tuple[str, _EventDecoder]] = SELECTORS,
+) -> list[SplitrixEvent]:
+    """Decode the Splitrix events of one msgpack-decoded `block` object."""
+    round_num = block.get("rnd", 0)
+    events = []
+    for path, logs in _app_calls(block.get("txns") or [], app_id):
+        for log_index, log in enumerate(logs):
+            if isinstance(log, str):
+                log = log.encode("utf-8", "surrogateescape")
+            known = selectors.get(log[:4])
+            if known is None:
+                continue
+            name, decode = known
+            try:
+                args = decode(log[4:])
+            except Exception:
+                logger.warning(f"Undecodable {name} log in round {round_num} at {path}")
+                continue
+            events.append(
+                SplitrixEvent(
+                    name=name, args=args, round=round_num, path=path, log_index=log_index
+                )
+            )
+    return events
+
+
+def _unpack_block(raw: bytes) -> Block:
+    # go-algorand encodes logs as msgpack strings that need not be valid UTF-8,
+    # surrogateescape keeps them round-trippable to bytes.
+    return typing.cast(
+        Block,
+        msgpack.unpackb(
+            raw, raw=False, strict_map_key=False, unicode_errors="surrogateescape"
+        )["block"],
+    )
+
+
+class BlockSource(typing.Protocol):
+    def last_round(self) -> int: ...
+
+    def wait_for_block_after(self, round_num: int) -> int: ...
+
+    def blocks(self, rounds: list[int]) -> list[Block]: ...
+
+
+class RawBlockSource(typing.Protocol):
+    def raw_block(self, round_num: int) -> bytes: ...
+
+
+class AlgodBlockSource:
+    """Pooled, retrying msgpack block reader fetching batches concurrently."""
+
+    def __init__(
+        self,
+        algod: AlgodClient,
+        *,
+        max_workers: int = 8,
+        retries: int = 5,
+        backoff: float = 0.2,
+        timeout: float = 60.0,
+    ) -> None:
+        headers = {"X-Algo-API-Token": algod.algod_token} if algod.algod_token else {}
+        headers.update(algod.headers or {})
+        self.max_workers = max_workers
+        self.retry = RetryPolicy(retries=retries, backoff=backoff)
+        self._http = httpx.Client(
+            base_url=f"{algod.algod_address.rstrip('/')}/v2",
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_workers, max_keepalive_connections=max_workers
+            ),
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        self._http.close()
+
+    def _get(self, path: str, params: dict[str, str] | None = None) -> httpx.Response:
+        response = self.retry.send(lambda: self._http.get(path, params=params), path)
+        response.raise_for_status()
+        return response
+
+    def last_round(self) -> int:
+        return typing.cast(int, self._get("/status").json()["last-round"])
+
+    def wait_for_block_after(self, round_num: int) -> int:
+        return typing.cast(
+            int, self._get(f"/status/wait-for-block-after/{round_num}").json()["last-round"]
+        )
+
+    def raw_block(self, round_num: int) -> bytes:
+        return self._get(f"/blocks/{round_num}", params={"format": "msgpack"}).content
+
+    def blocks(self, rounds: list[int]) -> list[Block]:
+        return [
+            _unpack_block(raw) for raw in self._executor.map(self.raw_block, rounds)
+        ]
+
+
+class RecordedBlockSource:
+    """Replays blocks saved by `record_blocks` (`<round>.msgp` files in `directory`)."""
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        self.directory = Path(directory)
+        self._rounds = sorted(int(path.stem) for path in self.directory.glob("*.msgp"))
+
+    def last_round(self) -> int:
+        return self._rounds[-1] if self._rounds else 0
+
+    def wait_for_block_after(self, round_num: int) -> int:
+        if round_num >= self.last_round():
+            raise EOFError(f"No recorded blocks after round {round_num}")
+        return self.last_round()
+
+    def blocks(self, rounds: list[int]) -> list[Block]:
+        return [
+            _unpack_block((self.directory / f"{round_num}.msgp").read_bytes())
+            for round_num in rounds
+        ]
+
+
+def record_blocks(
+    source: RawBlockSource, rounds: Iterable[int], directory: str | os.PathLike[str]
+) -> None:
+    """Save raw msgpack blocks for later replay through `RecordedBlockSource`."""
+    target = Path(directory)
+    target.mkdir(parents=True, exist_ok=True)
+    for round_num in rounds:
+        (target / f"{round_num}.msgp").write_bytes(source.raw_block(round_num))
+
+
+class Checkpoint:
+    """Last fully processed round, persisted atomically as JSON."""
+
+    def __init__(self, path: str | os.PathLike[str], app_id: int) -> None:
+        self.path = Path(path)
+        self.app_id = app_id
+
+    def load(self) -> int | None:
+        if not self.path.exists():
+            return None
+        data = json.loads(self.path.read_text())
+        if data.get("app_id") != self.app_id:
+            raise ValueError(
+                f"Checkpoint {self.path} belongs to app {data.get('app_id')}, not {self.app_id}"
+            )
+        return typing.cast(int, data["round"])
+
+    def save(self, round_num: int) -> None:
+        temporary = self.path.with_suffix(self.path.suffix + ".tmp")
+        temporary.write_text(json.dumps({"app_id": self.app_id, "round": round_num}))
+        os.replace(temporary, self.path)
+
+
+class EventIndexer:
+    """
+    Streams Splitrix events from `start_round` (or the checkpoint) onwards.
+
+    Each batch of up to `batch_size` rounds is handed to the handler in round
+    order, then checkpointed. Once caught up, the indexer waits for new blocks.
+    """
+
+    def __init__(
+        self,
+        source: BlockSource,
+        app_id: int,
+        checkpoint_path: str | os.PathLike[str],
+        *,
+        start_round: int = 1,
+        batch_size: int = 16,
+    ) -> None:
+        self.source = source
+        self.app_id = app_id
+        self.checkpoint = Checkpoint(checkpoint_path, app_id)
+        self.start_round = start_round
+        self.batch_size = batch_size
+
+    def next_round(self) -> int:
+        processed = self.checkpoint.load()
+        return processed + 1 if processed is not None else self.start_round
+
+    def batches(self, stop_round: int | None = None) -> Iterator[tuple[int, list[SplitrixEvent]]]:
+        """
+        Yield `(last round of batch, events)`; the checkpoint advances when the
+        consumer asks for the next batch, so a crash replays the unfinished one.
+        """
+        next_round = self.next_round()
+        last_round = self.source.last_round()
+        while stop_round is None or next_round <= stop_round:
+            if next_round > last_round:
+                last_round = self.source.wait_for_block_after(last_round)
+                if next_round > last_round:
+                    if stop_round is None:
+                        continue
+                    return
+            end = min(next_round + self.batch_size - 1, last_round)
+            if stop_round is not None:
+                end = min(end, stop_round)
+            rounds = list(range(next_round, end + 1))
+            events = [
+                event
+                for block in self.source.blocks(rounds)
+                for event in decode_block_events(block, self.app_id)
+            ]
+            yield end, events
+            self.checkpoint.save(end)
+            next_round = end + 1
+
+    def run(
+        self,
+        handler: Callable[[list[SplitrixEvent]], None],
+        stop_round: int | None = None,
+    ) -> None:
+        for last_round, events in self.batches(stop_round):
+            if events:
+                handler(events)
+            logger.debug(f"Indexed through round {last_round}, {len(events)} events")
@@ -0,0 +1,238 @@
+"""
+Streaming columnar export of Splitrix state.
+
+Groups and bills from the app's boxes, a snapshot or the SQLite store are
+flattened into four tables, mirroring the SQLite schema:
+
+    groups        group_id, admin, bill_counter, member_count
+    group_members group_id, position, address
+    bills         group_id, bill_id, payer, total_amount, memo, debtor_count
+    debtors       group_id, bill_id, position, debtor, amount, paid, outstanding
+
+Rows are buffered per table and flushed every `batch_size` rows, so memory
+stays bounded however large the app is. With pyarrow installed each table is a
+Parquet file (one row group per batch); otherwise every batch is a directory of
+`.npy` column files, `<table>/part-00000/<column>.npy`, loadable without pickle.
+"""
+
+import logging
+import os
+import typing
+from collections.abc import Buffer, Iterable, Iterator
+from pathlib import Path
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    Group,
+    SplitrixClient,
+)
+from smart_contracts.splitrix import box_loader
+from smart_contracts.splitrix.box_loader import BILLS_PREFIX
+from smart_contracts.splitrix.codec import decode_bill, decode_group
+from smart_contracts.splitrix.snapshot import Snapshot
+from smart_contracts.splitrix.sqlite_sink import SQLiteSink
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pq = None
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger(__name__)
+
+Entry = tuple[int, Group] | tuple[BillKey, Bill]
+
+# Column name and NumPy dtype per table; "U" columns are sized per batch.
+TABLES: dict[str, dict[str, str]] = {
+    "groups": {
+        "group_id": "uint64",
+        "admin": "U",
+        "bill_counter": "uint64",
+        "member_count": "uint16",
+    },
+    "group_members": {"group_id": "uint64", "position": "uint16", "address": "U"},
+    "bills": {
+        "group_id": "uint64",
+        "bill_id": "uint64",
+        "payer": "U",
+        "total_amount": "uint64",
+        "memo": "U",
+        "debtor_count": "uint16",
+    },
+    "debtors": {
+        "group_id": "uint64",
+        "bill_id": "uint64",
+        "position": "uint16",
+        "debtor": "U",
+        "amount": "uint64",
+        "paid": "uint64",
+        "outstanding": "uint64",
+    },
+}
+
+
+def entries_from_boxes(boxes: Iterable[tuple[bytes, Buffer]]) -> Iterator[Entry]:
+    """Decode raw `(box name, value)` pairs from the box loader or a snapshot."""
+    for name, value in boxes:
+        if name.startswith(BILLS_PREFIX):
+            yield box_loader.bill_key_from_box_name(name), decode_bill(value)
+        else:
+            yield box_loader.group_id_from_box_name(name), decode_group(value)
+
+
+def entries_from_sqlite(sink: SQLiteSink) -> Iterator[Entry]:
+    yield from sink.iter_groups()
+    yield from sink.iter_bills()
+
+
+def _rows(entries: Iterable[Entry]) -> Iterator[tuple[str, tuple[typing.Any, ...]]]:
+    for key, value in entries:
+        if isinstance(value, Group):
+            group_id = typing.cast(int, key)
+            yield "groups", (group_id, value.admin, value.bill_counter, len(value.members))
+            for position, member in enumerate(value.members):
+                yield "group_members", (group_id, position, member)
+        else:
+            bill_key = typing.cast(BillKey, key)
+            yield "bills", (
+                bill_key.group_id,
+                bill_key.bill_id,
+                value.payer,
+                value.total_amount,
+                value.memo,
+                len(value.debtors),
+            )
+            for position, (debtor, amount, paid) in enumerate(value.debtors):
+                yield "debtors", (
+                    bill_key.group_id,
+                    bill_key.bill_id,
+                    position,
+                    debtor,
+                    amount,
+                    paid,
+                    amount - paid,  # type: ignore[operator]
+                )
+
+
+def iter_batches(
+    entries: Iterable[Entry], batch_size: int = 65_536
+) -> Iterator[tuple[str, dict[str, list[typing.Any]]]]:
+    """Yield `(table, {column: values})` batches of at most `batch_size` rows."""
+    buffers: dict[str, list[tuple[typing.Any, ...]]] = {table: [] for table in TABLES}
+    for table, row in _rows(entries):
+        rows = buffers[table]
+        rows.append(row)
+        if len(rows) >= batch_size:
+            yield table, dict(zip(TABLES[table], map(list, zip(*rows)), strict=True))
+            rows.clear()
+    for table, rows in buffers.items():
+        if rows:
+            yield table, dict(zip(TABLES[table], map(list, zip(*rows)), strict=True))
+
+
+class _ParquetOutput:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._writers: dict[str, typing.Any] = {}
+
+    def write(self, table: str, columns: dict[str, list[typing.Any]]) -> None:
+        batch = pa.table(
+            {
+                name: pa.array(values, type=pa.string() if dtype == "U" else getattr(pa, dtype)())
+                for (name, values), dtype in zip(
+                    columns.items(), TABLES[table].values(), strict=True
+                )
+            }
+        )
+        writer = self._writers.get(table)
+        if writer is None:
+            writer = self._writers[table] = pq.ParquetWriter(
+                self.directory / f"{table}.parquet", batch.schema
+            )
+        writer.write_table(batch)
+
+    def close(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+
+
+class _NpyOutput:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._parts: dict[str, int] = {}
+
+    def write(self, table: str, columns: dict[str, list[typing.Any]]) -> None:
+        part = self._parts.get(table, 0)
+        self._parts[table] = part + 1
+        target = self.directory / table / f"part-{part:05d}"
+        target.mkdir(parents=True, exist_ok=True)
+        for (name, values), dtype in zip(columns.items(), TABLES[table].values(), strict=True):
+            # Fixed-width unicode keeps string columns loadable with allow_pickle=False.
+            array = np.array(values, dtype=None if dtype == "U" else dtype)
+            np.save(target / f"{name}.npy", array)
+
+    def close(self) -> None:
+        pass
+
+
+def export(
+    entries: Iterable[Entry],
+    directory: str | os.PathLike[str],
+    *,
+    format: typing.Literal["auto", "parquet", "npy"] = "auto",
+    batch_size: int = 65_536,
+) -> dict[str, int]:
+    """Export `entries` into `directory`, returning the number of rows per table."""
+    if format == "auto":
+        format = "parquet" if pq is not None else "npy"
+    if format == "parquet" and pq is None:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+    if format == "npy" and np is None:
+        raise ImportError("Export needs pyarrow or NumPy: pip install pyarrow")
+    target = Path(directory)
+    target.mkdir(parents=True, exist_ok=True)
+    output = _ParquetOutput(target) if format == "parquet" else _NpyOutput(target)
+    counts = dict.fromkeys(TABLES, 0)
+    try:
+        for table, columns in iter_batches(entries, batch_size):
+            output.write(table, columns)
+            counts[table] += len(next(iter(columns.values())))
+    finally:
+        output.close()
+    logger.info(f"Exported {counts} to {target} as {format}")
+    return counts
+
+
+def export_app(
+    client: SplitrixClient,
+    directory: str | os.PathLike[str],
+    *,
+    max_workers: int = 16,
+    **options: typing.Any,
+) -> dict[str, int]:
+    """Stream every box of the app straight into columnar files."""
+    return export(
+        entries_from_boxes(box_loader.iter_box_values(client, max_workers=max_workers)),
+        directory,
+        **options,
+    )
+
+
+def export_snapshot(
+    path: str | os.PathLike[str], directory: str | os.PathLike[str], **options: typing.Any
+) -> dict[str, int]:
+    with Snapshot(path) as snapshot:
+        return export(entries_from_boxes(snapshot.items()), directory, **options)
+
+
+def export_sqlite(
+    path: str | os.PathLike[str], directory: str | os.PathLike[str], **options: typing.Any
+) -> dict[str, int]:
+    with SQLiteSink(path) as sink:
+        return export(entries_from_sqlite(sink), directory, **options)
@@ -0,0 +1,196 @@
+"""
+In-memory Splitrix state mirror kept current from ARC-28 events.
+
+`SplitrixMirror` bootstraps from a bulk box load into a `CompactState`, then
+applies `GroupCreated`/`BillChanged` events by re-reading just the named boxes.
+Splitrix events carry keys, not deltas, so every event costs one batched read
+of the affected boxes. Net balances per member are maintained incrementally,
+so groups, bills and balances are all O(1) dictionary lookups.
+"""
+
+import logging
+import threading
+import typing
+from collections import defaultdict
+from collections.abc import Buffer, Iterable
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    Group,
+    SplitrixClient,
+)
+from smart_contracts.splitrix import box_loader, bulk_reads
+from smart_contracts.splitrix.box_loader import BILLS_PREFIX
+from smart_contracts.splitrix.compact import CompactState
+from smart_contracts.splitrix.event_indexer import SplitrixEvent
+
+logger = logging.getLogger(__name__)
+
+_K = typing.TypeVar("_K")
+_V = typing.TypeVar("_V")
+
+
+class _MirrorMapState(typing.Generic[_K, _V]):
+    """Memory-backed stand-in for the generated client's `_MapState`."""
+
+    def __init__(
+        self,
+        get_value: typing.Callable[[_K], _V | None],
+        get_map: typing.Callable[[], dict[_K, _V]],
+    ) -> None:
+        self.get_value = get_value
+        self.get_map = get_map
+
+
+class _MirrorBoxState:
+    def __init__(self, mirror: "SplitrixMirror") -> None:
+        self.groups: _MirrorMapState[int, Group] = _MirrorMapState(
+            mirror.group, lambda: mirror.to_maps()[0]
+        )
+        self.bills: _MirrorMapState[BillKey, Bill] = _MirrorMapState(
+            mirror.bill, lambda: mirror.to_maps()[1]
+        )
+
+
+class _MirrorState:
+    def __init__(self, mirror: "SplitrixMirror") -> None:
+        self.box = _MirrorBoxState(mirror)
+
+
+class SplitrixMirror:
+    """
+    Local copy of the `groups`/`bills` maps with O(1) lookups and balances.
+
+    `round` is the newest round the mirror is known to reflect: the chain round
+    read before bootstrapping, then the round of each applied event batch. Feed
+    it with `EventIndexer(...).run(mirror.apply_events)` starting at `round + 1`.
+    """
+
+    def __init__(self, client: SplitrixClient) -> None:
+        self.client = client
+        self.compact = CompactState()
+        self.round = 0
+        self.state = _MirrorState(self)
+        # Net amount owed to each address id, overall and per group.
+        self._balances: defaultdict[int, int] = defaultdict(int)
+        self._group_balances: defaultdict[tuple[int, int], int] = defaultdict(int)
+        self._lock = threading.RLock()
+
+    # ---- bootstrap and updates ----
+
+    def bootstrap(self, *, max_workers: int = 16) -> None:
+        """Load every box, recording the round observed before the load started."""
+        round_num = self.client.algorand.client.algod.status()["last-round"]
+        self.load_boxes(
+            box_loader.iter_box_values(self.client, max_workers=max_workers), round_num
+        )
+
+    def load_boxes(self, boxes: Iterable[tuple[bytes, Buffer]], round_num: int) -> None:
+        """Load raw `(box name, value)` pairs, e.g. from a snapshot, as of `round_num`."""
+        with self._lock:
+            for name, value in boxes:
+                if name.startswith(BILLS_PREFIX):
+                    key = box_loader.bill_key_from_box_name(name)
+                    self._account_bill(key, -1)
+                    self.compact.set_bill_bytes(key, value)
+                    self._account_bill(key, 1)
+                else:
+                    self.compact.set_group_bytes(box_loader.group_id_from_box_name(name), value)
+            self.round = round_num
+        logger.info(
+            f"Mirror loaded at round {round_num}: "
+            f"{len(self.compact.groups)} groups, {len(self.compact.bills)} bills"
+        )
+
+    def _account_bill(self, key: BillKey, sign: int) -> None:
+        """Add (`sign=1`) or remove (`sign=-1`) a bill's outstanding debts from the balances."""
+        bill = self.compact.bills.get((key.group_id, key.bill_id))
+        if bill is None:
+            return
+        compact = self.compact
+        payer = bill.payer
+        for row in range(bill.start, bill.start + bill.count):
+            debtor = compact.debtors[row]
+            outstanding = compact.amounts[row] - compact.paid[row]
+            if debtor == payer or not outstanding:
+                continue
+            delta = sign * outstanding
+            self._balances[payer] += delta
+            self._balances[debtor] -= delta
+            self._group_balances[(key.group_id, payer)] += delta
+            self._group_balances[(key.group_id, debtor)] -= delta
+
+    def set_group(self, group_id: int, group: Group) -> None:
+        with self._lock:
+            self.compact.set_group(group_id, group)
+
+    def set_bill(self, key: BillKey, bill: Bill) -> None:
+        with self._lock:
+            self._account_bill(key, -1)
+            self.compact.set_bill(key, bill)
+            self._account_bill(key, 1)
+
+    def refresh(self, group_ids: Iterable[int] = (), bill_keys: Iterable[BillKey] = ()) -> None:
+        """Re-read the given keys from chain with batched simulate calls."""
+        ordered_ids = sorted(set(group_ids))
+        ordered_keys = sorted(set(bill_keys), key=lambda k: (k.group_id, k.bill_id))
+        groups = bulk_reads.get_groups(self.client, ordered_ids) if ordered_ids else []
+        bills = bulk_reads.get_bills(self.client, ordered_keys) if ordered_keys else []
+        with self._lock:
+            for group_id, group in zip(ordered_ids, groups, strict=True):
+                if group is not None:
+                    self.compact.set_group(group_id, group)
+            for key, bill in zip(ordered_keys, bills, strict=True):
+                if bill is not None:
+                    self._account_bill(key, -1)
+                    self.compact.set_bill(key, bill)
+                    self._account_bill(key, 1)
+
+    def apply_events(self, events: Iterable[SplitrixEvent]) -> None:
+        """Event indexer handler: refresh every key named by `events` in one batch."""
+        group_ids: set[int] = set()
+        bill_keys: set[BillKey] = set()
+        newest = self.round
+        for event in events:
+            newest = max(newest, event.round)
+            if event.name == "GroupCreated":
+                group_ids.add(event.args[0])
+            elif event.name == "BillChanged":
+                bill_keys.add(event.args[0])
+                # create_bill also bumps the group's bill_counter.
+                group_ids.add(event.args[0].group_id)
+        self.refresh(group_ids, bill_keys)
+        with self._lock:
+            self.round = newest
+
+    # ---- lookups ----
+
+    def group(self, group_id: int) -> Group | None:
+        with self._lock:
+            return self.compact.group(group_id)
+
+    def bill(self, key: BillKey) -> Bill | None:
+        with self._lock:
+            return self.compact.bill(key)
+
+    def bill_counter(self, group_id: int) -> int | None:
+        group = self.compact.groups.get(group_id)
+        return group.bill_counter if group is not None else None
+
+    def outstanding(self, key: BillKey, index: int) -> int:
+        with self._lock:
+            return self.compact.outstanding(key, index)
+
+    def balance(self, address: str, group_id: int | None = None) -> int:
+        """What others owe `address` minus what `address` owes, optionally in one group."""
+        address_id = self.compact.addresses.find(address)
+        if address_id is None:
+            return 0
+        if group_id is None:
+            return self._balances.get(address_id, 0)
+        return self._group_balances.get((group_id, address_id), 0)
+
+    def to_maps(self) -> tuple[dict[int, Group], dict[BillKey, Bill]]:
+        with self._lock:
+            return self.compact.to_maps()
@@ -0,0 +1,171 @@
+"""
+Pure-Python model of the Splitrix contract, for differential checks.
+
+`ReferenceSplitrix` applies `create_group`, `create_bill` and `settle_bill`
+the way `contract.py` does, step for step: the same checks in the same order
+with the same messages, the same de-duplication, and the same box reads and
+writes during netting (every `payers_debt` entry re-reads the stored old bill,
+and the new bill is stored before netting and again after it). A call the
+contract would reject raises `ContractRejected` and leaves the model
+untouched, like a rejected transaction. `boxes()` encodes the state with
+`codec`, so it can be compared byte for byte with a deployed or emulated app.
+
+Amounts are plain ints; callers keep them well inside uint64, where the AVM
+would otherwise panic on overflow.
+"""
+
+import dataclasses
+
+from algosdk.constants import ZERO_ADDRESS
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    CreateBillArgs,
+    CreateGroupArgs,
+    Group,
+)
+from smart_contracts.splitrix.box_loader import BILLS_PREFIX, GROUPS_PREFIX
+from smart_contracts.splitrix.codec import (
+    encode_bill,
+    encode_bill_key,
+    encode_group,
+    encode_uint64,
+)
+from smart_contracts.splitrix.debt_graph import contract_debtors
+
+
+class ContractRejected(Exception):
+    """A call the contract rejects; the message is that of the failing assert."""
+
+
+def _check(condition: bool, message: str) -> None:
+    if not condition:
+        raise ContractRejected(message)
+
+
+class ReferenceSplitrix:
+    """In-memory Splitrix app state, updated with the contract's rules."""
+
+    def __init__(self) -> None:
+        self.group_counter = 0
+        self.groups: dict[int, Group] = {}
+        self.bills: dict[BillKey, Bill] = {}
+
+    # ---- ABI methods ----
+
+    def create_group(self, args: CreateGroupArgs) -> int:
+        members = [args.admin]
+        for member in args.members:
+            if member != ZERO_ADDRESS and member not in members:
+                members.append(member)
+        _check(len(members) > 1, "At least two members must be provided")
+        _check(args.admin != ZERO_ADDRESS, "Admin must be provided")
+        group_id = self.group_counter
+        self.group_counter += 1
+        self.groups[group_id] = Group(admin=args.admin, bill_counter=0, members=members)
+        return group_id
+
+    def create_bill(self, args: CreateBillArgs) -> int:
+        group = self.groups.get(args.group_id)
+        if group is None:
+            raise ContractRejected("Group does not exist")
+        _check(args.payer != ZERO_ADDRESS, "Payer must be provided")
+        _check(args.total_amount > 0, "Total amount must be greater than 0")
+        _check(len(args.debtors) > 0, "At least one debtor must be provided")
+        # "Memo must be provided" never fires: `memo.bytes` includes the ARC-4
+        # length prefix, so the contract accepts an empty memo.
+        members = set(group.members)
+        _check(args.payer in members, "Payer is not a member of the group")
+        for debtor, _ in args.debtors:
+            _check(debtor in members, "Debtor is not a member of the group")
+
+        # The payer's own share is stored as paid.
+        rows = [
+            [debtor, amount, amount if debtor == args.payer else 0]
+            for debtor, amount in contract_debtors(args.debtors)
+        ]
+        _check(len(rows) > 0, "At least one valid debtor must be provided")
+        _check(
+            sum(amount for _, amount, _ in rows) == args.total_amount,
+            "Total amount does not match the sum of the debtors' amounts",
+        )
+
+        # Writes are staged and only applied once every check has passed.
+        bill_id = group.bill_counter
+        key = BillKey(group_id=args.group_id, bill_id=bill_id)
+        written = {key: self._bill(args.payer, args.total_amount, rows, args.memo)}
+        for old_bill_id, bill_payer, payer_index, cutoff, debtor_index in args.payers_debt:
+            old_key = BillKey(group_id=args.group_id, bill_id=old_bill_id)
+            old_bill = written.get(old_key) or self.bills.get(old_key)
+            if old_bill is None:
+                raise ContractRejected("Referenced bill does not exist")
+            _check(old_bill.payer == bill_payer, "Bill payer mismatch")
+            _check(payer_index < len(old_bill.debtors), "Invalid debtor index")
+            debtor, amount, paid = old_bill.debtors[payer_index]
+            _check(cutoff <= amount - paid, "Cutoff exceeds pending debt")
+            old_rows = [list(row) for row in old_bill.debtors]
+            old_rows[payer_index] = [debtor, amount, paid + cutoff]
+            written[old_key] = dataclasses.replace(old_bill, debtors=old_rows)
+
+            _check(debtor_index < len(rows), "Invalid debtor index")
+            row = rows[debtor_index]
+            _check(row[0] == bill_payer, "New bill does not contain the payer from netting")
+            _check(row[2] + cutoff <= row[1], "Cutoff exceeds new bill obligation")
+            row[2] += cutoff
+        written[key] = self._bill(args.payer, args.total_amount, rows, args.memo)
+
+        self.bills.update(written)
+        self.groups[args.group_id] = dataclasses.replace(group, bill_counter=bill_id + 1)
+        return bill_id
+
+    def settle_bill(
+        self,
+        group_id: int,
+        bill_id: int,
+        sender_index: int,
+        *,
+        sender: str,
+        receiver: str,
+        amount: int,
+    ) -> None:
+        """`settle_bill` with a payment of `amount` from `sender` to `receiver` in front of it."""
+        key = BillKey(group_id=group_id, bill_id=bill_id)
+        bill = self.bills.get(key)
+        if bill is None:
+            raise ContractRejected("Bill does not exist")
+        _check(receiver == bill.payer, "Payment must be sent to the payer")
+        _check(sender_index < len(bill.debtors), "Sender index is out of bounds")
+        debtor, owed, paid = bill.debtors[sender_index]
+        _check(debtor == sender, "Sender is not a debtor for this bill")
+        _check(owed - paid > 0, "Debt already paid")
+        rows = [list(row) for row in bill.debtors]
+        rows[sender_index] = [debtor, owed, paid + min(amount, owed - paid)]
+        self.bills[key] = dataclasses.replace(bill, debtors=rows)
+
+    # ---- state ----
+
+    @staticmethod
+    def _bill(payer: str, total_amount: int, rows: list[list], memo: str) -> Bill:
+        return Bill(
+            payer=payer,
+            total_amount=total_amount,
+            debtors=[list(row) for row in rows],  # type: ignore[misc]
+            memo=memo,
+        )
+
+    def get_group(self, group_id: int) -> Group | None:
+        return self.groups.get(group_id)
+
+    def get_bill(self, key: BillKey) -> Bill | None:
+        return self.bills.get(key)
+
+    def boxes(self) -> dict[bytes, bytes]:
+        """Box name -> value, encoded exactly as the app stores them."""
+        boxes = {
+            GROUPS_PREFIX + encode_uint64(group_id): encode_group(group)
+            for group_id, group in self.groups.items()
+        }
+        for key, bill in self.bills.items():
+            boxes[BILLS_PREFIX + encode_bill_key(key)] = encode_bill(bill)
+        return boxes
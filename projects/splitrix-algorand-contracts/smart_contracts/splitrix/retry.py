@@ -0,0 +1,71 @@
+"""
+Retry policy shared by the pooled algod HTTP readers.
+
+Transport errors and the statuses in `RETRY_STATUS_CODES` are retried with
+exponential backoff; the last response is returned as is, so callers keep
+their own handling of 404s and other errors. Requests that are not safe to
+repeat use a policy whose `status_codes` only holds statuses algod returns
+before acting on a request (429).
+"""
+
+import asyncio
+import dataclasses
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Statuses that mean the request was turned away without being processed.
+NOT_PROCESSED_STATUS_CODES = frozenset({429})
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class RetryPolicy:
+    retries: int = 5
+    backoff: float = 0.2
+    status_codes: frozenset[int] = RETRY_STATUS_CODES
+
+    def _should_retry(self, attempt: int, response: httpx.Response | None) -> bool:
+        """Whether to retry after `attempt`; `response` is None after a transport error."""
+        if attempt >= self.retries:
+            return False
+        return response is None or response.status_code in self.status_codes
+
+    def _delay(self, attempt: int, description: str) -> float:
+        delay = self.backoff * 2**attempt
+        logger.debug(f"Retrying {description} in {delay:.2f}s (attempt {attempt + 1})")
+        return delay
+
+    def send(self, request: Callable[[], httpx.Response], description: str) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = request()
+            except httpx.TransportError:
+                if not self._should_retry(attempt, None):
+                    raise
+            else:
+                if not self._should_retry(attempt, response):
+                    return response
+            time.sleep(self._delay(attempt, description))
+            attempt += 1
+
+    async def send_async(
+        self, request: Callable[[], Awaitable[httpx.Response]], description: str
+    ) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = await request()
+            except httpx.TransportError:
+                if not self._should_retry(attempt, None):
+                    raise
+            else:
+                if not self._should_retry(attempt, response):
+                    return response
+            await asyncio.sleep(self._delay(attempt, description))
+            attempt += 1
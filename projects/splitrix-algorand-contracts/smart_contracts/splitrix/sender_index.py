@@ -0,0 +1,172 @@
+"""
+Client-side `(bill, address) -> sender_index` lookups for `settle_bill`.
+
+`settle_bill` needs the caller's position in `Bill.debtors`, which otherwise
+costs a box read before every settlement. A bill's payer and debtor list are
+fixed by `create_bill` and never change afterwards, so the positions can be
+recorded once, from a box load, a mirror, the submitted `create_bill`
+arguments or `BillChanged` events, and reused for the life of the bill.
+`SenderIndex.settle` then builds the call from memory alone.
+"""
+
+import threading
+from collections.abc import Buffer, Iterable, Mapping, Sequence
+
+from algosdk.atomic_transaction_composer import TransactionSigner
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    CreateBillArgs,
+    SplitrixClient,
+    SplitrixComposer,
+)
+from smart_contracts.splitrix import box_loader, bulk_reads
+from smart_contracts.splitrix.box_loader import BILLS_PREFIX
+from smart_contracts.splitrix.codec import DEBTOR_SIZE, bill_size, decode_bill
+from smart_contracts.splitrix.debt_graph import contract_debtors
+from smart_contracts.splitrix.event_indexer import SplitrixEvent
+from smart_contracts.splitrix.mirror import SplitrixMirror
+from smart_contracts.splitrix.settlement import PayoffPlan, Settlement
+
+
+class SenderIndex:
+    """
+    Debtor positions and payers of known bills, enough to build `settle_bill`
+    without reading the bill. `sender` is the default address for `settle`.
+    """
+
+    def __init__(self, client: SplitrixClient, *, sender: str | None = None) -> None:
+        self.client = client
+        self.sender = sender
+        self._positions: dict[tuple[int, int, str], int] = {}
+        # (group_id, bill_id) -> (payer, encoded box size)
+        self._bills: dict[tuple[int, int], tuple[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bills)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, BillKey) and (key.group_id, key.bill_id) in self._bills
+
+    # ---- filling ----
+
+    def _record(
+        self, key: tuple[int, int], payer: str, debtors: Iterable[str], box_size: int
+    ) -> None:
+        group_id, bill_id = key
+        with self._lock:
+            self._bills[key] = (payer, box_size)
+            for index, debtor in enumerate(debtors):
+                # Debtors are unique per bill, so setdefault only guards odd input.
+                self._positions.setdefault((group_id, bill_id, debtor), index)
+
+    def add_bill(self, key: BillKey, bill: Bill) -> None:
+        self._record(
+            (key.group_id, key.bill_id),
+            bill.payer,
+            [debtor for debtor, _, _ in bill.debtors],  # type: ignore[misc]
+            bill_size(len(bill.debtors), bill.memo),
+        )
+
+    def add_bills(self, bills: Mapping[BillKey, Bill]) -> None:
+        """Record bills from e.g. `box_loader.load_bills`."""
+        for key, bill in bills.items():
+            self.add_bill(key, bill)
+
+    def load_boxes(self, boxes: Iterable[tuple[bytes, Buffer]]) -> None:
+        """Record raw `(box name, value)` pairs from the box loader or a snapshot."""
+        for name, value in boxes:
+            if name.startswith(BILLS_PREFIX):
+                self.add_bill(box_loader.bill_key_from_box_name(name), decode_bill(value))
+
+    def load(self, group_id: int | None = None, *, max_workers: int = 16) -> None:
+        """Box-load the app's bills, optionally those of one group."""
+        self.load_boxes(
+            box_loader.iter_box_values(self.client, "bills", group_id, max_workers=max_workers)
+        )
+
+    def add_mirror(self, mirror: SplitrixMirror) -> None:
+        """Record every bill in a mirror straight from its columns."""
+        compact = mirror.compact
+        address = compact.addresses.address
+        for key, bill in list(compact.bills.items()):
+            rows = range(bill.start, bill.start + bill.count)
+            self._record(
+                key,
+                address(bill.payer),
+                [address(compact.debtors[row]) for row in rows],
+                bill_size(0, bill.memo) + bill.count * DEBTOR_SIZE,
+            )
+
+    def apply_create_bill(self, bill_id: int, args: CreateBillArgs) -> None:
+        """Record a confirmed `create_bill` with the id it returned, reading nothing."""
+        debtors = [debtor for debtor, _ in contract_debtors(args.debtors)]
+        self._record(
+            (args.group_id, bill_id), args.payer, debtors, bill_size(len(debtors), args.memo)
+        )
+
+    def apply_events(self, events: Sequence[SplitrixEvent]) -> None:
+        """
+        Event indexer handler. Known bills are skipped, since their debtor lists
+        cannot change; only bills seen for the first time are read.
+        """
+        unseen = {
+            event.args[0]
+            for event in events
+            if event.name == "BillChanged" and event.args[0] not in self
+        }
+        ordered_keys = sorted(unseen, key=lambda k: (k.group_id, k.bill_id))
+        bills = bulk_reads.get_bills(self.client, ordered_keys) if ordered_keys else []
+        for key, bill in zip(ordered_keys, bills, strict=True):
+            if bill is not None:
+                self.add_bill(key, bill)
+
+    # ---- lookups ----
+
+    def sender_index(self, bill_key: BillKey, address: str) -> int | None:
+        return self._positions.get((bill_key.group_id, bill_key.bill_id, address))
+
+    def payer(self, bill_key: BillKey) -> str | None:
+        entry = self._bills.get((bill_key.group_id, bill_key.bill_id))
+        return entry[0] if entry is not None else None
+
+    def settlement(self, bill_key: BillKey, amount: int, sender: str) -> Settlement:
+        """The `Settlement` paying `amount` of `sender`'s share of a known bill."""
+        entry = self._bills.get((bill_key.group_id, bill_key.bill_id))
+        index = self.sender_index(bill_key, sender)
+        if entry is None:
+            raise KeyError(f"Bill {bill_key} is not in the sender index")
+        if index is None:
+            raise KeyError(f"{sender} is not a debtor of bill {bill_key}")
+        payer, box_size = entry
+        return Settlement(
+            bill_key=bill_key,
+            payer=payer,
+            sender_index=index,
+            amount=amount,
+            box_size=box_size,
+        )
+
+    def settle(
+        self,
+        bill_key: BillKey,
+        amount: int,
+        *,
+        sender: str | None = None,
+        signer: TransactionSigner | None = None,
+    ) -> SplitrixComposer:
+        """
+        A composer with the payment and `settle_bill` call for `amount`, built
+        without touching algod beyond the suggested params. Send it as usual.
+        """
+        sender = sender or self.sender
+        if sender is None:
+            raise ValueError("No sender given and no default sender set")
+        plan = PayoffPlan(
+            member=sender,
+            group_id=bill_key.group_id,
+            groups=[[self.settlement(bill_key, amount, sender)]],
+        )
+        return plan.composers(self.client, signer=signer)[0]
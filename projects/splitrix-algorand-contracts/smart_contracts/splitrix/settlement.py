@@ -0,0 +1,255 @@
+"""
+Payoff planning: everything a member owes in a group, as ready-to-send composers.
+
+`settle_bill` takes exactly one payment per call, so clearing `n` open bills
+always costs `n` payments and `n` app calls. The planner keeps it at that
+minimum: it pays each bill's exact outstanding amount (the contract caps
+overpayments but still transfers them), never settles the member's own share,
+and packs settlements into as few atomic groups as the 16 transaction cap, the
+8 references per app call and the 1KB of box I/O per reference allow. `gas()`
+calls are only added when a group's bills need more box references than its
+settle calls can carry.
+"""
+
+import dataclasses
+import math
+from collections.abc import Mapping
+
+from algokit_utils import AlgoAmount, BoxReference, CommonAppCallParams, PaymentParams
+from algosdk.atomic_transaction_composer import TransactionSigner, TransactionWithSigner
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    SettleBillArgs,
+    SplitrixClient,
+    SplitrixComposer,
+)
+from smart_contracts.splitrix import box_loader
+from smart_contracts.splitrix.bulk_submit import (
+    APP_CALL_OPCODE_BUDGET,
+    BOX_IO_BYTES_PER_REF,
+    MAX_GROUP_SIZE,
+    MAX_REFS_PER_APP_CALL,
+)
+from smart_contracts.splitrix.codec import BILL_KEY_LAYOUT, DEBTOR_SIZE, bill_size
+from smart_contracts.splitrix.mirror import SplitrixMirror
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class Settlement:
+    """One open debt: pay `amount` to `payer` via `settle_bill` at `sender_index`."""
+
+    bill_key: BillKey
+    payer: str
+    sender_index: int
+    amount: int
+    box_size: int
+
+    @property
+    def box_name(self) -> bytes:
+        return box_loader.BILLS_PREFIX + BILL_KEY_LAYOUT.pack(
+            self.bill_key.group_id, self.bill_key.bill_id
+        )
+
+    @property
+    def box_refs(self) -> int:
+        return max(1, math.ceil(self.box_size / BOX_IO_BYTES_PER_REF))
+
+
+def _app_calls_needed(settlements: list[Settlement], opcode_cost: int) -> int:
+    """App calls an atomic group of settlements needs, including padding `gas()` calls."""
+    box_refs = sum(settlement.box_refs for settlement in settlements)
+    return max(
+        len(settlements),
+        math.ceil(box_refs / MAX_REFS_PER_APP_CALL),
+        math.ceil(len(settlements) * opcode_cost / APP_CALL_OPCODE_BUDGET),
+    )
+
+
+@dataclasses.dataclass(kw_only=True)
+class PayoffPlan:
+    """Settlements packed into atomic groups, each group sorted by payer."""
+
+    member: str
+    group_id: int
+    groups: list[list[Settlement]]
+    opcode_cost: int = APP_CALL_OPCODE_BUDGET
+
+    @property
+    def settlements(self) -> list[Settlement]:
+        return [settlement for group in self.groups for settlement in group]
+
+    @property
+    def total(self) -> int:
+        return sum(settlement.amount for settlement in self.settlements)
+
+    @property
+    def by_payer(self) -> dict[str, int]:
+        """Total paid to each payer."""
+        totals: dict[str, int] = {}
+        for settlement in self.settlements:
+            totals[settlement.payer] = totals.get(settlement.payer, 0) + settlement.amount
+        return totals
+
+    def transaction_count(self) -> int:
+        return sum(
+            len(group) + _app_calls_needed(group, self.opcode_cost) for group in self.groups
+        )
+
+    def composers(
+        self, client: SplitrixClient, *, signer: TransactionSigner | None = None
+    ) -> list[SplitrixComposer]:
+        """One composer per atomic group, with payments and box references filled in."""
+        signer = signer or client.algorand.account.get_signer(self.member)
+        composers = []
+        for group in self.groups:
+            app_calls = _app_calls_needed(group, self.opcode_cost)
+            box_names = [settlement.box_name for settlement in group]
+            # Empty references only add I/O budget.
+            box_names += [b""] * (sum(s.box_refs for s in group) - len(box_names))
+            references = [BoxReference(app_id=0, name=name) for name in box_names]
+            ref_slots = [
+                references[i : i + MAX_REFS_PER_APP_CALL]
+                for i in range(0, len(references), MAX_REFS_PER_APP_CALL)
+            ]
+            ref_slots += [[]] * (app_calls - len(ref_slots))
+            composer = client.new_group()
+            for call_index, settlement in enumerate(group):
+                key = settlement.bill_key
+                payment = client.algorand.create_transaction.payment(
+                    PaymentParams(
+                        sender=self.member,
+                        receiver=settlement.payer,
+                        amount=AlgoAmount.from_micro_algo(settlement.amount),
+                        # Equal payments to one payer would otherwise share a transaction id.
+                        note=f"settle {key.group_id}/{key.bill_id}".encode(),
+                    )
+                )
+                composer.settle_bill(
+                    SettleBillArgs(
+                        group_id=key.group_id,
+                        bill_id=key.bill_id,
+                        sender_index=settlement.sender_index,
+                        payment=TransactionWithSigner(payment, signer),
+                    ),
+                    CommonAppCallParams(
+                        sender=self.member,
+                        signer=signer,
+                        box_references=ref_slots[call_index],
+                    ),
+                )
+            for call_index in range(len(group), app_calls):
+                composer.gas(
+                    CommonAppCallParams(
+                        sender=self.member,
+                        signer=signer,
+                        box_references=ref_slots[call_index],
+                        # Identical gas() calls would share a transaction id.
+                        note=f"payoff gas {call_index}".encode(),
+                    )
+                )
+            composers.append(composer)
+        return composers
+
+
+def open_debts(
+    member: str, group_id: int, bills: Mapping[BillKey, Bill]
+) -> list[Settlement]:
+    """Every bill of `group_id` on which `member` still owes something to someone else."""
+    settlements = []
+    for key, bill in bills.items():
+        if key.group_id != group_id or bill.payer == member:
+            continue
+        for index, (debtor, amount, paid) in enumerate(bill.debtors):
+            if debtor == member and amount > paid:  # type: ignore[operator]
+                settlements.append(
+                    Settlement(
+                        bill_key=key,
+                        payer=bill.payer,
+                        sender_index=index,
+                        amount=amount - paid,  # type: ignore[operator]
+                        box_size=bill_size(len(bill.debtors), bill.memo),
+                    )
+                )
+                break
+    return settlements
+
+
+def open_debts_from_mirror(
+    mirror: SplitrixMirror, member: str, group_id: int
+) -> list[Settlement]:
+    """`open_debts` straight from a mirror's columns, expanding no bills."""
+    compact = mirror.compact
+    member_id = compact.addresses.find(member)
+    if member_id is None:
+        return []
+    settlements = []
+    for (bill_group_id, bill_id), bill in list(compact.bills.items()):
+        if bill_group_id != group_id or bill.payer == member_id:
+            continue
+        for row in range(bill.start, bill.start + bill.count):
+            if compact.debtors[row] == member_id:
+                outstanding = compact.amounts[row] - compact.paid[row]
+                if outstanding > 0:
+                    settlements.append(
+                        Settlement(
+                            bill_key=BillKey(group_id=group_id, bill_id=bill_id),
+                            payer=compact.addresses.address(bill.payer),
+                            sender_index=row - bill.start,
+                            amount=outstanding,
+                            box_size=bill_size(0, bill.memo) + bill.count * DEBTOR_SIZE,
+                        )
+                    )
+                break
+    return settlements
+
+
+def plan_payoff(
+    member: str,
+    group_id: int,
+    settlements: list[Settlement],
+    *,
+    opcode_cost: int = APP_CALL_OPCODE_BUDGET,
+) -> PayoffPlan:
+    """
+    Pack settlements into the fewest atomic groups, first-fit by decreasing box
+    references. `opcode_cost` is the budget one `settle_bill` call is assumed to use.
+    """
+    groups: list[list[Settlement]] = []
+    for settlement in sorted(settlements, key=lambda s: -s.box_refs):
+        for group in groups:
+            candidate = [*group, settlement]
+            if len(candidate) + _app_calls_needed(candidate, opcode_cost) <= MAX_GROUP_SIZE:
+                group.append(settlement)
+                break
+        else:
+            if 1 + _app_calls_needed([settlement], opcode_cost) > MAX_GROUP_SIZE:
+                raise ValueError(f"Settling bill {settlement.bill_key} needs more than one group")
+            groups.append([settlement])
+    for group in groups:
+        group.sort(key=lambda s: (s.payer, s.bill_key.bill_id))
+    groups.sort(key=lambda group: (group[0].payer, group[0].bill_key.bill_id))
+    return PayoffPlan(member=member, group_id=group_id, groups=groups, opcode_cost=opcode_cost)
+
+
+def payoff_composers(
+    client: SplitrixClient,
+    member: str,
+    group_id: int,
+    *,
+    mirror: SplitrixMirror | None = None,
+    signer: TransactionSigner | None = None,
+    max_workers: int = 16,
+) -> list[SplitrixComposer]:
+    """
+    Composers that clear all of `member`'s debts in `group_id`, using `mirror`
+    when given and a box load of the group's bills otherwise. Usually a single
+    composer; send them in order, e.g. with `confirmations.send_composers`.
+    """
+    if mirror is not None:
+        settlements = open_debts_from_mirror(mirror, member, group_id)
+    else:
+        bills = box_loader.load_bills(client, group_id, max_workers=max_workers)
+        settlements = open_debts(member, group_id, bills)
+    return plan_payoff(member, group_id, settlements).composers(client, signer=signer)
@@ -0,0 +1,499 @@
+"""
+Memory-mapped bill store shared by many reader processes.
+
+One writer process (typically the event indexer) keeps the `bills` map in a
+file of fixed-size records; every other process maps the same file read-only,
+so the operating system shares one copy of the pages however many workers run.
+
+    header     magic, version, seq, round, capacities and fill counts
+    table      open-addressing hash slots: group_id[8] bill_id[8] record + 1[4]
+    bills      total_amount[8] payer[4] debtor_start[4] memo_offset[4] debtors[2] memo_length[2]
+    debtors    debtor[4] amount[8] paid[8]
+    addresses  public key[32], referenced by index from bills and debtors
+    memos      UTF-8 heap
+
+The file is local to one machine, so records use native little-endian layouts.
+Capacities are fixed at creation: bills are never deleted on chain and debtor
+lists never change length, so updates rewrite records in place and the store
+only grows by appending. Consistency uses a seqlock: the writer makes `seq` odd
+while it writes and even when done, and readers retry any read that overlapped
+a write. Readers never block the writer. A writer that dies mid-write leaves
+`seq` odd: readers give up after `read_timeout` seconds, and reopening the file
+as the writer makes `seq` even again.
+"""
+
+import contextlib
+import logging
+import mmap
+import os
+import struct
+import time
+import typing
+from collections.abc import Buffer, Iterable, Iterator, Sequence
+from pathlib import Path
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    SplitrixClient,
+)
+from smart_contracts.splitrix import box_loader, bulk_reads
+from smart_contracts.splitrix.box_loader import BILLS_PREFIX
+from smart_contracts.splitrix.codec import (
+    BILL_HEAD_LAYOUT,
+    DEBTOR_LAYOUT,
+    DEBTOR_SIZE,
+    U16,
+    address_from_bytes,
+    address_to_bytes,
+)
+from smart_contracts.splitrix.event_indexer import SplitrixEvent
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SPLXSHM1"
+VERSION = 1
+
+# magic, version, seq, round, table slots, then (capacity, used) for bills,
+# debtors, addresses and memo bytes.
+HEADER_LAYOUT = struct.Struct("<8sI4xQQQQQQQQQQQ")
+HEADER_SIZE = 128
+_SEQ_OFFSET = 16
+_ROUND_OFFSET = 24
+_BILL_COUNT_OFFSET = 48
+_DEBTOR_COUNT_OFFSET = 64
+_ADDRESS_COUNT_OFFSET = 80
+_MEMO_USED_OFFSET = 96
+
+SLOT_LAYOUT = struct.Struct("<QQI4x")
+BILL_RECORD_LAYOUT = struct.Struct("<QIIIHH")
+DEBTOR_RECORD_LAYOUT = struct.Struct("<I4xQQ")
+ADDRESS_SIZE = 32
+
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+_T = typing.TypeVar("_T")
+
+
+class StoreFullError(RuntimeError):
+    """Raised when a region of the store has no room left; recreate it with larger capacities."""
+
+
+def _slot_hash(group_id: int, bill_id: int) -> int:
+    # splitmix64-style mixing, sequential bill ids would otherwise cluster.
+    value = (group_id * 0x9E3779B97F4A7C15 + bill_id) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return value ^ (value >> 31)
+
+
+class SharedBillStore:
+    """
+    A store file opened either as the single writer or as a reader.
+
+    Create one with `SharedBillStore.create`, then open it from each worker with
+    `SharedBillStore(path)`. Only the writer may call the `put_*`/`load_*`/
+    `apply_events` methods; running two writers on one file corrupts it. Reads
+    that keep overlapping a write for `read_timeout` seconds raise `TimeoutError`.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        writable: bool = False,
+        read_timeout: float = 5.0,
+    ) -> None:
+        self.path = Path(path)
+        self.writable = writable
+        self.read_timeout = read_timeout
+        with open(self.path, "r+b" if writable else "rb") as file:
+            self._mmap = mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            )
+        (
+            magic,
+            version,
+            _,
+            _,
+            self.table_slots,
+            self.bill_capacity,
+            _,
+            self.debtor_capacity,
+            _,
+            self.address_capacity,
+            _,
+            self.memo_capacity,
+            _,
+        ) = HEADER_LAYOUT.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} Splitrix bill store")
+        self._table_offset = HEADER_SIZE
+        self._bills_offset = self._table_offset + self.table_slots * SLOT_LAYOUT.size
+        self._debtors_offset = self._bills_offset + self.bill_capacity * BILL_RECORD_LAYOUT.size
+        self._addresses_offset = (
+            self._debtors_offset + self.debtor_capacity * DEBTOR_RECORD_LAYOUT.size
+        )
+        self._memos_offset = self._addresses_offset + self.address_capacity * ADDRESS_SIZE
+        self._mask = self.table_slots - 1
+        # Writer-side lookup tables, rebuilt from the file so a writer can restart.
+        self._address_ids: dict[bytes, int] = {}
+        self._records: dict[tuple[int, int], int] = {}
+        if writable:
+            seq = self._read_u64(_SEQ_OFFSET)
+            if seq & 1:
+                # The previous writer died inside a write section. The records it
+                # was rewriting may be torn until they are written again.
+                logger.warning(f"{self.path} was left mid-write, releasing the seqlock")
+                _U64.pack_into(self._mmap, _SEQ_OFFSET, seq + 1)
+            for address_id in range(self._read_u64(_ADDRESS_COUNT_OFFSET)):
+                start = self._addresses_offset + address_id * ADDRESS_SIZE
+                self._address_ids[self._mmap[start : start + ADDRESS_SIZE]] = address_id
+            for slot in range(self.table_slots):
+                group_id, bill_id, record = SLOT_LAYOUT.unpack_from(
+                    self._mmap, self._table_offset + slot * SLOT_LAYOUT.size
+                )
+                if record:
+                    self._records[(group_id, bill_id)] = record - 1
+
+    @classmethod
+    def create(
+        cls,
+        path: str | os.PathLike[str],
+        *,
+        bill_capacity: int,
+        debtor_capacity: int | None = None,
+        address_capacity: int = 65_536,
+        memo_capacity: int | None = None,
+    ) -> "SharedBillStore":
+        """
+        Create (or truncate) a store and open it for writing. The defaults budget
+        eight debtors and 32 memo bytes per bill; the hash table is kept at most
+        half full.
+        """
+        debtor_capacity = debtor_capacity if debtor_capacity is not None else bill_capacity * 8
+        memo_capacity = memo_capacity if memo_capacity is not None else bill_capacity * 32
+        table_slots = 1 << max(1, (2 * bill_capacity - 1).bit_length())
+        size = (
+            HEADER_SIZE
+            + table_slots * SLOT_LAYOUT.size
+            + bill_capacity * BILL_RECORD_LAYOUT.size
+            + debtor_capacity * DEBTOR_RECORD_LAYOUT.size
+            + address_capacity * ADDRESS_SIZE
+            + memo_capacity
+        )
+        with open(path, "wb") as file:
+            # A sparse file: pages are only allocated once written.
+            file.truncate(size)
+            file.write(
+                HEADER_LAYOUT.pack(
+                    MAGIC,
+                    VERSION,
+                    0,
+                    0,
+                    table_slots,
+                    bill_capacity,
+                    0,
+                    debtor_capacity,
+                    0,
+                    address_capacity,
+                    0,
+                    memo_capacity,
+                    0,
+                )
+            )
+        return cls(path, writable=True)
+
+    def __enter__(self) -> "SharedBillStore":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.writable:
+            self._mmap.flush()
+        self._mmap.close()
+
+    def _read_u64(self, offset: int) -> int:
+        return _U64.unpack_from(self._mmap, offset)[0]  # type: ignore[no-any-return]
+
+    # ---- seqlock ----
+
+    @contextlib.contextmanager
+    def _write_section(self) -> Iterator[None]:
+        if not self.writable:
+            raise PermissionError(f"{self.path} is open read-only")
+        seq = self._read_u64(_SEQ_OFFSET)
+        _U64.pack_into(self._mmap, _SEQ_OFFSET, seq + 1)
+        try:
+            yield
+        finally:
+            _U64.pack_into(self._mmap, _SEQ_OFFSET, seq + 2)
+
+    def _read_consistent(self, read: typing.Callable[[], _T]) -> _T:
+        """Run `read` until it completes without overlapping a write."""
+        deadline = time.monotonic() + self.read_timeout
+        while True:
+            before = self._read_u64(_SEQ_OFFSET)
+            if not before & 1:
+                try:
+                    result = read()
+                except (struct.error, UnicodeDecodeError, IndexError, ValueError):
+                    # Torn reads can produce garbage offsets, only trust a stable seq.
+                    if self._read_u64(_SEQ_OFFSET) == before:
+                        raise
+                else:
+                    if self._read_u64(_SEQ_OFFSET) == before:
+                        return result
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"Reads of {self.path} overlapped writes for {self.read_timeout}s; if "
+                    "its writer died mid-write, reopen it as the writer to recover"
+                )
+            time.sleep(0)
+
+    # ---- writer ----
+
+    def _intern(self, public_key: bytes) -> int:
+        address_id = self._address_ids.get(public_key)
+        if address_id is None:
+            address_id = len(self._address_ids)
+            if address_id >= self.address_capacity:
+                raise StoreFullError(f"{self.path} has no room for more addresses")
+            start = self._addresses_offset + address_id * ADDRESS_SIZE
+            self._mmap[start : start + ADDRESS_SIZE] = public_key
+            self._address_ids[public_key] = address_id
+            _U64.pack_into(self._mmap, _ADDRESS_COUNT_OFFSET, address_id + 1)
+        return address_id
+
+    def _insert_slot(self, group_id: int, bill_id: int, record: int) -> None:
+        slot = _slot_hash(group_id, bill_id) & self._mask
+        while True:
+            offset = self._table_offset + slot * SLOT_LAYOUT.size
+            if not _U32.unpack_from(self._mmap, offset + 16)[0]:
+                SLOT_LAYOUT.pack_into(self._mmap, offset, group_id, bill_id, record + 1)
+                return
+            slot = (slot + 1) & self._mask
+
+    def _put(
+        self,
+        key: BillKey,
+        payer: bytes,
+        total_amount: int,
+        debtors: Sequence[tuple[bytes, int, int]],
+        memo: bytes,
+    ) -> None:
+        record = self._records.get((key.group_id, key.bill_id))
+        if record is not None:
+            _, _, debtor_start, memo_offset, count, memo_length = BILL_RECORD_LAYOUT.unpack_from(
+                self._mmap, self._bills_offset + record * BILL_RECORD_LAYOUT.size
+            )
+            if count != len(debtors):
+                debtor_start = self._allocate_debtors(len(debtors))
+            if len(memo) > memo_length:
+                memo_offset = self._allocate_memo(len(memo))
+        else:
+            record = self._read_u64(_BILL_COUNT_OFFSET)
+            if record >= self.bill_capacity:
+                raise StoreFullError(f"{self.path} has no room for more bills")
+            debtor_start = self._allocate_debtors(len(debtors))
+            memo_offset = self._allocate_memo(len(memo))
+        for row, (debtor, amount, paid) in enumerate(debtors, debtor_start):
+            DEBTOR_RECORD_LAYOUT.pack_into(
+                self._mmap,
+                self._debtors_offset + row * DEBTOR_RECORD_LAYOUT.size,
+                self._intern(debtor),
+                amount,
+                paid,
+            )
+        memo_start = self._memos_offset + memo_offset
+        self._mmap[memo_start : memo_start + len(memo)] = memo
+        BILL_RECORD_LAYOUT.pack_into(
+            self._mmap,
+            self._bills_offset + record * BILL_RECORD_LAYOUT.size,
+            total_amount,
+            self._intern(payer),
+            debtor_start,
+            memo_offset,
+            len(debtors),
+            len(memo),
+        )
+        if (key.group_id, key.bill_id) not in self._records:
+            self._insert_slot(key.group_id, key.bill_id, record)
+            self._records[(key.group_id, key.bill_id)] = record
+            _U64.pack_into(self._mmap, _BILL_COUNT_OFFSET, record + 1)
+
+    def _allocate_debtors(self, count: int) -> int:
+        start = self._read_u64(_DEBTOR_COUNT_OFFSET)
+        if start + count > self.debtor_capacity:
+            raise StoreFullError(f"{self.path} has no room for more debtor rows")
+        _U64.pack_into(self._mmap, _DEBTOR_COUNT_OFFSET, start + count)
+        return start
+
+    def _allocate_memo(self, length: int) -> int:
+        start = self._read_u64(_MEMO_USED_OFFSET)
+        if start + length > self.memo_capacity:
+            raise StoreFullError(f"{self.path} has no room for more memo bytes")
+        _U64.pack_into(self._mmap, _MEMO_USED_OFFSET, start + length)
+        return start
+
+    def _put_bill(self, key: BillKey, bill: Bill) -> None:
+        self._put(
+            key,
+            address_to_bytes(bill.payer),
+            bill.total_amount,
+            [
+                (address_to_bytes(debtor), amount, paid)  # type: ignore[arg-type]
+                for debtor, amount, paid in bill.debtors
+            ],
+            bill.memo.encode("utf-8"),
+        )
+
+    def _put_bill_bytes(self, key: BillKey, raw: Buffer) -> None:
+        view = memoryview(raw)
+        payer, total_amount, debtors_offset, memo_offset = BILL_HEAD_LAYOUT.unpack_from(view, 0)
+        (count,) = U16.unpack_from(view, debtors_offset)
+        first = debtors_offset + 2
+        debtors = list(DEBTOR_LAYOUT.iter_unpack(view[first : first + count * DEBTOR_SIZE]))
+        (memo_length,) = U16.unpack_from(view, memo_offset)
+        memo = bytes(view[memo_offset + 2 : memo_offset + 2 + memo_length])
+        self._put(key, payer, total_amount, debtors, memo)
+
+    def put_bills(
+        self, bills: Iterable[tuple[BillKey, Bill]], round_num: int | None = None
+    ) -> None:
+        """Write bills, and the round they reflect, as one update readers see atomically."""
+        with self._write_section():
+            for key, bill in bills:
+                self._put_bill(key, bill)
+            if round_num is not None:
+                _U64.pack_into(self._mmap, _ROUND_OFFSET, round_num)
+
+    def load_boxes(
+        self,
+        boxes: Iterable[tuple[bytes, Buffer]],
+        round_num: int,
+        *,
+        batch_size: int = 1_000,
+    ) -> None:
+        """
+        Load raw `(box name, value)` pairs from the box loader or a snapshot,
+        skipping `groups` boxes. Writes are published every `batch_size` bills so
+        readers are never starved during a large load.
+        """
+        bills = ((name, value) for name, value in boxes if name.startswith(BILLS_PREFIX))
+        finished = False
+        while not finished:
+            with self._write_section():
+                for _ in range(batch_size):
+                    entry = next(bills, None)
+                    if entry is None:
+                        finished = True
+                        _U64.pack_into(self._mmap, _ROUND_OFFSET, round_num)
+                        break
+                    self._put_bill_bytes(box_loader.bill_key_from_box_name(entry[0]), entry[1])
+        logger.info(f"Shared store loaded at round {round_num}: {len(self._records)} bills")
+
+    def load_from_boxes(self, client: SplitrixClient, *, max_workers: int = 16) -> None:
+        round_num = client.algorand.client.algod.status()["last-round"]
+        self.load_boxes(
+            box_loader.iter_box_values(client, "bills", max_workers=max_workers), round_num
+        )
+
+    def apply_events(self, client: SplitrixClient, events: Sequence[SplitrixEvent]) -> None:
+        """Indexer handler: re-read the bills named by `events` and publish them at once."""
+        bill_keys = {event.args[0] for event in events if event.name == "BillChanged"}
+        ordered_keys = sorted(bill_keys, key=lambda k: (k.group_id, k.bill_id))
+        bills = bulk_reads.get_bills(client, ordered_keys) if ordered_keys else []
+        self.put_bills(
+            [(k, b) for k, b in zip(ordered_keys, bills, strict=True) if b is not None],
+            max((event.round for event in events), default=None),
+        )
+
+    # ---- readers ----
+
+    def _find(self, group_id: int, bill_id: int) -> int | None:
+        slot = _slot_hash(group_id, bill_id) & self._mask
+        while True:
+            slot_group, slot_bill, record = SLOT_LAYOUT.unpack_from(
+                self._mmap, self._table_offset + slot * SLOT_LAYOUT.size
+            )
+            if not record:
+                return None
+            if slot_group == group_id and slot_bill == bill_id:
+                return record - 1  # type: ignore[no-any-return]
+            slot = (slot + 1) & self._mask
+
+    def _address(self, address_id: int) -> str:
+        start = self._addresses_offset + address_id * ADDRESS_SIZE
+        return address_from_bytes(self._mmap[start : start + ADDRESS_SIZE])
+
+    def _read_bill(self, key: BillKey) -> Bill | None:
+        record = self._find(key.group_id, key.bill_id)
+        if record is None:
+            return None
+        total_amount, payer, debtor_start, memo_offset, count, memo_length = (
+            BILL_RECORD_LAYOUT.unpack_from(
+                self._mmap, self._bills_offset + record * BILL_RECORD_LAYOUT.size
+            )
+        )
+        first = self._debtors_offset + debtor_start * DEBTOR_RECORD_LAYOUT.size
+        rows = [
+            DEBTOR_RECORD_LAYOUT.unpack_from(self._mmap, first + i * DEBTOR_RECORD_LAYOUT.size)
+            for i in range(count)
+        ]
+        memo_start = self._memos_offset + memo_offset
+        memo = self._mmap[memo_start : memo_start + memo_length].decode("utf-8")
+        return Bill(
+            payer=self._address(payer),
+            total_amount=total_amount,
+            debtors=[[self._address(debtor), amount, paid] for debtor, amount, paid in rows],
+            memo=memo,
+        )
+
+    def _read_outstanding(self, key: BillKey, index: int) -> int:
+        record = self._find(key.group_id, key.bill_id)
+        if record is None:
+            raise KeyError(key)
+        _, _, debtor_start, _, count, _ = BILL_RECORD_LAYOUT.unpack_from(
+            self._mmap, self._bills_offset + record * BILL_RECORD_LAYOUT.size
+        )
+        if not 0 <= index < count:
+            raise IndexError(f"Bill {key} has no debtor {index}")
+        _, amount, paid = DEBTOR_RECORD_LAYOUT.unpack_from(
+            self._mmap,
+            self._debtors_offset + (debtor_start + index) * DEBTOR_RECORD_LAYOUT.size,
+        )
+        return amount - paid  # type: ignore[no-any-return]
+
+    @property
+    def round(self) -> int:
+        return self._read_consistent(lambda: self._read_u64(_ROUND_OFFSET))
+
+    def __len__(self) -> int:
+        return self._read_consistent(lambda: self._read_u64(_BILL_COUNT_OFFSET))
+
+    def bill(self, key: BillKey) -> Bill | None:
+        return self._read_consistent(lambda: self._read_bill(key))
+
+    def outstanding(self, key: BillKey, index: int) -> int:
+        """What debtor `index` still owes on a bill, without decoding the rest of it."""
+        return self._read_consistent(lambda: self._read_outstanding(key, index))
+
+    def keys(self) -> list[BillKey]:
+        """Every stored bill key, in no particular order."""
+
+        def read() -> list[BillKey]:
+            keys = []
+            for slot in range(self.table_slots):
+                group_id, bill_id, record = SLOT_LAYOUT.unpack_from(
+                    self._mmap, self._table_offset + slot * SLOT_LAYOUT.size
+                )
+                if record:
+                    keys.append(BillKey(group_id=group_id, bill_id=bill_id))
+            return keys
+
+        return self._read_consistent(read)
@@ -0,0 +1,135 @@
+"""
+Process-pool transaction signing.
+
+Signing a transaction means msgpack-encoding it and computing an Ed25519
+signature, both CPU-bound and both holding the GIL. `SigningPool` moves that work
+to worker processes that receive the private keys once, at start-up, and hands
+out `TransactionSigner`s that plug into composers, `AlgorandClient.account` and
+`BulkSubmitter`. Signatures are returned by index, so the order within each
+atomic group is preserved however the work is split.
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+import typing
+from collections.abc import Iterable, Sequence
+
+import algokit_utils
+from algosdk import account
+from algosdk.atomic_transaction_composer import TransactionSigner
+from algosdk.transaction import SignedTransaction, Transaction
+
+# Worker-process state, filled in by `_init_worker`.
+_WORKER_KEYS: dict[str, str] = {}
+
+_SignedParts = tuple[str, str | None]
+
+
+def _init_worker(private_keys: dict[str, str]) -> None:
+    _WORKER_KEYS.update(private_keys)
+
+
+def _sign_chunk(jobs: list[tuple[str, Transaction]]) -> list[_SignedParts]:
+    """Sign `(key address, txn)` jobs, returning `(signature, auth address)` pairs."""
+    signed = []
+    for address, txn in jobs:
+        stxn = txn.sign(_WORKER_KEYS[address])
+        signed.append((stxn.signature, stxn.authorizing_address))
+    return signed
+
+
+class SigningPool:
+    """
+    Worker processes holding a set of private keys.
+
+    `signer(address)` returns a `TransactionSigner` for one of the keys. Large
+    `sign_transactions` calls are split into `chunk_size` slices signed in
+    parallel; `sign_groups` spreads many whole groups across the workers.
+    """
+
+    def __init__(
+        self,
+        private_keys: Iterable[str],
+        *,
+        max_workers: int | None = None,
+        chunk_size: int = 8,
+        mp_context: multiprocessing.context.BaseContext | None = None,
+    ) -> None:
+        self.keys = {account.address_from_private_key(key): key for key in private_keys}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(self.keys,),
+        )
+
+    def __enter__(self) -> "SigningPool":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def signer(self, address: str) -> "PooledSigner":
+        if address not in self.keys:
+            raise ValueError(f"No private key for {address} in the signing pool")
+        return PooledSigner(self, address)
+
+    def register(self, algorand: algokit_utils.AlgorandClient) -> None:
+        """Route every account of the pool through it for `algorand`'s composers."""
+        for address in self.keys:
+            algorand.account.set_signer(address, self.signer(address))
+
+    def _submit(
+        self, jobs: list[tuple[str, Transaction]]
+    ) -> list[concurrent.futures.Future[list[_SignedParts]]]:
+        return [
+            self._executor.submit(_sign_chunk, jobs[start : start + self.chunk_size])
+            for start in range(0, len(jobs), self.chunk_size)
+        ]
+
+    def sign_groups(
+        self, groups: Sequence[tuple[str, Sequence[Transaction], Sequence[int]]]
+    ) -> list[list[SignedTransaction]]:
+        """
+        Sign many `(key address, txn_group, indexes)` requests at once, returning
+        the signed transactions of each request in `indexes` order.
+        """
+        jobs = [
+            (address, txn_group[i])
+            for address, txn_group, indexes in groups
+            for i in indexes
+        ]
+        parts = [part for future in self._submit(jobs) for part in future.result()]
+        results: list[list[SignedTransaction]] = []
+        position = 0
+        for _, txn_group, indexes in groups:
+            results.append(
+                [
+                    SignedTransaction(txn_group[i], signature, auth)
+                    for i, (signature, auth) in zip(
+                        indexes, parts[position : position + len(indexes)], strict=True
+                    )
+                ]
+            )
+            position += len(indexes)
+        return results
+
+
+class PooledSigner(TransactionSigner):
+    """`TransactionSigner` for one account of a `SigningPool`."""
+
+    def __init__(self, pool: SigningPool, address: str) -> None:
+        super().__init__()
+        self.pool = pool
+        self.address = address
+
+    def sign_transactions(
+        self, txn_group: list[Transaction], indexes: list[int]
+    ) -> list[typing.Any]:
+        return self.pool.sign_groups([(self.address, txn_group, indexes)])[0]
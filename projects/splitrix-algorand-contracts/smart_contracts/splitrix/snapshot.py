@@ -0,0 +1,225 @@
+"""
+Memory-mappable snapshots of the Splitrix `groups` and `bills` boxes.
+
+A snapshot is a single file holding every box exactly as stored on chain, plus
+the round it was taken at, so a restarting service reads one file instead of
+making a request per box. All integers are big-endian, like the box encodings.
+
+    header:  magic[8] version[2] reserved[6] app_id[8] round[8] count[8] index_offset[8]
+    records: (name_length[2] value_length[4] name value)*
+    index:   record_offset[8] * count, sorted by box name
+
+`Snapshot` maps the file and hands out `memoryview`s into the mapping, records
+are only decoded when a group or bill is asked for. Box names sort by prefix,
+then big-endian ids, so the index doubles as `(group_id, bill_id)` order.
+"""
+
+import logging
+import mmap
+import os
+import struct
+from collections.abc import Buffer, Iterable, Iterator
+from pathlib import Path
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    Group,
+    SplitrixClient,
+)
+from smart_contracts.splitrix import box_loader
+from smart_contracts.splitrix.box_loader import BILLS_PREFIX, GROUPS_PREFIX
+from smart_contracts.splitrix.codec import (
+    BILL_KEY_LAYOUT,
+    U64,
+    decode_bill,
+    decode_group,
+    encode_bill,
+    encode_group,
+)
+from smart_contracts.splitrix.compact import CompactState
+from smart_contracts.splitrix.mirror import SplitrixMirror
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SPLXSNAP"
+VERSION = 1
+
+HEADER_LAYOUT = struct.Struct(">8sH6xQQQQ")
+RECORD_HEAD_LAYOUT = struct.Struct(">HI")
+
+
+def write_snapshot(
+    path: str | os.PathLike[str],
+    boxes: Iterable[tuple[bytes, Buffer]],
+    *,
+    app_id: int,
+    round_num: int,
+) -> int:
+    """
+    Write `(box name, value)` pairs as a snapshot taken at `round_num`, returning
+    the record count. Records stream straight to disk; only the offsets are kept
+    in memory. The file is replaced atomically once complete.
+    """
+    target = Path(path)
+    temporary = target.with_suffix(target.suffix + ".tmp")
+    entries: list[tuple[bytes, int]] = []
+    with open(temporary, "wb") as file:
+        file.write(bytes(HEADER_LAYOUT.size))
+        offset = HEADER_LAYOUT.size
+        for name, value in boxes:
+            value_length = memoryview(value).nbytes
+            file.write(RECORD_HEAD_LAYOUT.pack(len(name), value_length))
+            file.write(name)
+            file.write(value)
+            entries.append((bytes(name), offset))
+            offset += RECORD_HEAD_LAYOUT.size + len(name) + value_length
+        entries.sort()
+        file.write(b"".join(U64.pack(record_offset) for _, record_offset in entries))
+        file.seek(0)
+        file.write(HEADER_LAYOUT.pack(MAGIC, VERSION, app_id, round_num, len(entries), offset))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, target)
+    logger.info(f"Wrote snapshot of {len(entries)} boxes at round {round_num} to {target}")
+    return len(entries)
+
+
+def snapshot_app(
+    client: SplitrixClient, path: str | os.PathLike[str], *, max_workers: int = 16
+) -> int:
+    """Snapshot every box of the app, stamped with the round read before the load started."""
+    round_num = client.algorand.client.algod.status()["last-round"]
+    return write_snapshot(
+        path,
+        box_loader.iter_box_values(client, max_workers=max_workers),
+        app_id=client.app_id,
+        round_num=round_num,
+    )
+
+
+def snapshot_mirror(mirror: SplitrixMirror, path: str | os.PathLike[str]) -> int:
+    """Snapshot a mirror's current state, e.g. periodically from an indexer process."""
+    groups, bills = mirror.to_maps()
+    boxes = [
+        (GROUPS_PREFIX + U64.pack(group_id), encode_group(group))
+        for group_id, group in groups.items()
+    ]
+    boxes += [
+        (BILLS_PREFIX + BILL_KEY_LAYOUT.pack(key.group_id, key.bill_id), encode_bill(bill))
+        for key, bill in bills.items()
+    ]
+    return write_snapshot(path, boxes, app_id=mirror.client.app_id, round_num=mirror.round)
+
+
+class Snapshot:
+    """
+    Read-only, zero-copy view of a snapshot file.
+
+    Values are `memoryview`s into the mapping; release any that are kept
+    around before calling `close`, which fails while views are still exported.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if len(self._view) < HEADER_LAYOUT.size:
+            self.close()
+            raise ValueError(f"{self.path} is too short to be a Splitrix snapshot")
+        magic, version, self.app_id, self.round, self._count, self._index_offset = (
+            HEADER_LAYOUT.unpack_from(self._view, 0)
+        )
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} Splitrix snapshot")
+        if self._index_offset + self._count * U64.size > len(self._view):
+            self.close()
+            raise ValueError(f"{self.path} is truncated")
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, position: int) -> tuple[memoryview, memoryview]:
+        (offset,) = U64.unpack_from(self._view, self._index_offset + position * U64.size)
+        name_length, value_length = RECORD_HEAD_LAYOUT.unpack_from(self._view, offset)
+        name_start = offset + RECORD_HEAD_LAYOUT.size
+        value_start = name_start + name_length
+        return (
+            self._view[name_start:value_start],
+            self._view[value_start : value_start + value_length],
+        )
+
+    def _bisect(self, name: bytes) -> int:
+        """Index position of the first record whose name is not less than `name`."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if bytes(self._record(middle)[0]) < name:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def value(self, name: bytes) -> memoryview | None:
+        """Raw value of the box called `name`, `None` if it was not in the snapshot."""
+        position = self._bisect(name)
+        if position < self._count:
+            record_name, value = self._record(position)
+            if record_name == name:
+                return value
+        return None
+
+    def items(self, prefix: bytes = b"") -> Iterator[tuple[bytes, memoryview]]:
+        """Yield `(box name, raw value)` in name order, optionally only names under `prefix`."""
+        for position in range(self._bisect(prefix), self._count):
+            name, value = self._record(position)
+            if name[: len(prefix)] != prefix:
+                return
+            yield bytes(name), value
+
+    def group(self, group_id: int) -> Group | None:
+        value = self.value(GROUPS_PREFIX + U64.pack(group_id))
+        return decode_group(value) if value is not None else None
+
+    def bill(self, key: BillKey) -> Bill | None:
+        value = self.value(BILLS_PREFIX + BILL_KEY_LAYOUT.pack(key.group_id, key.bill_id))
+        return decode_bill(value) if value is not None else None
+
+    def groups(self) -> Iterator[tuple[int, Group]]:
+        for name, value in self.items(GROUPS_PREFIX):
+            yield box_loader.group_id_from_box_name(name), decode_group(value)
+
+    def bills(self, group_id: int | None = None) -> Iterator[tuple[BillKey, Bill]]:
+        """Decoded bills in `(group_id, bill_id)` order, optionally of one group."""
+        prefix = BILLS_PREFIX if group_id is None else BILLS_PREFIX + U64.pack(group_id)
+        for name, value in self.items(prefix):
+            yield box_loader.bill_key_from_box_name(name), decode_bill(value)
+
+    def to_compact_state(self) -> CompactState:
+        state = CompactState()
+        for name, value in self.items():
+            if name.startswith(BILLS_PREFIX):
+                state.set_bill_bytes(box_loader.bill_key_from_box_name(name), value)
+            elif name.startswith(GROUPS_PREFIX):
+                state.set_group_bytes(box_loader.group_id_from_box_name(name), value)
+        return state
+
+    def restore(self, mirror: SplitrixMirror) -> None:
+        """Load the snapshot into `mirror`; index events from `self.round + 1` to catch up."""
+        if mirror.client.app_id != self.app_id:
+            raise ValueError(
+                f"Snapshot {self.path} belongs to app {self.app_id}, not {mirror.client.app_id}"
+            )
+        mirror.load_boxes(self.items(), self.round)
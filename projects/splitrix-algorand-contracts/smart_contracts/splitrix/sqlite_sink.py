@@ -0,0 +1,376 @@
+"""
+SQLite store for Splitrix groups, bills and debtor rows.
+
+The database runs in WAL mode so readers never block the writer. Every write
+is one transaction of `executemany` upserts: one per block when fed from the
+event indexer, one per window when bootstrapping from the box loader.
+
+Amounts are uint64 on chain, past the range of SQLite's signed 64-bit integers,
+so they are stored as 8-byte big-endian blobs. Blobs of equal length compare like
+the numbers they hold, so filters such as `amount > paid` still run in SQL, while
+differences and sums are computed in Python.
+
+    groups        (group_id) -> admin, bill_counter
+    group_members (group_id, position) -> address
+    bills         (group_id, bill_id) -> payer, total_amount, memo
+    debtors       (group_id, bill_id, position) -> debtor, amount, paid
+"""
+
+import itertools
+import logging
+import os
+import sqlite3
+from collections.abc import Iterable, Iterator, Sequence
+
+from smart_contracts.artifacts.splitrix.splitrix_client import (
+    Bill,
+    BillKey,
+    Group,
+    SplitrixClient,
+)
+from smart_contracts.splitrix import box_loader, bulk_reads
+from smart_contracts.splitrix.box_loader import BILLS_PREFIX
+from smart_contracts.splitrix.codec import U64, decode_bill, decode_group
+from smart_contracts.splitrix.event_indexer import SplitrixEvent
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the layout changes; older databases are migrated on open.
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS groups (
+    group_id INTEGER PRIMARY KEY,
+    admin TEXT NOT NULL,
+    bill_counter INTEGER NOT NULL,
+    round INTEGER
+);
+CREATE TABLE IF NOT EXISTS group_members (
+    group_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    PRIMARY KEY (group_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bills (
+    group_id INTEGER NOT NULL,
+    bill_id INTEGER NOT NULL,
+    payer TEXT NOT NULL,
+    total_amount BLOB NOT NULL,
+    memo TEXT NOT NULL,
+    round INTEGER,
+    PRIMARY KEY (group_id, bill_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS debtors (
+    group_id INTEGER NOT NULL,
+    bill_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    debtor TEXT NOT NULL,
+    amount BLOB NOT NULL,
+    paid BLOB NOT NULL,
+    PRIMARY KEY (group_id, bill_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS group_members_address ON group_members (address);
+CREATE INDEX IF NOT EXISTS bills_payer ON bills (payer);
+CREATE INDEX IF NOT EXISTS debtors_debtor ON debtors (debtor);
+"""
+
+_UPSERT_GROUP = """
+INSERT INTO groups (group_id, admin, bill_counter, round) VALUES (?, ?, ?, ?)
+ON CONFLICT (group_id) DO UPDATE SET
+    admin = excluded.admin, bill_counter = excluded.bill_counter, round = excluded.round
+"""
+_UPSERT_MEMBER = """
+INSERT INTO group_members (group_id, position, address) VALUES (?, ?, ?)
+ON CONFLICT (group_id, position) DO UPDATE SET address = excluded.address
+"""
+_UPSERT_BILL = """
+INSERT INTO bills (group_id, bill_id, payer, total_amount, memo, round) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (group_id, bill_id) DO UPDATE SET
+    payer = excluded.payer, total_amount = excluded.total_amount,
+    memo = excluded.memo, round = excluded.round
+"""
+_UPSERT_DEBTOR = """
+INSERT INTO debtors (group_id, bill_id, position, debtor, amount, paid) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (group_id, bill_id, position) DO UPDATE SET
+    debtor = excluded.debtor, amount = excluded.amount, paid = excluded.paid
+"""
+# Bill debtor lists never change length on chain, these only guard against
+# rows left over from a differently shaped earlier write.
+_TRIM_MEMBERS = "DELETE FROM group_members WHERE group_id = ? AND position >= ?"
+_TRIM_DEBTORS = "DELETE FROM debtors WHERE group_id = ? AND bill_id = ? AND position >= ?"
+
+
+def _amount(value: int) -> bytes:
+    return U64.pack(value)
+
+
+def _from_amount(value: bytes | int) -> int:
+    # Version 0 databases stored integers; `_migrate` rewrites them on open.
+    return value if isinstance(value, int) else U64.unpack(value)[0]
+
+
+class SQLiteSink:
+    """Writes Splitrix state into a WAL-mode SQLite database and answers lookups from it."""
+
+    def __init__(self, path: str | os.PathLike[str], *, batch_size: int = 10_000) -> None:
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        # NORMAL is durable across application crashes in WAL mode, only an OS
+        # crash may lose the last transactions, which re-indexing replays.
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute("PRAGMA temp_store = MEMORY")
+        self.connection.executescript(_SCHEMA)
+        self._migrate()
+
+    def __enter__(self) -> "SQLiteSink":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def _migrate(self) -> None:
+        """Rewrite the integer amounts of a version 0 database as blobs."""
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        if version >= _SCHEMA_VERSION:
+            return
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN")
+        try:
+            cursor.executemany(
+                "UPDATE bills SET total_amount = ? WHERE group_id = ? AND bill_id = ?",
+                [
+                    (_amount(total_amount), group_id, bill_id)
+                    for group_id, bill_id, total_amount in cursor.execute(
+                        "SELECT group_id, bill_id, total_amount FROM bills "
+                        "WHERE typeof(total_amount) = 'integer'"
+                    ).fetchall()
+                ],
+            )
+            cursor.executemany(
+                "UPDATE debtors SET amount = ?, paid = ? "
+                "WHERE group_id = ? AND bill_id = ? AND position = ?",
+                [
+                    (_amount(amount), _amount(paid), group_id, bill_id, position)
+                    for group_id, bill_id, position, amount, paid in cursor.execute(
+                        "SELECT group_id, bill_id, position, amount, paid FROM debtors "
+                        "WHERE typeof(amount) = 'integer' OR typeof(paid) = 'integer'"
+                    ).fetchall()
+                ],
+            )
+            cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            cursor.execute("COMMIT")
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+
+    # ---- writes ----
+
+    def write(
+        self,
+        groups: Iterable[tuple[int, Group]] = (),
+        bills: Iterable[tuple[BillKey, Bill]] = (),
+        round_num: int | None = None,
+    ) -> None:
+        """Upsert groups and bills in a single transaction, recording `round_num` if given."""
+        group_rows, member_rows, bill_rows, debtor_rows = [], [], [], []
+        member_trims, debtor_trims = [], []
+        for group_id, group in groups:
+            group_rows.append((group_id, group.admin, group.bill_counter, round_num))
+            member_trims.append((group_id, len(group.members)))
+            member_rows.extend(
+                (group_id, position, member) for position, member in enumerate(group.members)
+            )
+        for key, bill in bills:
+            bill_rows.append(
+                (
+                    key.group_id,
+                    key.bill_id,
+                    bill.payer,
+                    _amount(bill.total_amount),
+                    bill.memo,
+                    round_num,
+                )
+            )
+            debtor_trims.append((key.group_id, key.bill_id, len(bill.debtors)))
+            debtor_rows.extend(
+                (key.group_id, key.bill_id, position, debtor, _amount(amount), _amount(paid))
+                for position, (debtor, amount, paid) in enumerate(bill.debtors)
+            )
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN")
+        try:
+            cursor.executemany(_UPSERT_GROUP, group_rows)
+            cursor.executemany(_UPSERT_MEMBER, member_rows)
+            cursor.executemany(_UPSERT_BILL, bill_rows)
+            cursor.executemany(_UPSERT_DEBTOR, debtor_rows)
+            cursor.executemany(_TRIM_MEMBERS, member_trims)
+            cursor.executemany(_TRIM_DEBTORS, debtor_trims)
+            if round_num is not None:
+                cursor.execute(
+                    "INSERT INTO meta (key, value) VALUES ('round', ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)",
+                    (round_num,),
+                )
+            cursor.execute("COMMIT")
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+
+    def load_from_boxes(
+        self, client: SplitrixClient, round_num: int | None = None, *, max_workers: int = 16
+    ) -> None:
+        """Bootstrap from every `groups`/`bills` box, committing `batch_size` boxes at a time."""
+        values = box_loader.iter_box_values(client, max_workers=max_workers)
+        while batch := list(itertools.islice(values, self.batch_size)):
+            groups, bills = [], []
+            for name, value in batch:
+                if name.startswith(BILLS_PREFIX):
+                    bills.append((box_loader.bill_key_from_box_name(name), decode_bill(value)))
+                else:
+                    groups.append((box_loader.group_id_from_box_name(name), decode_group(value)))
+            self.write(groups, bills)
+        if round_num is not None:
+            self.write(round_num=round_num)
+
+    def apply_events(self, client: SplitrixClient, events: Sequence[SplitrixEvent]) -> None:
+        """
+        Indexer handler: re-read the groups and bills named by `events` and upsert
+        them in one transaction per block. Reads return current state, which is
+        at least as new as the events' rounds.
+        """
+        for round_num, round_events in itertools.groupby(events, key=lambda e: e.round):
+            group_ids: set[int] = set()
+            bill_keys: set[BillKey] = set()
+            for event in round_events:
+                if event.name == "GroupCreated":
+                    group_ids.add(event.args[0])
+                elif event.name == "BillChanged":
+                    bill_keys.add(event.args[0])
+                    # create_bill also bumps the group's bill_counter.
+                    group_ids.add(event.args[0].group_id)
+            ordered_ids = sorted(group_ids)
+            ordered_keys = sorted(bill_keys, key=lambda k: (k.group_id, k.bill_id))
+            groups = bulk_reads.get_groups(client, ordered_ids) if ordered_ids else []
+            bills = bulk_reads.get_bills(client, ordered_keys) if ordered_keys else []
+            self.write(
+                [(i, g) for i, g in zip(ordered_ids, groups, strict=True) if g is not None],
+                [(k, b) for k, b in zip(ordered_keys, bills, strict=True) if b is not None],
+                round_num,
+            )
+
+    # ---- reads ----
+
+    @property
+    def round(self) -> int | None:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'round'").fetchone()
+        return row[0] if row else None
+
+    def group(self, group_id: int) -> Group | None:
+        row = self.connection.execute(
+            "SELECT admin, bill_counter FROM groups WHERE group_id = ?", (group_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        members = [
+            address
+            for (address,) in self.connection.execute(
+                "SELECT address FROM group_members WHERE group_id = ? ORDER BY position",
+                (group_id,),
+            )
+        ]
+        return Group(admin=row[0], bill_counter=row[1], members=members)
+
+    def bill(self, key: BillKey) -> Bill | None:
+        row = self.connection.execute(
+            "SELECT payer, total_amount, memo FROM bills WHERE group_id = ? AND bill_id = ?",
+            (key.group_id, key.bill_id),
+        ).fetchone()
+        if row is None:
+            return None
+        debtors = [
+            [debtor, _from_amount(amount), _from_amount(paid)]
+            for debtor, amount, paid in self.connection.execute(
+                "SELECT debtor, amount, paid FROM debtors "
+                "WHERE group_id = ? AND bill_id = ? ORDER BY position",
+                (key.group_id, key.bill_id),
+            )
+        ]
+        return Bill(
+            payer=row[0], total_amount=_from_amount(row[1]), debtors=debtors, memo=row[2]
+        )
+
+    def iter_groups(self) -> Iterator[tuple[int, Group]]:
+        """Stream every group in id order, without loading the table into memory."""
+        rows = self.connection.execute(
+            "SELECT g.group_id, g.admin, g.bill_counter, m.address FROM groups g "
+            "LEFT JOIN group_members m ON m.group_id = g.group_id "
+            "ORDER BY g.group_id, m.position"
+        )
+        for group_id, members in itertools.groupby(rows, key=lambda row: row[0]):
+            first = next(members)
+            addresses = [first[3]] if first[3] is not None else []
+            addresses.extend(row[3] for row in members)
+            yield group_id, Group(admin=first[1], bill_counter=first[2], members=addresses)
+
+    def iter_bills(self) -> Iterator[tuple[BillKey, Bill]]:
+        """Stream every bill in `(group_id, bill_id)` order."""
+        rows = self.connection.execute(
+            "SELECT b.group_id, b.bill_id, b.payer, b.total_amount, b.memo, "
+            "d.debtor, d.amount, d.paid FROM bills b "
+            "LEFT JOIN debtors d ON d.group_id = b.group_id AND d.bill_id = b.bill_id "
+            "ORDER BY b.group_id, b.bill_id, d.position"
+        )
+        for (group_id, bill_id), debtors in itertools.groupby(rows, key=lambda row: row[:2]):
+            first = next(debtors)
+            rows = [first, *debtors] if first[5] is not None else []
+            entries = [[row[5], _from_amount(row[6]), _from_amount(row[7])] for row in rows]
+            yield BillKey(group_id=group_id, bill_id=bill_id), Bill(
+                payer=first[2], total_amount=_from_amount(first[3]), debtors=entries, memo=first[4]
+            )
+
+    def bills_owed_by(self, address: str) -> list[tuple[BillKey, int]]:
+        """Bills where `address` still owes something, with the outstanding amount."""
+        return [
+            (
+                BillKey(group_id=group_id, bill_id=bill_id),
+                _from_amount(amount) - _from_amount(paid),
+            )
+            for group_id, bill_id, amount, paid in self.connection.execute(
+                "SELECT group_id, bill_id, amount, paid FROM debtors "
+                "WHERE debtor = ? AND amount > paid ORDER BY group_id, bill_id",
+                (address,),
+            )
+        ]
+
+    def balance(self, address: str, group_id: int | None = None) -> int:
+        """What others owe `address` minus what `address` owes, optionally in one group."""
+        group_filter = "" if group_id is None else " AND d.group_id = ?"
+        params = (address,) if group_id is None else (address, group_id)
+        # Summed in Python: totals of uint64 amounts can overflow SQLite's SUM().
+        owed_to = sum(
+            _from_amount(amount) - _from_amount(paid)
+            for amount, paid in self.connection.execute(
+                "SELECT d.amount, d.paid FROM bills b JOIN debtors d "
+                "ON d.group_id = b.group_id AND d.bill_id = b.bill_id "
+                f"WHERE b.payer = ? AND d.debtor != b.payer AND d.amount > d.paid{group_filter}",
+                params,
+            )
+        )
+        owes = sum(
+            _from_amount(amount) - _from_amount(paid)
+            for amount, paid in self.connection.execute(
+                "SELECT d.amount, d.paid FROM debtors d JOIN bills b "
+                "ON d.group_id = b.group_id AND d.bill_id = b.bill_id "
+                f"WHERE d.debtor = ? AND d.debtor != b.payer AND d.amount > d.paid{group_filter}",
+                params,
+            )
+        )
+        return owed_to - owes
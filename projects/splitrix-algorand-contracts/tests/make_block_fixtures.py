@@ -0,0 +1,158 @@
+"""
+Regenerate the synthetic msgpack block fixtures in tests/fixtures/blocks.
+
+    python -m tests.make_block_fixtures
+
+The blocks are built here rather than captured from a network. They follow
+algod's msgpack block encoding (codec tags for field names, logs as msgpack
+strings holding raw bytes, and `apid` on the transaction for calls to existing
+apps) and are saved through `record_blocks`, the path that stores LocalNet or
+MainNet blocks. Each round covers one case the event indexer has to handle, see
+`tests/test_event_indexer.py` for the expected events.
+"""
+
+import typing
+from pathlib import Path
+
+import msgpack
+from algosdk import encoding
+
+from smart_contracts.splitrix.codec import BILL_KEY_LAYOUT, U64
+from smart_contracts.splitrix.event_indexer import record_blocks
+
+APP_ID = 1234
+OTHER_APP_ID = 99
+FIRST_ROUND = 100
+BLOCKS_DIR = Path(__file__).parent / "fixtures" / "blocks"
+
+GROUP_CREATED = encoding.checksum(b"GroupCreated(uint64)")[:4]
+BILL_CHANGED = encoding.checksum(b"BillChanged((uint64,uint64))")[:4]
+ABI_RETURN = bytes.fromhex("151f7c75")
+
+_SENDER = bytes(range(32))
+_PAYER = bytes(range(32, 64))
+
+
+def group_created(group_id: int) -> bytes:
+    return GROUP_CREATED + U64.pack(group_id)
+
+
+def bill_changed(group_id: int, bill_id: int) -> bytes:
+    return BILL_CHANGED + BILL_KEY_LAYOUT.pack(group_id, bill_id)
+
+
+def _log(data: bytes) -> str:
+    # algod writes logs as msgpack strings whatever their bytes.
+    return data.decode("utf-8", "surrogateescape")
+
+
+def _app_call(
+    app_id: int, logs: list[bytes], inner: list[dict[str, typing.Any]] | None = None
+) -> dict[str, typing.Any]:
+    apply_data: dict[str, typing.Any] = {}
+    if logs:
+        apply_data["lg"] = [_log(log) for log in logs]
+    if inner:
+        apply_data["itx"] = inner
+    entry: dict[str, typing.Any] = {
+        "txn": {"type": "appl", "apid": app_id, "snd": _SENDER, "fee": 1000, "fv": 1, "lv": 1001}
+    }
+    if apply_data:
+        entry["dt"] = apply_data
+    return entry
+
+
+def _payment(amount: int) -> dict[str, typing.Any]:
+    return {
+        "txn": {"type": "pay", "snd": _SENDER, "rcv": _PAYER, "amt": amount, "fee": 1000},
+    }
+
+
+def _signed(entry: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    return {**entry, "sig": bytes(64), "hgi": True}
+
+
+def fixture_blocks() -> dict[int, list[dict[str, typing.Any]]]:
+    """Round -> top-level transactions of that block."""
+    return {
+        # No transactions: algod leaves `txns` out.
+        FIRST_ROUND: [],
+        # create_group next to an unrelated payment; the ABI return log is not an event.
+        FIRST_ROUND + 1: [
+            _payment(100_000),
+            _app_call(APP_ID, [group_created(0), ABI_RETURN + U64.pack(0)]),
+        ],
+        # create_bill, then create_bill with netting against bill 0.
+        FIRST_ROUND + 2: [
+            _app_call(APP_ID, [bill_changed(0, 0), ABI_RETURN + U64.pack(0)]),
+            _app_call(
+                APP_ID,
+                [bill_changed(0, 0), bill_changed(0, 1), ABI_RETURN + U64.pack(1)],
+            ),
+        ],
+        # Another app logging a look-alike event, and one calling Splitrix from
+        # an inner transaction that in turn calls it again.
+        FIRST_ROUND + 3: [
+            _app_call(OTHER_APP_ID, [bill_changed(7, 7)]),
+            _app_call(
+                OTHER_APP_ID,
+                [],
+                inner=[
+                    _payment(1_000),
+                    _app_call(
+                        APP_ID,
+                        [bill_changed(0, 1)],
+                        inner=[_app_call(APP_ID, [group_created(1)])],
+                    ),
+                ],
+            ),
+        ],
+        # A truncated event is skipped, the valid one after it keeps its log index.
+        FIRST_ROUND + 4: [
+            _app_call(APP_ID, [BILL_CHANGED + U64.pack(0), group_created(2)]),
+        ],
+        # settle_bill: payment in front of the app call.
+        FIRST_ROUND + 5: [
+            _payment(500),
+            _app_call(APP_ID, [bill_changed(0, 1)]),
+        ],
+    }
+
+
+class _FixtureBlocks:
+    """Serves `fixture_blocks` as algod's `GET /v2/blocks/{round}?format=msgpack` would."""
+
+    def __init__(self, blocks: dict[int, list[dict[str, typing.Any]]]) -> None:
+        self._blocks = blocks
+
+    def raw_block(self, round_num: int) -> bytes:
+        header: dict[str, typing.Any] = {
+            "rnd": round_num,
+            "gen": "fixture-v1",
+            "gh": bytes(32),
+            "prev": bytes(32),
+            "ts": 1_700_000_000 + round_num,
+        }
+        txns = [_signed(entry) for entry in self._blocks[round_num]]
+        if txns:
+            header["txns"] = txns
+        return typing.cast(
+            bytes,
+            msgpack.packb(
+                {"block": header, "cert": {"rnd": round_num}},
+                use_bin_type=True,
+                unicode_errors="surrogateescape",
+            ),
+        )
+
+
+def main() -> None:
+    blocks = fixture_blocks()
+    for stale in BLOCKS_DIR.glob("*.msgp"):
+        stale.unlink()
+    record_blocks(_FixtureBlocks(blocks), sorted(blocks), BLOCKS_DIR)
+    print(f"Wrote {len(blocks)} blocks to {BLOCKS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import pytest
+from algosdk import account
+
+from smart_contracts.artifacts.splitrix.splitrix_client import Bill, BillKey
+from smart_contracts.splitrix.compact import CompactState
+
+np = pytest.importorskip("numpy")
+
+from smart_contracts.splitrix import analytics  # noqa: E402
+
+PAYER = account.generate_account()[1]
+DEBTOR = account.generate_account()[1]
+
+
+def _bills(*amounts: int) -> dict[BillKey, Bill]:
+    return {
+        BillKey(group_id=0, bill_id=bill_id): Bill(
+            payer=PAYER, total_amount=amount, debtors=[[DEBTOR, amount, 0]], memo=""
+        )
+        for bill_id, amount in enumerate(amounts)
+    }
+
+
+def _compact(bills: dict[BillKey, Bill]) -> CompactState:
+    state = CompactState()
+    for key, bill in bills.items():
+        state.set_bill(key, bill)
+    return state
+
+
+def test_amounts_below_int64() -> None:
+    bills = _bills(2**62, 2**62 - 1)
+
+    from_bills = analytics.columns_from_bills(bills)
+    from_compact = analytics.columns_from_compact(_compact(bills))
+
+    for columns in (from_bills, from_compact):
+        assert analytics.balances_by_address(columns) == {
+            PAYER: 2**63 - 1,
+            DEBTOR: -(2**63 - 1),
+        }
+
+
+@pytest.mark.parametrize("amounts", [(2**63,), (2**62, 2**62), (2**64 - 1, 1)])
+def test_amounts_past_int64_raise(amounts: tuple[int, ...]) -> None:
+    bills = _bills(*amounts)
+
+    with pytest.raises(OverflowError):
+        analytics.columns_from_bills(bills)
+    with pytest.raises(OverflowError):
+        analytics.columns_from_compact(_compact(bills))
@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+from algosdk import account
+
+from smart_contracts.artifacts.splitrix.splitrix_client import CreateBillArgs, Group
+from smart_contracts.splitrix import bulk_reads
+from smart_contracts.splitrix.bulk_submit import (
+    MAX_GROUP_SIZE,
+    BulkItemResult,
+    BulkSubmitter,
+    _bill_box,
+    _Entry,
+    _PackedGroup,
+)
+
+GROUP_ID = 3
+BILL_COUNTER = 5
+MEMBERS = [account.generate_account()[1] for _ in range(40)]
+
+
+class _Tracker:
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def submitter(monkeypatch: pytest.MonkeyPatch) -> BulkSubmitter:
+    group = Group(admin=MEMBERS[0], bill_counter=BILL_COUNTER, members=MEMBERS)
+    monkeypatch.setattr(bulk_reads, "get_groups", lambda client, ids, sender: [group for _ in ids])
+    monkeypatch.setattr(bulk_reads, "get_bills", lambda client, keys, sender: [None for _ in keys])
+    algorand = SimpleNamespace(client=SimpleNamespace(algod=None))
+    client = SimpleNamespace(app_id=1, algorand=algorand)
+    return BulkSubmitter(
+        client,  # type: ignore[arg-type]
+        MEMBERS[0],
+        signer=object(),  # type: ignore[arg-type]
+        max_in_flight=1,
+        tracker=_Tracker(),  # type: ignore[arg-type]
+    )
+
+
+def _bill(debtors: int, memo: str = "") -> CreateBillArgs:
+    return CreateBillArgs(
+        group_id=GROUP_ID,
+        payer=MEMBERS[0],
+        total_amount=debtors,
+        debtors=[(debtor, 1) for debtor in MEMBERS[1 : debtors + 1]],
+        memo=memo,
+        payers_debt=[],
+    )
+
+
+def test_oversized_item_does_not_take_a_bill_id(submitter: BulkSubmitter) -> None:
+    # 30 debtors scanned against 40 members cost more than a full atomic group can pool.
+    items = [_bill(1, "a"), _bill(30), _bill(1, "b"), _bill(1, "c")]
+
+    packed = list(submitter._pack(items))
+
+    rejected = [result for result in packed if isinstance(result, BulkItemResult)]
+    assert [(result.index, str(result.error)) for result in rejected] == [
+        (1, "Item does not fit in a single atomic group")
+    ]
+    groups = [group for group in packed if isinstance(group, _PackedGroup)]
+    entries = [entry for group in groups for entry in group.entries]
+    assert [(entry.index, entry.bill_id) for entry in entries] == [
+        (0, BILL_COUNTER),
+        (2, BILL_COUNTER + 1),
+        (3, BILL_COUNTER + 2),
+    ]
+    for entry in entries:
+        assert _bill_box(GROUP_ID, entry.bill_id) in entry.boxes  # type: ignore[arg-type]
+    assert submitter._bill_counters[GROUP_ID] == BILL_COUNTER + 3
+
+
+def test_shared_box_keeps_its_largest_size() -> None:
+    group = _PackedGroup()
+    group.add(_Entry(index=0, args=_bill(1), boxes={b"box": 17_000}, txns=1, cost=0, epoch=0))
+    small = _Entry(index=1, args=_bill(1), boxes={b"box": 10}, txns=1, cost=0, epoch=0)
+
+    # 17 box references need three app calls of 8.
+    assert group.requirements(small) == (3, 3)
+
+
+def test_failed_build_releases_its_slot(submitter: BulkSubmitter) -> None:
+    def fail(*args: object) -> None:
+        raise RuntimeError("no suggested params")
+
+    submitter.client.algorand.get_suggested_params = fail  # type: ignore[attr-defined]
+    items = [_bill(1, str(index)) for index in range(3 * MAX_GROUP_SIZE)]
+
+    # With one slot, a leaked slot would block on the second atomic group.
+    results = list(submitter.submit_iter(items))
+
+    assert sorted(result.index for result in results) == list(range(len(items)))
+    assert all(isinstance(result.error, RuntimeError) for result in results)
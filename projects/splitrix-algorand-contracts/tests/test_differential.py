@@ -0,0 +1,25 @@
+import pytest
+from algopy import arc4
+
+from benchmarks.differential import run
+from smart_contracts.splitrix import contract
+from smart_contracts.splitrix.emulator import EmulatedSplitrix
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_emulator_matches_reference(seed: int) -> None:
+    report = run(100, seed=seed, check_every=50)
+
+    assert report.operations == 100
+    assert report.state_checks == 3
+    assert report.accepted["create_bill"] and report.accepted["settle_bill"]
+    assert sum(report.rejected.values())
+
+
+def test_emulator_restores_tuple_types() -> None:
+    before = dict(arc4.Tuple.__concrete__)
+
+    with EmulatedSplitrix():
+        assert contract.BillKey in arc4.Tuple.__concrete__
+
+    assert arc4.Tuple.__concrete__ == before
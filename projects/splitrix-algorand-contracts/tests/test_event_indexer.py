@@ -0,0 +1,158 @@
+import logging
+from pathlib import Path
+
+import pytest
+
+from smart_contracts.artifacts.splitrix.splitrix_client import BillKey
+from smart_contracts.splitrix.event_indexer import (
+    EventIndexer,
+    RecordedBlockSource,
+    SplitrixEvent,
+    _app_calls,
+    decode_block_events,
+)
+from tests.make_block_fixtures import (
+    APP_ID,
+    BLOCKS_DIR,
+    FIRST_ROUND,
+    OTHER_APP_ID,
+    bill_changed,
+    group_created,
+)
+
+LAST_ROUND = FIRST_ROUND + 5
+
+
+def _event(name: str, arg: object, round_num: int, path: tuple[int, ...], log_index: int = 0):
+    return SplitrixEvent(name=name, args=(arg,), round=round_num, path=path, log_index=log_index)
+
+
+EXPECTED = [
+    _event("GroupCreated", 0, FIRST_ROUND + 1, (1,)),
+    _event("BillChanged", BillKey(group_id=0, bill_id=0), FIRST_ROUND + 2, (0,)),
+    _event("BillChanged", BillKey(group_id=0, bill_id=0), FIRST_ROUND + 2, (1,)),
+    _event("BillChanged", BillKey(group_id=0, bill_id=1), FIRST_ROUND + 2, (1,), 1),
+    _event("BillChanged", BillKey(group_id=0, bill_id=1), FIRST_ROUND + 3, (1, 1)),
+    _event("GroupCreated", 1, FIRST_ROUND + 3, (1, 1, 0)),
+    _event("GroupCreated", 2, FIRST_ROUND + 4, (0,), 1),
+    _event("BillChanged", BillKey(group_id=0, bill_id=1), FIRST_ROUND + 5, (1,)),
+]
+
+
+@pytest.fixture
+def source() -> RecordedBlockSource:
+    return RecordedBlockSource(BLOCKS_DIR)
+
+
+def _block(source: RecordedBlockSource, round_num: int) -> dict:
+    (block,) = source.blocks([round_num])
+    return block
+
+
+def test_recorded_rounds(source: RecordedBlockSource) -> None:
+    assert source.last_round() == LAST_ROUND
+    assert [block["rnd"] for block in source.blocks([FIRST_ROUND, LAST_ROUND])] == [
+        FIRST_ROUND,
+        LAST_ROUND,
+    ]
+
+
+def test_decode_block_events(source: RecordedBlockSource) -> None:
+    events = [
+        event
+        for block in source.blocks(list(range(FIRST_ROUND, LAST_ROUND + 1)))
+        for event in decode_block_events(block, APP_ID)
+    ]
+
+    assert events == EXPECTED
+
+
+def test_decode_block_events_without_transactions(source: RecordedBlockSource) -> None:
+    assert decode_block_events(_block(source, FIRST_ROUND), APP_ID) == []
+
+
+def test_decode_block_events_skips_undecodable_logs(
+    source: RecordedBlockSource, caplog: pytest.LogCaptureFixture
+) -> None:
+    with caplog.at_level(logging.WARNING):
+        events = decode_block_events(_block(source, FIRST_ROUND + 4), APP_ID)
+
+    assert events == [_event("GroupCreated", 2, FIRST_ROUND + 4, (0,), 1)]
+    assert "Undecodable BillChanged log" in caplog.text
+
+
+def test_decode_block_events_for_another_app(source: RecordedBlockSource) -> None:
+    events = decode_block_events(_block(source, FIRST_ROUND + 3), OTHER_APP_ID)
+
+    assert events == [_event("BillChanged", BillKey(group_id=7, bill_id=7), FIRST_ROUND + 3, (0,))]
+
+
+def test_app_calls_include_inner_transactions(source: RecordedBlockSource) -> None:
+    txns = _block(source, FIRST_ROUND + 3)["txns"]
+
+    calls = list(_app_calls(txns, APP_ID))
+
+    # Logs are msgpack strings in blocks; compare them as the bytes they carry.
+    assert [
+        (path, [log.encode("utf-8", "surrogateescape") for log in logs]) for path, logs in calls
+    ] == [
+        ((1, 1), [bill_changed(0, 1)]),
+        ((1, 1, 0), [group_created(1)]),
+    ]
+
+
+def test_app_calls_skip_calls_without_logs(source: RecordedBlockSource) -> None:
+    txns = _block(source, FIRST_ROUND + 3)["txns"]
+
+    # The outer call to the other app logs nothing, only its sibling is reported.
+    assert [path for path, _ in _app_calls(txns, OTHER_APP_ID)] == [(0,)]
+
+
+def test_indexer_runs_to_stop_round(source: RecordedBlockSource, tmp_path: Path) -> None:
+    indexer = EventIndexer(
+        source, APP_ID, tmp_path / "checkpoint.json", start_round=FIRST_ROUND, batch_size=2
+    )
+    seen: list[SplitrixEvent] = []
+
+    indexer.run(seen.extend, stop_round=LAST_ROUND)
+
+    assert seen == EXPECTED
+    assert indexer.checkpoint.load() == LAST_ROUND
+    assert indexer.next_round() == LAST_ROUND + 1
+
+
+def test_indexer_resumes_from_checkpoint(source: RecordedBlockSource, tmp_path: Path) -> None:
+    checkpoint = tmp_path / "checkpoint.json"
+    first = EventIndexer(source, APP_ID, checkpoint, start_round=FIRST_ROUND, batch_size=2)
+    batches = first.batches(stop_round=LAST_ROUND)
+    completed = next(batches)
+    interrupted = next(batches)
+    # Stop while the second batch is being handled: only the first is checkpointed.
+    batches.close()
+    assert completed[0] == FIRST_ROUND + 1
+    assert first.checkpoint.load() == FIRST_ROUND + 1
+
+    resumed = EventIndexer(source, APP_ID, checkpoint, start_round=FIRST_ROUND, batch_size=2)
+    replayed = list(resumed.batches(stop_round=LAST_ROUND))
+
+    # The unfinished batch is delivered again, nothing before it is.
+    assert replayed[0] == interrupted
+    assert completed[1] + [event for _, events in replayed for event in events] == EXPECTED
+    assert resumed.checkpoint.load() == LAST_ROUND
+
+
+def test_indexer_checkpoint_belongs_to_one_app(
+    source: RecordedBlockSource, tmp_path: Path
+) -> None:
+    checkpoint = tmp_path / "checkpoint.json"
+    EventIndexer(source, APP_ID, checkpoint, start_round=FIRST_ROUND).run(
+        lambda _: None, stop_round=FIRST_ROUND + 1
+    )
+
+    with pytest.raises(ValueError, match="belongs to app"):
+        EventIndexer(source, OTHER_APP_ID, checkpoint).next_round()
+
+
+def test_recorded_source_stops_after_last_block(source: RecordedBlockSource) -> None:
+    with pytest.raises(EOFError):
+        source.wait_for_block_after(LAST_ROUND)
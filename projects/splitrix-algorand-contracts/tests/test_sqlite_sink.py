@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from smart_contracts.artifacts.splitrix.splitrix_client import Bill, BillKey, Group
+from smart_contracts.splitrix.sqlite_sink import SQLiteSink
+
+ALICE = "A" * 58
+BOB = "B" * 58
+MAX_UINT64 = 2**64 - 1
+
+
+def _bill(debt: int) -> Bill:
+    own_share = MAX_UINT64 - debt
+    return Bill(
+        payer=ALICE,
+        total_amount=MAX_UINT64,
+        debtors=[[ALICE, own_share, own_share], [BOB, debt, 0]],  # type: ignore[list-item]
+        memo="large",
+    )
+
+
+def test_amounts_beyond_int64(tmp_path: Path) -> None:
+    first, second = BillKey(group_id=0, bill_id=0), BillKey(group_id=0, bill_id=1)
+    bills = [(first, _bill(2**63)), (second, _bill(2**63 + 1))]
+    group = Group(admin=ALICE, bill_counter=2, members=[ALICE, BOB])
+
+    with SQLiteSink(tmp_path / "splitrix.db") as sink:
+        sink.write([(0, group)], bills, 7)
+
+        assert sink.bill(first) == bills[0][1]
+        assert list(sink.iter_bills()) == bills
+        assert sink.bills_owed_by(BOB) == [(first, 2**63), (second, 2**63 + 1)]
+        # Both totals are past the range of SQLite's SUM().
+        assert sink.balance(ALICE) == 2**64 + 1
+        assert sink.balance(BOB, group_id=0) == -(2**64 + 1)
+        assert sink.round == 7